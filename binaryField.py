@@ -0,0 +1,213 @@
+"""
+Arithmetic of the fields of characteristic 2 (p = 2) on bit-packed polynomials.
+
+A polynomial of F_2[x] is the integer whose bit i is its coefficient of x^i, so the addition
+is a XOR and the multiplication is a carry-less product (shift-and-XOR). The reduction modulo
+a sparse f(x) = x^n + x^t_1 + ... + 1 only needs one shift and XOR per term of f.
+The vectorized functions work on uint64 NumPy arrays with one element per word.
+"""
+
+from typing import List
+import numpy as np
+from factorization import factorize
+
+# The vectorized product of two words needs 2n - 1 bits
+MAX_WORD_DEGREE = 32
+
+
+def pack_bits(coeffs) -> int:
+    """
+    Converts the coefficients [a_0, ..., a_{n-1}] to the integer a_0 + 2 a_1 + ... + 2^(n-1) a_{n-1}
+    """
+
+    value = 0
+    for coeff in reversed([int(coeff) % 2 for coeff in coeffs]):
+        value = (value << 1) | coeff
+    return value
+
+
+def unpack_bits(value: int, n: int):
+    """
+    Converts an integer to its n coefficients [a_0, ..., a_{n-1}]
+    """
+
+    return np.array([(value >> i) & 1 for i in range(n)], dtype="int64")
+
+
+def modulus_terms(modulus: int) -> List[int]:
+    """
+    Returns the exponents of the terms of f(x) lower than its degree n, so that x^n = sum x^t
+    """
+
+    n = modulus.bit_length() - 1
+    return [i for i in range(n) if (modulus >> i) & 1]
+
+
+def clmul(a: int, b: int) -> int:
+    """
+    Carry-less product of two polynomials of F_2[x]
+    """
+
+    if a.bit_length() < b.bit_length():
+        a, b = b, a
+
+    result = 0
+    while b:
+        if b & 1:
+            result ^= a
+        a <<= 1
+        b >>= 1
+    return result
+
+
+def reduce(c: int, n: int, terms: List[int]) -> int:
+    """
+    Reduces c modulo f(x) = x^n + sum x^t: the part of c above x^n is multiplied by sum x^t
+    and folded back, until the degree of c is lower than n
+    """
+
+    mask = (1 << n) - 1
+    while c >> n:
+        high = c >> n
+        c &= mask
+        for t in terms:
+            c ^= high << t
+    return c
+
+
+def poly_mod(a: int, b: int) -> int:
+    """
+    Remainder of the division of a(x) by b(x) in F_2[x]
+    """
+
+    degree = b.bit_length()
+    while a.bit_length() >= degree:
+        a ^= b << (a.bit_length() - degree)
+    return a
+
+
+def poly_gcd(a: int, b: int) -> int:
+    """
+    Greatest common divisor of a(x) and b(x) in F_2[x]
+    """
+
+    while b:
+        a, b = b, poly_mod(a, b)
+    return a
+
+
+def inverse(a: int, modulus: int) -> int:
+    """
+    Inverse of a(x) modulo f(x) with the extended Euclidean algorithm in F_2[x]
+    """
+
+    if a == 0:
+        error = f"The zero element does not have an inverse"
+        raise ZeroDivisionError(error)
+
+    old_r, r = modulus, a
+    old_s, s = 0, 1
+    while r:
+        # One step of the division of old_r by r
+        shift = old_r.bit_length() - r.bit_length()
+        if shift < 0:
+            old_r, r = r, old_r
+            old_s, s = s, old_s
+            continue
+        old_r ^= r << shift
+        old_s ^= s << shift
+
+    if old_r != 1:
+        error = f"{a} is not invertible modulo {modulus}"
+        raise ZeroDivisionError(error)
+
+    return poly_mod(old_s, modulus)
+
+
+def is_irreducible(modulus: int) -> bool:
+    """
+    Rabin's irreducibility test in F_2[x], where x^(2^i) is computed by repeated squaring
+    """
+
+    n = modulus.bit_length() - 1
+    if n < 1:
+        return False
+    if n == 1:
+        return True
+
+    terms = modulus_terms(modulus)
+    degrees = {n // r for r in factorize(n)}
+
+    # frobenius = x^(2^i) mod f
+    frobenius = 0b10
+    for i in range(1, n + 1):
+        frobenius = reduce(clmul(frobenius, frobenius), n, terms)
+        if i in degrees and poly_gcd(modulus, frobenius ^ 0b10) != 1:
+            return False
+
+    return frobenius == 0b10
+
+
+def ben_or_is_irreducible(modulus: int) -> bool:
+    """
+    Ben-Or's irreducibility test in F_2[x]: gcd(x^(2^i) - x, f(x)) = 1 for i = 1, ..., n/2,
+    which stops at the first common factor of a reducible f
+    """
+
+    n = modulus.bit_length() - 1
+    if n < 1:
+        return False
+
+    terms = modulus_terms(modulus)
+
+    # frobenius = x^(2^i) mod f
+    frobenius = 0b10
+    for i in range(1, n // 2 + 1):
+        frobenius = reduce(clmul(frobenius, frobenius), n, terms)
+        if poly_gcd(modulus, frobenius ^ 0b10) != 1:
+            return False
+
+    return True
+
+
+def pack_words(data):
+    """
+    Converts coefficients of shape (..., n) to uint64 words of shape (...)
+    """
+
+    data = np.asarray(data)
+    weights = np.left_shift(np.uint64(1), np.arange(data.shape[-1], dtype="uint64"))
+    return (data.astype("uint64") * weights).sum(axis=-1, dtype="uint64")
+
+
+def unpack_words(words, n: int):
+    """
+    Converts uint64 words of shape (...) to coefficients of shape (..., n)
+    """
+
+    shifts = np.arange(n, dtype="uint64")
+    return ((np.asarray(words, dtype="uint64")[..., np.newaxis] >> shifts) & np.uint64(1)).astype("int64")
+
+
+def multiply_words(a, b, n: int, terms: List[int]):
+    """
+    Vectorized product modulo f(x) of the elements stored in the uint64 words a and b (n <= 32)
+    """
+
+    a, b = np.broadcast_arrays(np.asarray(a, dtype="uint64"), np.asarray(b, dtype="uint64"))
+
+    # Carry-less product: the shifted copies of a where b has a 1 bit
+    product = np.zeros(a.shape, dtype="uint64")
+    for i in range(n):
+        bit = (b >> np.uint64(i)) & np.uint64(1)
+        product ^= (a << np.uint64(i)) * bit
+
+    # Reduction modulo f(x), as in reduce()
+    mask = np.uint64((1 << n) - 1)
+    while np.any(product >> np.uint64(n)):
+        high = product >> np.uint64(n)
+        product &= mask
+        for t in terms:
+            product ^= high << np.uint64(t)
+
+    return product
@@ -0,0 +1,202 @@
+"""
+Discrete logarithm in the multiplicative group l* of a finite field.
+
+The Pohlig-Hellman algorithm reduces the problem to subgroups of prime order q, where it is
+solved with BSGS when q is small, and with Pollard's rho (with distinguished points, so with
+almost no memory) when q is large.
+"""
+
+import random
+from finiteFieldElement import FiniteFieldElement, BSGS, BSGSTable
+
+# Prime orders up to this bound are solved with BSGS (about sqrt(bound) elements in memory)
+BSGS_LIMIT = 2 ** 24
+
+# Number of precomputed multipliers of the r-adding walk of Pollard's rho
+RHO_MULTIPLIERS = 20
+
+
+def discrete_log(g: FiniteFieldElement, h: FiniteFieldElement) -> int:
+    """
+    Solves g^x = h with the Pohlig-Hellman algorithm: x is computed modulo every prime power
+    q^e dividing the order of g, and the results are combined with the Chinese remainder theorem.
+    Returns x modulo the order of g
+    """
+
+    order = g.mult_order()
+    one = g.one()
+
+    if h ** order != one:
+        error = f"{h} is not a power of {g}"
+        raise ValueError(error)
+
+    # Factorization of the order of g, from the factorization of p^n - 1
+    factors = {}
+    for prime in g.field.group_order_factorization():
+        exponent = 0
+        while order % prime ** (exponent + 1) == 0:
+            exponent += 1
+        if exponent:
+            factors[prime] = exponent
+
+    residues, moduli = [], []
+    for prime, exponent in factors.items():
+        cofactor = order // prime ** exponent
+        residues.append(prime_power_log(g ** cofactor, h ** cofactor, prime, exponent))
+        moduli.append(prime ** exponent)
+
+    return crt(residues, moduli)
+
+
+def prime_power_log(g: FiniteFieldElement, h: FiniteFieldElement, prime: int, exponent: int) -> int:
+    """
+    Solves g^x = h when g has order q^e: the digits of x in base q are computed one by one,
+    each digit being a discrete logarithm in the subgroup of order q
+    """
+
+    # gamma has order q
+    gamma = g ** (prime ** (exponent - 1))
+    g_inverse = g.inverse()
+
+    # All the digits are logarithms in base gamma: the baby steps are computed once
+    table = BSGSTable(gamma, prime) if prime <= BSGS_LIMIT else None
+
+    x = 0
+    for k in range(exponent):
+        # (g^-x h)^(q^(e-1-k)) = gamma^(d_k)
+        target = (g_inverse ** x * h) ** (prime ** (exponent - 1 - k))
+        x += prime_order_log(gamma, target, prime, table) * prime ** k
+
+    return x
+
+
+def prime_order_log(g: FiniteFieldElement, h: FiniteFieldElement, prime: int, table: BSGSTable = None) -> int:
+    """
+    Solves g^x = h when g has prime order q.
+    A BSGSTable of g can be given to reuse its baby steps
+    """
+
+    if h == g.one():
+        return 0
+
+    if table is not None:
+        x = table.log(h)
+    elif prime <= BSGS_LIMIT:
+        x = BSGS(g, h, prime)
+    else:
+        x = pollard_rho_log(g, h, prime)
+
+    if x is None:
+        error = f"{h} is not a power of {g}"
+        raise ValueError(error)
+
+    return x
+
+
+def pollard_rho_log(g: FiniteFieldElement, h: FiniteFieldElement, prime: int, distinguished_bits: int = None) -> int:
+    """
+    Pollard's rho with distinguished points for g^x = h, when g has prime order q.
+
+    Every point of the walk is x = g^a h^b. The walks start from random points and stop at
+    the first distinguished point (whose hash has distinguished_bits zero bits), which is
+    stored with its (a, b). When two walks reach the same distinguished point with different
+    (a, b), we get a + bx = a' + b'x mod q. Only the distinguished points are kept in memory
+    """
+
+    if distinguished_bits is None:
+        distinguished_bits = default_distinguished_bits(prime)
+
+    multipliers = random_multipliers(prime)
+    steps = rho_steps(g, h, multipliers)
+
+    distinguished = {}
+    while True:
+        point = rho_walk(g, h, prime, steps, distinguished_bits, random.Random())
+        if point is None:
+            continue
+
+        x = rho_collision(g, h, prime, distinguished, point)
+        if x is not None:
+            return x
+
+
+def default_distinguished_bits(prime: int) -> int:
+    """
+    The walks have an expected length of 2^distinguished_bits, about sqrt(q)/16
+    """
+
+    return max(0, prime.bit_length() // 2 - 4)
+
+
+def random_multipliers(prime: int):
+    """
+    Random exponents (u_j, v_j) of the multipliers M_j = g^u_j h^v_j of the r-adding walk
+    """
+
+    return [(random.randrange(prime), random.randrange(prime)) for _ in range(RHO_MULTIPLIERS)]
+
+
+def rho_steps(g: FiniteFieldElement, h: FiniteFieldElement, multipliers):
+    """
+    The r-adding walk: x -> x * M_j, where j depends on x and M_j = g^u_j h^v_j
+    """
+
+    return [(g ** u * h ** v, u, v) for u, v in multipliers]
+
+
+def rho_walk(g: FiniteFieldElement, h: FiniteFieldElement, prime: int, steps, distinguished_bits: int, generator):
+    """
+    Walks from a random point g^a h^b until a distinguished point.
+    Returns (packed value, a, b), or None if the walk is too long (it is probably in a cycle)
+    """
+
+    mask = (1 << distinguished_bits) - 1
+    a, b = generator.randrange(prime), generator.randrange(prime)
+    point = g ** a * h ** b
+
+    for _ in range(20 << distinguished_bits):
+        value = point.to_int()
+        mixed = (value * 0x9E3779B97F4A7C15 >> 17) & 0xFFFFFFFFFFFF
+
+        if mixed & mask == 0:
+            return value, a, b
+
+        multiplier, u, v = steps[value % RHO_MULTIPLIERS]
+        point = point * multiplier
+        a, b = (a + u) % prime, (b + v) % prime
+
+    return None
+
+
+def rho_collision(g: FiniteFieldElement, h: FiniteFieldElement, prime: int, distinguished, point):
+    """
+    Stores a distinguished point (value, a, b). If the value was already reached with another (a, b),
+    returns the solution x of g^a h^b = g^a' h^b', else None
+    """
+
+    value, a, b = point
+    if value not in distinguished:
+        distinguished[value] = (a, b)
+        return None
+
+    a2, b2 = distinguished[value]
+    if (b - b2) % prime == 0:
+        return None
+
+    x = (a2 - a) * pow(b - b2, -1, prime) % prime
+    return x if g ** x == h else None
+
+
+def crt(residues, moduli) -> int:
+    """
+    Chinese remainder theorem for pairwise coprime moduli
+    """
+
+    x, modulus = 0, 1
+    for residue, m in zip(residues, moduli):
+        # x + modulus * t = residue mod m
+        t = (residue - x) * pow(modulus, -1, m) % m
+        x += modulus * t
+        modulus *= m
+
+    return x % modulus
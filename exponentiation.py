@@ -0,0 +1,179 @@
+"""
+Exponentiation engine shared by PrimeFieldElement and FiniteFieldElement.
+
+The functions only rely on the * operator of the base, so they work for any
+element of a multiplicative group (prime field, extended field, ...).
+"""
+
+# Exponents of more bits than this are computed with the sliding window method
+SLIDING_WINDOW_THRESHOLD = 32
+
+
+def window_size(bits: int) -> int:
+    """
+    The window of the sliding window method minimizing the multiplications for an exponent of
+    the given number of bits: about 2^(window-1) precomputations plus bits/(window+1) products
+    """
+
+    window = 1
+    while (1 << window) + bits // (window + 2) < (1 << (window - 1)) + bits // (window + 1):
+        window += 1
+    return window
+
+
+def power(base, exponent: int, one, order: int = None):
+    """
+    Computes base ** exponent with square-and-multiply for the small exponents,
+    and with the sliding window method for the large ones (see SLIDING_WINDOW_THRESHOLD)
+    """
+
+    if order is not None:
+        exponent %= order
+
+    bits = exponent.bit_length()
+    if bits <= SLIDING_WINDOW_THRESHOLD:
+        return square_and_multiply(base, exponent, one)
+    return sliding_window_pow(base, exponent, one, window_size(bits))
+
+
+def square_and_multiply(base, exponent: int, one, order: int = None):
+    """
+    Computes base ** exponent with O(log(exponent)) multiplications (left-to-right binary method)
+
+    Parameters
+    ----------
+    base : the element to raise
+    exponent : a non-negative integer (or any integer if order is given)
+    one : the neutral element of the group of base
+    order : if given, the exponent is first reduced modulo this group order
+    """
+
+    if order is not None:
+        exponent %= order
+
+    if exponent < 0:
+        error = f"The exponent has to be non-negative (instead of {exponent})"
+        raise ValueError(error)
+
+    result = one
+    for bit in bin(exponent)[2:]:
+        result = result * result
+        if bit == "1":
+            result = result * base
+
+    return result
+
+
+def sliding_window_pow(base, exponent: int, one, window: int = 4, order: int = None):
+    """
+    Computes base ** exponent with the sliding window method.
+    Only the odd powers base^1, base^3, ..., base^(2^window - 1) are precomputed,
+    which saves about a third of the multiplications for large exponents.
+
+    Parameters
+    ----------
+    base : the element to raise
+    exponent : a non-negative integer (or any integer if order is given)
+    one : the neutral element of the group of base
+    window : the maximal number of bits handled by one multiplication
+    order : if given, the exponent is first reduced modulo this group order
+    """
+
+    if order is not None:
+        exponent %= order
+
+    if exponent < 0:
+        error = f"The exponent has to be non-negative (instead of {exponent})"
+        raise ValueError(error)
+
+    if exponent == 0:
+        return one
+
+    # Precompute the odd powers of the base
+    square = base * base
+    odd_powers = [base]
+    for i in range(1, 1 << (window - 1)):
+        odd_powers.append(odd_powers[-1] * square)
+
+    bits = bin(exponent)[2:]
+    result = one
+    i = 0
+    while i < len(bits):
+
+        if bits[i] == "0":
+            result = result * result
+            i += 1
+            continue
+
+        # Find the longest window starting at i which ends with a 1
+        j = min(i + window, len(bits))
+        while bits[j - 1] == "0":
+            j -= 1
+
+        for _ in range(j - i):
+            result = result * result
+        result = result * odd_powers[int(bits[i:j], 2) >> 1]
+        i = j
+
+    return result
+
+
+class FixedBasePower:
+    """
+    Precomputed tables for a base that gets raised to many different exponents.
+
+    The exponent is written in base 2^window: e = sum d_i * 2^(window*i), and we store
+    base^(d * 2^(window*i)) for every digit d and position i. Computing base^e then costs
+    one multiplication per digit, without any squaring.
+    """
+
+    def __init__(self, base, one, order: int, window: int = 4):
+        """
+        Parameters
+        ----------
+        base : the fixed base
+        one : the neutral element of the group of base
+        order : the group order, every exponent is reduced modulo this order
+        window : the number of bits of each digit of the exponent
+        """
+
+        if order < 1:
+            error = f"The group order has to be positive (instead of {order})"
+            raise ValueError(error)
+
+        self.base = base
+        self.one = one
+        self.order = order
+        self.window = window
+        self.digits = -(-max(order.bit_length(), 1) // window)
+
+        # tables[i][d] = base^(d * 2^(window*i))
+        self.tables = []
+        position_base = base
+        for i in range(self.digits):
+            table = [one, position_base]
+            for d in range(2, 1 << window):
+                table.append(table[-1] * position_base)
+            self.tables.append(table)
+
+            # base^(2^(window*(i+1))) is the last entry times one more base
+            position_base = table[-1] * position_base
+
+    def __call__(self, exponent: int):
+        """
+        Computes base ** exponent using the precomputed tables
+        """
+
+        exponent %= self.order
+        mask = (1 << self.window) - 1
+
+        result = self.one
+        i = 0
+        while exponent:
+            digit = exponent & mask
+            if digit:
+                result = result * self.tables[i][digit]
+            exponent >>= self.window
+            i += 1
+
+        return result
@@ -0,0 +1,172 @@
+"""
+Primality test and integer factorization, used to factor the order p^n - 1 of the
+multiplicative group of a finite field.
+"""
+
+import math
+import random
+from functools import lru_cache
+from typing import Dict
+
+# Deterministic Miller-Rabin bases for every n < 3.3 * 10^24
+MILLER_RABIN_BASES = [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41]
+DETERMINISTIC_LIMIT = 3317044064679887385961981
+
+# Number of random bases tried in addition to the fixed ones above DETERMINISTIC_LIMIT
+RANDOM_ROUNDS = 20
+
+SMALL_PRIMES = [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47, 53, 59, 61, 67, 71, 73, 79, 83, 89, 97]
+
+
+def is_prime(n: int) -> bool:
+    """
+    Miller-Rabin primality test. It is deterministic for n < 3.3 * 10^24 (fixed bases). Above,
+    RANDOM_ROUNDS random bases are tried as well, so a composite n passes with a probability lower than 4^-20
+    """
+
+    if n < 2:
+        return False
+
+    for prime in SMALL_PRIMES:
+        if n % prime == 0:
+            return n == prime
+
+    # Write n - 1 = d * 2^s with d odd
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+
+    bases = MILLER_RABIN_BASES
+    if n >= DETERMINISTIC_LIMIT:
+        bases = bases + [random.randrange(2, n - 1) for _ in range(RANDOM_ROUNDS)]
+
+    for a in bases:
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = pow(x, 2, n)
+            if x == n - 1:
+                break
+        else:
+            return False
+
+    return True
+
+
+def pollard_rho(n: int) -> int:
+    """
+    Finds a non-trivial divisor of the composite number n with Pollard's rho (Brent's variant)
+    """
+
+    if n % 2 == 0:
+        return 2
+
+    while True:
+        y, c, m = random.randrange(1, n), random.randrange(1, n), 128
+        g, r, q = 1, 1, 1
+
+        while g == 1:
+            x = y
+            for _ in range(r):
+                y = (y * y + c) % n
+            k = 0
+            while k < r and g == 1:
+                ys = y
+                for _ in range(min(m, r - k)):
+                    y = (y * y + c) % n
+                    q = q * abs(x - y) % n
+                g = math.gcd(q, n)
+                k += m
+            r *= 2
+
+        # The batched gcd overshot: go back one step at a time
+        if g == n:
+            g = 1
+            while g == 1:
+                ys = (ys * ys + c) % n
+                g = math.gcd(abs(x - ys), n)
+
+        if g != n:
+            return g
+
+
+def factorize(n: int) -> Dict[int, int]:
+    """
+    Returns the factorization of n as a dictionary {prime: exponent}
+    """
+
+    if n < 1:
+        error = f"Cannot factorize {n}"
+        raise ValueError(error)
+
+    factors = {}
+
+    # Trial division by the small primes
+    for prime in SMALL_PRIMES:
+        while n % prime == 0:
+            factors[prime] = factors.get(prime, 0) + 1
+            n //= prime
+
+    # Split the remaining part with Pollard's rho
+    stack = [n] if n > 1 else []
+    while stack:
+        m = stack.pop()
+        if is_prime(m):
+            factors[m] = factors.get(m, 0) + 1
+            continue
+        divisor = pollard_rho(m)
+        stack.extend([divisor, m // divisor])
+
+    return dict(sorted(factors.items()))
+
+
+def mobius(n: int) -> int:
+    """
+    Mobius function of n
+    """
+
+    result = 1
+    for exponent in factorize(n).values():
+        if exponent > 1:
+            return 0
+        result = -result
+    return result
+
+
+def cyclotomic_value(d: int, p: int) -> int:
+    """
+    Computes the value of the d-th cyclotomic polynomial at p,
+    with Phi_d(p) = prod_{e | d} (p^e - 1)^mobius(d/e)
+    """
+
+    numerator, denominator = 1, 1
+    for e in range(1, d + 1):
+        if d % e != 0:
+            continue
+        mu = mobius(d // e)
+        if mu == 1:
+            numerator *= p ** e - 1
+        elif mu == -1:
+            denominator *= p ** e - 1
+
+    return numerator // denominator
+
+
+@lru_cache(maxsize=None)
+def factorize_group_order(p: int, n: int) -> Dict[int, int]:
+    """
+    Factorizes p^n - 1 using the cyclotomic splitting p^n - 1 = prod_{d | n} Phi_d(p):
+    each factor is much smaller than p^n - 1, so Pollard's rho runs on small numbers.
+    The results are cached, the returned dictionary must not be modified
+    """
+
+    factors = {}
+    for d in range(1, n + 1):
+        if n % d != 0:
+            continue
+        for prime, exponent in factorize(cyclotomic_value(d, p)).items():
+            factors[prime] = factors.get(prime, 0) + exponent
+
+    return dict(sorted(factors.items()))
@@ -0,0 +1,665 @@
+"""
+Vectorized arrays of field elements: all the elements of the array share one NumPy array,
+and the arithmetic is computed with NumPy operations on the whole array at once
+"""
+
+from typing import List
+import numpy as np
+from finiteField import FiniteField
+from finiteFieldElement import FiniteFieldElement
+from primeFieldElement import PrimeFieldElement
+from exponentiation import power
+from binaryField import MAX_WORD_DEGREE, pack_words, unpack_words, multiply_words
+from modularReduction import select_dtype, fits_int64, random_residues, mul_mod, sum_mod
+
+
+class _BaseArray:
+    """
+    Operations shared by FieldArray and PrimeFieldArray, written with their * operator
+    """
+
+    # Prevent NumPy from broadcasting its own operators over our arrays
+    __array_ufunc__ = None
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __truediv__(self, other):
+        """
+        Overload the / operator
+        """
+
+        return self * self._coerce(other).inverse()
+
+    def __pow__(self, other):
+        """
+        Overload the ** operator. The exponent is an int, or an array of ints (one per element)
+        """
+
+        exponent = np.asarray(other)
+        if exponent.dtype.kind not in "iuO":
+            error = f"The exponent has to be int (instead of {exponent.dtype})"
+            raise TypeError(error)
+
+        zeros = self.is_zero()
+        if np.any(zeros & (exponent < 0)):
+            error = f"The zero element does not have an inverse"
+            raise ZeroDivisionError(error)
+
+        # The exponents are reduced modulo the order of the multiplicative group
+        if exponent.ndim == 0:
+            result = power(self, int(exponent), self.ones_like(), order=self.group_order)
+        else:
+            result = self.__pow_array(exponent % self.group_order)
+
+        # 0^e = 0 for e > 0 (the reduction of the exponent would give 1)
+        return self.zeros_like().where(zeros & (exponent != 0), result)
+
+    def __pow_array(self, exponent):
+        """
+        Square-and-multiply with one exponent per element: all the elements are squared together,
+        and only the elements whose exponent has the current bit set are multiplied by the base
+        """
+
+        shape = np.broadcast_shapes(self.shape, exponent.shape)
+        base = self.broadcast_to(shape)
+        exponent = np.broadcast_to(exponent, shape)
+
+        result = base.ones_like()
+        for bit in range(int(exponent.max()).bit_length() - 1, -1, -1):
+            result = result * result
+            mask = ((exponent >> bit) & 1).astype(bool)
+            result = (result * base).where(mask, result)
+
+        return result
+
+    def inverse(self):
+        """
+        Computes the inverse of every element as alpha^(q-2), where q is the size of the field
+        """
+
+        if np.any(self.is_zero()):
+            error = f"The zero element does not have an inverse"
+            raise ZeroDivisionError(error)
+
+        return power(self, self.group_order - 1, self.ones_like())
+
+    def is_square(self):
+        """
+        Euler's criterion for every element: alpha is a square if and only if alpha^((q-1)/2) = 1 (or alpha = 0).
+        Every element is a square in characteristic 2
+        """
+
+        if self.group_order % 2 == 1:
+            return np.ones(self.shape, dtype=bool)
+
+        return self.is_zero() | (self ** (self.group_order // 2) == self.ones_like())
+
+    def sqrt(self):
+        """
+        Computes a square root of every element with a constant-time Tonelli-Shanks: all the elements
+        go through the same s steps (q - 1 = 2^s t, t odd), and the conditional products are masked.
+        Raises a ValueError if an element is not a square (see is_square() to select the squares)
+        """
+
+        order = self.group_order
+
+        # In characteristic 2, q - 1 is odd and sqrt(alpha) = alpha^(q/2)
+        if order % 2 == 1:
+            return self ** ((order + 1) // 2)
+
+        if not np.all(self.is_square()):
+            error = f"Some elements are not squares"
+            raise ValueError(error)
+
+        s, t = 0, order
+        while t % 2 == 0:
+            t //= 2
+            s += 1
+
+        # A non-square z, found among random elements
+        z = self.random_like(())
+        while z.is_square():
+            z = self.random_like(())
+
+        # x^2 = alpha b, where b is in the subgroup of order 2^s generated by c
+        x = self ** ((t + 1) // 2)
+        b = self ** t
+        c = z ** t
+        one = self.ones_like()
+
+        for k in range(s, 1, -1):
+            # b^(2^(k-2)) = -1 when the order of b is 2^(k-1)
+            square = b
+            for _ in range(k - 2):
+                square = square * square
+            flag = ~(square == one)
+
+            x = (x * c).where(flag, x)
+            c = c * c
+            b = (b * c).where(flag, b)
+
+        return x
+
+    def prod(self):
+        """
+        Product of all the elements of the array, computed by multiplying the two halves
+        of the array together until one element remains
+        """
+
+        array = self.reshape(-1)
+        if len(array) == 0:
+            return array.ones_like(shape=()).item()
+
+        while len(array) > 1:
+            half = len(array) // 2
+            product = array[:half] * array[half:2 * half]
+            if len(array) % 2:
+                product = product.concatenate(array[2 * half:])
+            array = product
+
+        return array[0]
+
+    def dot(self, other):
+        """
+        Dot product along the last axis of the array (vector . vector or matrix . vector)
+        """
+
+        return (self * self._coerce(other)).sum(axis=-1)
+
+
+class FieldArray(_BaseArray):
+    """
+    This class represents an array of elements from the field 'l' = k[x]/<f(x)>.
+    It is backed by a single integer ndarray of shape (..., n) holding the coefficients
+    """
+
+    def __init__(self, data, field: FiniteField, check: bool = True):
+        """
+        Generate an array of elements from the extended finite field l
+
+        Parameters
+        ----------
+        data : the coefficients of the elements, an array of shape (..., n)
+        field : the extended finite field l
+        check : if False, the coefficients are trusted to be residues modulo p: an array of the dtype
+                of the field is then used without a copy (e.g. a view on a buffer, see serialization.py)
+        """
+
+        if check:
+            self.data = np.asarray(data, dtype=field.type) % field.p
+        else:
+            self.data = np.asarray(data, dtype=field.type)
+        self.field = field
+
+        if self.data.ndim == 0 or self.data.shape[-1] != field.n:
+            error = f"The last dimension of the data must be equal to the degree of f(x) ({field.n})"
+            raise ValueError(error)
+
+    @classmethod
+    def from_elements(cls, elements: List[FiniteFieldElement], field: FiniteField = None):
+        """
+        Generate an array from a list of FiniteFieldElement objects
+        """
+
+        if field is None:
+            if not elements:
+                error = f"The field must be given for an empty list of elements"
+                raise ValueError(error)
+            field = elements[0].field
+
+        if any(element.field is not field for element in elements):
+            error = f"Cannot build an array with elements from different fields"
+            raise TypeError(error)
+
+        # The packed integers of the elements are unpacked all at once
+        if field.powers is not None:
+            values = np.array([element.value for element in elements], dtype="int64")
+            return cls(values[:, np.newaxis] // field.powers % field.p, field)
+
+        data = np.zeros((len(elements), field.n), dtype=field.type)
+        for i, element in enumerate(elements):
+            data[i] = element.coeffs
+
+        return cls(data, field)
+
+    @classmethod
+    def zeros(cls, field: FiniteField, shape=()):
+        return cls(np.zeros(np.shape(np.empty(shape)) + (field.n,), dtype=field.type), field)
+
+    @classmethod
+    def ones(cls, field: FiniteField, shape=()):
+        data = np.zeros(np.shape(np.empty(shape)) + (field.n,), dtype=field.type)
+        data[..., 0] = 1
+        return cls(data, field)
+
+    @classmethod
+    def random(cls, field: FiniteField, shape):
+        return cls(random_residues(field.p, np.shape(np.empty(shape)) + (field.n,)), field)
+
+    def random_like(self, shape=None):
+        return self.random(self.field, self.shape if shape is None else shape)
+
+    def like(self, data):
+        """
+        Returns an array of the same field holding the given coefficients
+        """
+
+        return self.__class__(data, self.field)
+
+    @classmethod
+    def geometric(cls, base, count: int):
+        """
+        Returns the array [base^0, base^1, ..., base^(count-1)]. The first block of powers is
+        computed one by one, then the whole block is multiplied by base^block to get the next one
+        """
+
+        field = base.field
+        if not isinstance(base, cls):
+            base = cls(base.coeffs, field)
+        block = max(1, min(count, int(np.ceil(np.sqrt(count)))))
+
+        first = [cls.ones(field)]
+        for _ in range(block - 1):
+            first.append(first[-1] * base)
+        current = cls(np.array([element.data for element in first]), field)
+        step = first[-1] * base
+
+        data = np.zeros((count, field.n), dtype=field.type)
+        for start in range(0, count, block):
+            size = min(block, count - start)
+            data[start:start + size] = current.data[:size]
+            current = current * step
+
+        return cls(data, field)
+
+    def pack(self):
+        """
+        Packs the coefficients of every element in one integer written in base p,
+        as FiniteFieldElement.to_int() (Python integers if they do not fit in int64)
+        """
+
+        if self.field.powers is not None:
+            return self.data @ self.field.powers
+
+        powers = np.array([self.field.p ** i for i in range(self.field.n)], dtype=object)
+        return self.data.astype(object) @ powers
+
+    def to_elements(self) -> List[FiniteFieldElement]:
+        """
+        Converts the array to a flat list of FiniteFieldElement objects
+        """
+
+        return [FiniteFieldElement(int(value), self.field) for value in self.pack().reshape(-1)]
+
+    @property
+    def shape(self):
+        return self.data.shape[:-1]
+
+    @property
+    def group_order(self):
+        return self.field.p ** self.field.n - 1
+
+    def __getitem__(self, index):
+        """
+        Indexing over the elements: returns a FiniteFieldElement for a single element, else a FieldArray
+        """
+
+        if not isinstance(index, tuple):
+            index = (index,)
+        data = self.data[index + (Ellipsis,)]
+
+        if data.ndim == 1:
+            return FiniteFieldElement(data, self.field)
+        return self.__class__(data, self.field)
+
+    def __setitem__(self, index, value):
+        if not isinstance(index, tuple):
+            index = (index,)
+        self.data[index + (Ellipsis,)] = self._coerce(value).data
+
+    def __repr__(self):
+        return f"FieldArray({self.data.tolist()}, {self.field})"
+
+    def _coerce(self, other):
+        """
+        Check that the other object is a FieldArray or a FiniteFieldElement from the same field,
+        and converts it to a FieldArray
+        """
+
+        if isinstance(other, FiniteFieldElement):
+            other = self.__class__(other.coeffs, other.field)
+
+        if not isinstance(other, FieldArray):
+            error = f"The second element is not a FieldArray or FiniteFieldElement object"
+            raise TypeError(error)
+
+        if other.field is not self.field:
+            error = f"Cannot perform the operation with elements in different finiteField {self.field} and {other.field}"
+            raise TypeError(error)
+
+        return other
+
+    def __add__(self, other):
+        other = self._coerce(other)
+        return self.__class__(self.data + other.data, self.field)
+
+    def __sub__(self, other):
+        other = self._coerce(other)
+        return self.__class__(self.data - other.data, self.field)
+
+    def __neg__(self):
+        return self.__class__(-self.data, self.field)
+
+    def __mul__(self, other):
+        """
+        Overload the * operator: the polynomials of all the elements are multiplied together,
+        and the products are reduced modulo f(x) with the reduction table of the field
+        """
+
+        other = self._coerce(other)
+        if self.field.tables is not None:
+            return self.__class__(self.field.tables.multiply(self.data, other.data), self.field)
+
+        # In characteristic 2, every element is packed in a uint64 word
+        if self.field.binary and self.field.n <= MAX_WORD_DEGREE:
+            words = multiply_words(pack_words(self.data), pack_words(other.data), self.field.n, self.field.modulus_terms)
+            return self.__class__(unpack_words(words, self.field.n), self.field)
+
+        n, p = self.field.n, self.field.p
+        a, b = np.broadcast_arrays(self.data, other.data)
+
+        product = np.zeros(a.shape[:-1] + (2 * n - 1,), dtype=self.field.type)
+        if self.field.wide:
+            # The products are reduced one by one, so that the sums cannot overflow
+            for i in range(n):
+                product[..., i:i + n] = (product[..., i:i + n] + mul_mod(a[..., i:i + 1], b, p)) % p
+        else:
+            for i in range(n):
+                product[..., i:i + n] += a[..., i:i + 1] * b
+            product %= p
+
+        return self.__class__(self.field.reduce_product(product), self.field)
+
+    __radd__ = __add__
+    __rmul__ = __mul__
+
+    def __rsub__(self, other):
+        return self._coerce(other) - self
+
+    def __rtruediv__(self, other):
+        return self._coerce(other) / self
+
+    def __eq__(self, other):
+        """
+        Elementwise comparison, returns an array of booleans
+        """
+
+        return np.all(self.data == self._coerce(other).data, axis=-1)
+
+    def is_zero(self):
+        return ~np.any(self.data, axis=-1)
+
+    def inverse(self):
+        """
+        Computes the inverse of every element, with the log tables if the field has them
+        """
+
+        if self.field.tables is not None:
+            return self.__class__(self.field.tables.inverse(self.data), self.field)
+        return super().inverse()
+
+    def __pow__(self, other):
+        """
+        Overload the ** operator, with the log tables if the field has them
+        """
+
+        if self.field.tables is not None:
+            return self.__class__(self.field.tables.power(self.data, other), self.field)
+        return super().__pow__(other)
+
+    def frobenius(self, power: int = 1):
+        """
+        Raises every element to the power p^power with the Frobenius matrix of the field
+        """
+
+        data = self.data
+        for _ in range(power % self.field.n):
+            data = self.field.linear_map(data, self.field.frobenius_matrix)
+        return self.__class__(data, self.field)
+
+    def sum(self, axis=None):
+        """
+        Sum of the elements of the array (along an axis of the elements, or of all the elements)
+        """
+
+        if axis is None:
+            data = sum_mod(self.data.reshape(-1, self.field.n), self.field.p, axis=0)
+        else:
+            axis = axis % len(self.shape)
+            data = sum_mod(self.data, self.field.p, axis=axis)
+
+        result = self.__class__(data, self.field)
+        return result.item() if result.shape == () else result
+
+    def item(self):
+        return FiniteFieldElement(self.data.reshape(self.field.n), self.field)
+
+    def where(self, mask, other):
+        """
+        Returns the elements of self where mask is True and the elements of other elsewhere
+        """
+
+        other = self._coerce(other)
+        return self.__class__(np.where(np.asarray(mask)[..., np.newaxis], self.data, other.data), self.field)
+
+    def reshape(self, *shape):
+        return self.__class__(self.data.reshape(*shape, self.field.n), self.field)
+
+    def broadcast_to(self, shape):
+        return self.__class__(np.broadcast_to(self.data, tuple(shape) + (self.field.n,)), self.field)
+
+    def concatenate(self, other):
+        return self.__class__(np.concatenate((self.data, self._coerce(other).data)), self.field)
+
+    def zeros_like(self, shape=None):
+        return self.zeros(self.field, self.shape if shape is None else shape)
+
+    def ones_like(self, shape=None):
+        return self.ones(self.field, self.shape if shape is None else shape)
+
+
+class PrimeFieldArray(_BaseArray):
+    """
+    This class represents an array of elements from the prime field k = F_p.
+    It is backed by a single integer ndarray holding the values
+    """
+
+    def __init__(self, data, p: int, check: bool = True):
+        """
+        Generate an array of elements from the prime field k
+
+        Parameters
+        ----------
+        data : the values of the elements, an array of integers
+        p : a prime number defining the prime field
+        check : if False, the values are trusted to be residues modulo p: an array of the dtype
+                of the field is then used without a copy (e.g. a view on a buffer, see serialization.py)
+        """
+
+        # (the operators of a 0-d object array return a Python integer, not an array)
+        if check:
+            self.data = np.asarray(np.asarray(data, dtype=select_dtype(p)) % p)
+        else:
+            self.data = np.asarray(data, dtype=select_dtype(p))
+        self.p = p
+
+    @classmethod
+    def from_elements(cls, elements: List[PrimeFieldElement], p: int = None):
+        """
+        Generate an array from a list of PrimeFieldElement objects
+        """
+
+        if p is None:
+            if not elements:
+                error = f"The prime must be given for an empty list of elements"
+                raise ValueError(error)
+            p = elements[0].p
+
+        if any(element.p != p for element in elements):
+            error = f"Cannot build an array with elements from different PrimeFields"
+            raise TypeError(error)
+
+        return cls([element.a for element in elements], p)
+
+    @classmethod
+    def zeros(cls, p: int, shape=()):
+        return cls(np.zeros(shape, dtype=select_dtype(p)), p)
+
+    @classmethod
+    def ones(cls, p: int, shape=()):
+        return cls(np.ones(shape, dtype=select_dtype(p)), p)
+
+    @classmethod
+    def random(cls, p: int, shape):
+        return cls(random_residues(p, shape), p)
+
+    def random_like(self, shape=None):
+        return self.random(self.p, self.shape if shape is None else shape)
+
+    def like(self, data):
+        """
+        Returns an array of the same prime field holding the given values
+        """
+
+        return self.__class__(data, self.p)
+
+    def to_elements(self) -> List[PrimeFieldElement]:
+        """
+        Converts the array to a flat list of PrimeFieldElement objects
+        """
+
+        return [PrimeFieldElement(int(a), self.p, False) for a in self.data.reshape(-1)]
+
+    @property
+    def shape(self):
+        return self.data.shape
+
+    @property
+    def group_order(self):
+        return self.p - 1
+
+    def __getitem__(self, index):
+        """
+        Indexing over the elements: returns a PrimeFieldElement for a single element, else a PrimeFieldArray
+        """
+
+        data = self.data[index]
+        if np.ndim(data) == 0:
+            return PrimeFieldElement(int(data), self.p, False)
+        return self.__class__(data, self.p)
+
+    def __setitem__(self, index, value):
+        self.data[index] = self._coerce(value).data
+
+    def __repr__(self):
+        return f"PrimeFieldArray({self.data.tolist()}, p={self.p})"
+
+    def _coerce(self, other):
+        """
+        Check that the other object is a PrimeFieldArray, a PrimeFieldElement or an int,
+        and converts it to a PrimeFieldArray
+        """
+
+        if isinstance(other, PrimeFieldElement):
+            other = self.__class__(other.a, other.p)
+        elif isinstance(other, int):
+            other = self.__class__(other, self.p)
+
+        if not isinstance(other, PrimeFieldArray):
+            error = f"The second element is not a PrimeFieldArray or PrimeFieldElement object"
+            raise TypeError(error)
+
+        if other.p != self.p:
+            error = f"Cannot perform the operation with two arrays in different PrimeFields {self.p} and {other.p}"
+            raise TypeError(error)
+
+        return other
+
+    def __add__(self, other):
+        return self.__class__(self.data + self._coerce(other).data, self.p)
+
+    def __sub__(self, other):
+        return self.__class__(self.data - self._coerce(other).data, self.p)
+
+    def __neg__(self):
+        return self.__class__(-self.data, self.p)
+
+    def __mul__(self, other):
+        return self.__class__(mul_mod(self.data, self._coerce(other).data, self.p), self.p)
+
+    def dot(self, other):
+        """
+        Dot product along the last axis of the array. When the whole sum fits in int64,
+        the products are not reduced one by one: only the sum is reduced modulo p
+        """
+
+        other = self._coerce(other)
+        terms = np.broadcast_shapes(self.data.shape, other.data.shape)[-1]
+        if self.data.dtype == object or not fits_int64(self.p, terms):
+            return super().dot(other)
+
+        result = self.__class__((self.data * other.data).sum(axis=-1), self.p)
+        return result.item() if result.shape == () else result
+
+    __radd__ = __add__
+    __rmul__ = __mul__
+
+    def __rsub__(self, other):
+        return self._coerce(other) - self
+
+    def __rtruediv__(self, other):
+        return self._coerce(other) / self
+
+    def __eq__(self, other):
+        """
+        Elementwise comparison, returns an array of booleans
+        """
+
+        return self.data == self._coerce(other).data
+
+    def is_zero(self):
+        return self.data == 0
+
+    def sum(self, axis=None):
+        """
+        Sum of the elements of the array (along an axis, or of all the elements)
+        """
+
+        result = self.__class__(sum_mod(self.data, self.p, axis=axis), self.p)
+        return result.item() if result.shape == () else result
+
+    def item(self):
+        return PrimeFieldElement(int(self.data), self.p, False)
+
+    def where(self, mask, other):
+        """
+        Returns the elements of self where mask is True and the elements of other elsewhere
+        """
+
+        return self.__class__(np.where(mask, self.data, self._coerce(other).data), self.p)
+
+    def reshape(self, *shape):
+        return self.__class__(self.data.reshape(*shape), self.p)
+
+    def broadcast_to(self, shape):
+        return self.__class__(np.broadcast_to(self.data, shape), self.p)
+
+    def concatenate(self, other):
+        return self.__class__(np.concatenate((self.data, self._coerce(other).data)), self.p)
+
+    def zeros_like(self, shape=None):
+        return self.zeros(self.p, self.shape if shape is None else shape)
+
+    def ones_like(self, shape=None):
+        return self.ones(self.p, self.shape if shape is None else shape)
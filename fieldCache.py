@@ -0,0 +1,236 @@
+"""
+Persistent cache of the precomputed data of a finite field (generator, factorization of p^n - 1,
+reduction table, log / antilog tables), shared between processes.
+
+Each field is stored in one binary file:
+    magic (4 bytes) | version (uint32) | header length (uint32) | JSON header | padding | arrays
+The arrays are aligned on 64 bytes and loaded with np.memmap, so all the processes using the
+same field share the same memory pages without copying them.
+"""
+
+import hashlib
+import json
+import os
+import struct
+import tempfile
+import weakref
+from typing import List
+import numpy as np
+from factorization import is_prime
+from finiteField import FiniteField
+from fieldTables import FieldTables
+
+MAGIC = b"PFFC"
+VERSION = 1
+ALIGNMENT = 64
+
+# The directory can be changed with the PRIME_FIELDS_CACHE environment variable
+DEFAULT_DIRECTORY = os.path.join(os.path.expanduser("~"), ".cache", "prime-fields")
+
+# The memory-mapped tables read by load_field() for the fields which were not asked for them:
+# the fields are shared (interned), so their tables are only attached on request
+loaded_tables = weakref.WeakKeyDictionary()
+
+
+def cache_directory(directory: str = None) -> str:
+    """
+    Returns the directory of the cache
+    """
+
+    if directory is not None:
+        return directory
+    return os.environ.get("PRIME_FIELDS_CACHE", DEFAULT_DIRECTORY)
+
+
+def cache_path(p: int, f_coeffs: List[int], directory: str = None) -> str:
+    """
+    Returns the path of the cache file of the field k[x]/<f(x)>
+    """
+
+    key = f"{p}:{[int(coeff) % p for coeff in f_coeffs]}"
+    digest = hashlib.sha1(key.encode()).hexdigest()[:16]
+    return os.path.join(cache_directory(directory), f"gf_{p}_{len(f_coeffs) - 1}_{digest}.bin")
+
+
+def save_field(field: FiniteField, directory: str = None) -> str:
+    """
+    Writes the precomputed data of the field to its cache file and returns the path of the file.
+    The generator and the factorization of p^n - 1 are computed if needed
+    """
+
+    # The Python integers of the fields with p >= 2^62 cannot be memory-mapped: their reduction table is rebuilt
+    arrays = {"reduction_table": field.reduction_table} if field.type == "int64" else {}
+    if field.tables is not None:
+        arrays["exp"] = field.tables.exp
+        arrays["log"] = field.tables.log
+        arrays["zech"] = field.tables.zech
+
+    header = {
+        "p": field.p,
+        "f_coeffs": [int(coeff) % field.p for coeff in field.f_coeffs],
+        "factorization": [[prime, exponent] for prime, exponent in field.group_order_factorization().items()],
+        "generator": [int(coeff) for coeff in field.multiplicative_group().coeffs],
+        "arrays": {},
+    }
+
+    # Compute the offset of every array, relative to the start of the data section
+    offset = 0
+    for name, array in arrays.items():
+        header["arrays"][name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+
+    encoded = json.dumps(header).encode()
+    start = -(-(len(MAGIC) + 8 + len(encoded)) // ALIGNMENT) * ALIGNMENT
+
+    path = cache_path(field.p, header["f_coeffs"], directory)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    # Write to a temporary file first, so that a process never reads a partial file
+    descriptor, temporary = tempfile.mkstemp(dir=os.path.dirname(path))
+    with os.fdopen(descriptor, "wb") as file:
+        file.write(MAGIC + struct.pack("<II", VERSION, len(encoded)) + encoded)
+        file.write(b"\0" * (start - file.tell()))
+        for name, array in arrays.items():
+            file.seek(start + header["arrays"][name]["offset"])
+            file.write(np.ascontiguousarray(array).tobytes())
+
+    # mkstemp creates the file readable by its owner only
+    os.chmod(temporary, 0o644)
+    os.replace(temporary, path)
+
+    return path
+
+
+def read_header(path: str):
+    """
+    Reads the header of a cache file. Returns (header, start of the data section), or None if the
+    file is missing, has another version, or is shorter than the arrays described by its header
+    """
+
+    try:
+        with open(path, "rb") as file:
+            magic = file.read(len(MAGIC))
+            version, length = struct.unpack("<II", file.read(8))
+            header = json.loads(file.read(length))
+            size = os.fstat(file.fileno()).st_size
+    except (OSError, struct.error, ValueError):
+        return None
+
+    if magic != MAGIC or version != VERSION or not isinstance(header, dict):
+        return None
+
+    # A truncated file (e.g. a disk full while writing) is not mapped
+    start = -(-(len(MAGIC) + 8 + length) // ALIGNMENT) * ALIGNMENT
+    try:
+        for description in header["arrays"].values():
+            nbytes = np.dtype(description["dtype"]).itemsize * int(np.prod(description["shape"]))
+            if start + description["offset"] + nbytes > size:
+                return None
+    except (KeyError, TypeError, ValueError, AttributeError):
+        return None
+
+    return header, start
+
+
+def load_field(field: FiniteField, directory: str = None, tables: bool = False) -> bool:
+    """
+    Fills the caches of the field from its cache file (with memory-mapped arrays).
+    Returns False if there is no valid cache file for this field: a corrupt file is not used
+    and the field is left unchanged, so that the data is computed again.
+    The data already computed by the field is kept, and the log / antilog tables of the file
+    are attached to the field only if tables is True (otherwise they are kept in loaded_tables)
+    """
+
+    path = cache_path(field.p, field.f_coeffs, directory)
+    result = read_header(path)
+    if result is None:
+        return False
+    header, start = result
+
+    # We import FiniteFieldElement inside the function to prevent circular imports
+    from finiteFieldElement import FiniteFieldElement
+
+    order = field.p ** field.n - 1
+
+    try:
+        # Check the field itself, in case of a collision of the file names
+        if header["p"] != field.p or header["f_coeffs"] != [int(coeff) % field.p for coeff in field.f_coeffs]:
+            return False
+
+        arrays = {}
+        for name, description in header["arrays"].items():
+            dtype, shape = np.dtype(description["dtype"]), tuple(description["shape"])
+
+            # np.memmap cannot map an empty array
+            if 0 in shape:
+                arrays[name] = np.zeros(shape, dtype=dtype)
+                continue
+
+            arrays[name] = np.memmap(path, dtype=dtype, mode="r", offset=start + description["offset"], shape=shape)
+
+        # The factorization must be the one of p^n - 1, and the generator must be primitive for it
+        factorization = {int(prime): int(exponent) for prime, exponent in header["factorization"]}
+        product = 1
+        for prime, exponent in factorization.items():
+            if exponent < 1 or not is_prime(prime):
+                return False
+            product *= prime ** exponent
+        if product != order:
+            return False
+
+        generator = FiniteFieldElement(header["generator"], field)
+        one = generator.one()
+        if generator.is_zero() or any(generator ** (order // prime) == one for prime in factorization):
+            return False
+
+        # The reduction table of the field is already computed, the one of the file must be the same
+        if "reduction_table" in arrays and not np.array_equal(arrays["reduction_table"], field.reduction_table):
+            return False
+
+        loaded = None
+        if "exp" in arrays:
+            if arrays["exp"].shape != (2 * order,) or arrays["log"].shape != (order + 1,) or arrays["zech"].shape != (order,):
+                return False
+            loaded = FieldTables(field, arrays["exp"], arrays["log"], arrays["zech"])
+
+    except (KeyError, TypeError, ValueError, OSError):
+        return False
+
+    if field._factorization is None:
+        field._factorization = factorization
+    if field._generator is None:
+        field._generator = generator
+
+    # The tables the field already has are never replaced
+    if loaded is not None and field.tables is None:
+        if tables:
+            field.tables = loaded
+        else:
+            loaded_tables[field] = loaded
+
+    return True
+
+
+def cached_field(p: int, f_coeffs: List[int], directory: str = None, tables: bool = False) -> FiniteField:
+    """
+    Builds the field k[x]/<f(x)> with its precomputed data loaded from the cache.
+    On a cache miss, the data is computed and written to the cache for the next processes
+
+    Parameters
+    ----------
+    p : a prime number defining the prime field
+    f_coeffs : the coefficients for f(x) represented as [a_0, ..., a_{n-1}]
+    directory : the directory of the cache
+    tables : if True, the log / antilog tables are built (and cached) too
+    """
+
+    field = FiniteField(p, f_coeffs)
+
+    if load_field(field, directory, tables) and (field.tables is not None or not tables):
+        return field
+
+    if tables:
+        field.build_tables()
+    save_field(field, directory)
+
+    return field
@@ -0,0 +1,360 @@
+"""
+Matrices over the prime field k or over an extended field l, and the linear algebra on them.
+
+The entries are stored in one PrimeFieldArray or FieldArray of shape (rows, cols). The Gaussian
+elimination works one pivot at a time: the pivot row is scaled by the inverse of its pivot (one
+element inversion) and is then subtracted from all the other rows at once, as one product of a
+column by a row on the whole remaining submatrix.
+"""
+
+from typing import List
+import numpy as np
+from finiteField import FiniteField
+from fieldArray import _BaseArray, FieldArray, PrimeFieldArray
+from primeFieldElement import PrimeFieldElement
+from modularReduction import fits_int64, mul_mod
+
+
+class FieldMatrix:
+    """
+    This class represents a matrix with entries in k or in l
+    """
+
+    def __init__(self, entries, field=None):
+        """
+        Generate a matrix from its entries
+
+        Parameters
+        ----------
+        entries : a PrimeFieldArray or a FieldArray of shape (rows, cols), or a list of rows, each row
+                  being a list of PrimeFieldElement or FiniteFieldElement objects or of integers
+        field : the field of the entries, a FiniteField or a prime p for the prime field k.
+                It is needed for the lists of integers
+        """
+
+        if not isinstance(entries, _BaseArray):
+            entries = [list(row) for row in entries]
+            rows = len(entries)
+            cols = len(entries[0]) if rows else 0
+            if any(len(row) != cols for row in entries):
+                error = f"All the rows of the matrix must have the same length"
+                raise ValueError(error)
+
+            flat = [entry for row in entries for entry in row]
+            if field is None:
+                if not flat or isinstance(flat[0], (int, np.integer)):
+                    error = f"The field must be given for a matrix of integers or an empty matrix"
+                    raise ValueError(error)
+                field = flat[0].p if isinstance(flat[0], PrimeFieldElement) else flat[0].field
+
+            entries = _from_list(flat, field).reshape(rows, cols)
+
+        if len(entries.shape) != 2:
+            error = f"The entries of a matrix must have 2 dimensions (instead of {len(entries.shape)})"
+            raise ValueError(error)
+
+        self.entries = entries
+
+        # The field of the entries: a FiniteField, or the prime p for k
+        self.field = entries.field if isinstance(entries, FieldArray) else entries.p
+
+    @classmethod
+    def zeros(cls, field, shape):
+        """
+        The zero matrix of the given shape, over a FiniteField or over the prime field of p elements
+        """
+
+        if isinstance(field, FiniteField):
+            return cls(FieldArray.zeros(field, shape))
+        return cls(PrimeFieldArray.zeros(field, shape))
+
+    @classmethod
+    def identity(cls, field, size: int):
+        """
+        The identity matrix of size x size
+        """
+
+        result = cls.zeros(field, (size, size))
+        diagonal = np.arange(size)
+        result.entries[diagonal, diagonal] = result.entries.ones_like((size,))
+        return result
+
+    @classmethod
+    def random(cls, field, shape):
+        """
+        A matrix of uniform random entries
+        """
+
+        if isinstance(field, FiniteField):
+            return cls(FieldArray.random(field, shape))
+        return cls(PrimeFieldArray.random(field, shape))
+
+    @property
+    def shape(self):
+        return self.entries.shape
+
+    @property
+    def T(self):
+        """
+        The transposed matrix
+        """
+
+        return self.__new(np.swapaxes(self.entries.data, 0, 1))
+
+    def __new(self, data):
+        return self.__class__(self.entries.like(data))
+
+    def copy(self):
+        return self.__new(self.entries.data.copy())
+
+    def __getitem__(self, index):
+        """
+        Indexing over the entries: returns an element, or an array for a row or a column
+        """
+
+        return self.entries[index]
+
+    def __setitem__(self, index, value):
+        self.entries[index] = value
+
+    def __check(self, other):
+        """
+        Check if the other object is a matrix over the same field
+        """
+
+        if not isinstance(other, FieldMatrix):
+            error = f"The second element is not a FieldMatrix object"
+            raise TypeError(error)
+
+        if other.field != self.field:
+            error = f"Cannot perform the operation with matrices over different fields"
+            raise TypeError(error)
+
+    def __add__(self, other):
+        self.__check(other)
+        return self.__class__(self.entries + other.entries)
+
+    def __sub__(self, other):
+        self.__check(other)
+        return self.__class__(self.entries - other.entries)
+
+    def __neg__(self):
+        return self.__class__(-self.entries)
+
+    def __mul__(self, other):
+        """
+        Overload the * operator: product by a scalar (an element of the field)
+        """
+
+        return self.__class__(self.entries * other)
+
+    __rmul__ = __mul__
+
+    def __matmul__(self, other):
+        """
+        Overload the @ operator: product by a matrix, or by a vector given as a 1-dimensional array
+        """
+
+        if isinstance(other, _BaseArray):
+            return (self @ self.__class__(other.reshape(-1, 1))).entries.reshape(-1)
+
+        self.__check(other)
+        (rows, inner), (_, cols) = self.shape, other.shape
+        if inner != other.shape[0]:
+            error = f"Cannot multiply matrices of shapes {self.shape} and {other.shape}"
+            raise ValueError(error)
+
+        # Over k, the dot products are computed in int64 when they cannot overflow
+        a, b = self.entries, other.entries
+        if isinstance(a, PrimeFieldArray) and (a.data.dtype == object or fits_int64(self.field, inner)):
+            return self.__new(a.data @ b.data % self.field)
+
+        # Else, one product of a column by a row at a time
+        result = a.zeros_like((rows, cols))
+        for j in range(inner):
+            result = result + a[:, j:j + 1] * b[j:j + 1, :]
+        return self.__class__(result)
+
+    def __eq__(self, other):
+        if not isinstance(other, FieldMatrix):
+            return False
+        return self.field == other.field and np.array_equal(self.entries.data, other.entries.data)
+
+    def __repr__(self):
+        return f"FieldMatrix({self.entries.data.tolist()})"
+
+    def __eliminate(self, reduced: bool = True):
+        """
+        Gaussian elimination. Returns (echelon, pivots, determinant) where echelon is the row echelon form
+        (the reduced one if reduced is True, else only the rows below the pivots are eliminated),
+        pivots are the columns of the pivots and determinant is the product of the pivots, with the
+        sign of the row swaps (the determinant of a square matrix if it has full rank)
+        """
+
+        entries = self.entries.like(self.entries.data.copy())
+        rows, cols = self.shape
+        determinant = entries.ones_like((1,))
+        pivots = []
+
+        for c in range(cols):
+            r = len(pivots)
+            if r == rows:
+                break
+
+            # The first row with a non-zero entry in the column c
+            candidates = np.flatnonzero(~np.asarray(entries[r:, c].is_zero()))
+            if len(candidates) == 0:
+                continue
+
+            s = r + int(candidates[0])
+            if s != r:
+                entries[[r, s]] = entries[[s, r]]
+                determinant = -determinant
+
+            # The pivot row is normalized with one inversion, and the columns before c are zero in it
+            pivot = entries[r, c]
+            determinant = determinant * pivot
+            row = entries[r:r + 1, c:] * pivot.inverse()
+
+            # All the other rows (or the rows below) minus their entry in the column c times the pivot row
+            _subtract_outer(entries, 0 if reduced else r + 1, c, row)
+            entries[r:r + 1, c:] = row
+            pivots.append(c)
+
+        return self.__class__(entries), pivots, determinant
+
+    def rref(self):
+        """
+        Returns the reduced row echelon form of the matrix and the list of the columns of its pivots
+        """
+
+        echelon, pivots, _ = self.__eliminate()
+        return echelon, pivots
+
+    def rank(self) -> int:
+        return len(self.__eliminate(reduced=False)[1])
+
+    def det(self):
+        """
+        Determinant of a square matrix, as an element of the field
+        """
+
+        rows, cols = self.shape
+        if rows != cols:
+            error = f"The determinant is defined for square matrices (instead of {self.shape})"
+            raise ValueError(error)
+
+        _, pivots, determinant = self.__eliminate(reduced=False)
+        if len(pivots) < rows:
+            return determinant.zeros_like(()).item()
+        return determinant[0]
+
+    def inverse(self):
+        """
+        Inverse of a square matrix, as the solution X of A X = I
+        """
+
+        rows, cols = self.shape
+        if rows != cols:
+            error = f"Only a square matrix can be inverted (instead of {self.shape})"
+            raise ValueError(error)
+
+        # A X = I has no solution when A is singular
+        try:
+            return self.solve(self.identity(self.field, rows))
+        except ValueError:
+            error = f"The matrix is not invertible"
+            raise ZeroDivisionError(error) from None
+
+    def solve(self, b):
+        """
+        Returns a solution x of A x = b, where b is a vector (a 1-dimensional array) or a matrix.
+        Raises a ValueError if the system has no solution (see nullspace() for all the solutions)
+        """
+
+        vector = isinstance(b, _BaseArray)
+        if vector:
+            b = self.__class__(b.reshape(-1, 1))
+
+        self.__check(b)
+        rows, cols = self.shape
+        if b.shape[0] != rows:
+            error = f"The right-hand side must have {rows} rows (instead of {b.shape[0]})"
+            raise ValueError(error)
+
+        echelon, pivots, _ = self.concatenate(b).__eliminate(reduced=False)
+        if pivots and pivots[-1] >= cols:
+            error = f"The system has no solution"
+            raise ValueError(error)
+
+        # Back substitution on the right-hand side, from the last pivot row (the pivots are 1)
+        left, right = echelon.entries[:, :cols], echelon.entries[:len(pivots), cols:]
+        for i in range(len(pivots) - 1, 0, -1):
+            right[:i] = right[:i] - left[:i, pivots[i]:pivots[i] + 1] * right[i:i + 1]
+
+        # The pivot variables take the values of the right-hand side, the free variables are 0
+        solution = right.zeros_like((cols, b.shape[1]))
+        solution[pivots] = right
+        if vector:
+            return solution.reshape(-1)
+        return self.__class__(solution)
+
+    def nullspace(self):
+        """
+        Returns a basis of the kernel {x : A x = 0}, as the rows of a matrix
+        """
+
+        echelon, pivots = self.rref()
+        cols = self.shape[1]
+        free = [c for c in range(cols) if c not in set(pivots)]
+
+        # For the free column f: x_f = 1, and x_c = -R[i, f] for the pivot c of the row i
+        basis = echelon.entries.zeros_like((len(free), cols))
+        if free:
+            basis[np.arange(len(free)), free] = basis.ones_like((len(free),))
+            if pivots:
+                block = echelon.entries[:len(pivots)][:, free]
+                basis[:, pivots] = -block.like(np.swapaxes(block.data, 0, 1))
+        return self.__class__(basis)
+
+    def concatenate(self, other):
+        """
+        The matrix [A | B] made of the columns of A followed by the columns of B
+        """
+
+        self.__check(other)
+        return self.__new(np.concatenate((self.entries.data, other.entries.data), axis=1))
+
+
+def _subtract_outer(entries, start: int, c: int, row):
+    """
+    Subtracts from the rows start, start + 1, ... of the entries (from the column c) their entry
+    in the column c times the row. Over k, when the products fit in int64, the residues are updated in place
+    """
+
+    if isinstance(entries, PrimeFieldArray) and entries.data.dtype != object:
+        block = entries.data[start:, c:]
+        if fits_int64(entries.p):
+            block -= entries.data[start:, c:c + 1] * row.data
+        else:
+            block -= mul_mod(entries.data[start:, c:c + 1], row.data, entries.p)
+        block %= entries.p
+    else:
+        entries[start:, c:] = entries[start:, c:] - entries[start:, c:c + 1] * row
+
+
+def _from_list(elements: List, field):
+    """
+    Converts a flat list of elements or of integers to an array over the field
+    """
+
+    if all(isinstance(element, (int, np.integer)) for element in elements):
+        if isinstance(field, FiniteField):
+            data = np.zeros((len(elements), field.n), dtype=field.type)
+            data[:, 0] = [int(element) % field.p for element in elements]
+            return FieldArray(data, field)
+        return PrimeFieldArray([int(element) % field for element in elements], field)
+
+    if isinstance(field, FiniteField):
+        return FieldArray.from_elements(elements, field)
+    return PrimeFieldArray.from_elements(elements, field)
@@ -0,0 +1,201 @@
+"""
+Log / antilog (and Zech log) tables of a finite field, built from a generator gamma of l*.
+
+An element is identified by the integer packing its coefficients in base p:
+[a_0, ..., a_{n-1}] -> a_0 + a_1 p + ... + a_{n-1} p^{n-1}.
+With exp[k] = gamma^k and log[exp[k]] = k, the multiplication, the division and the
+exponentiation become additions of logarithms and one table lookup.
+"""
+
+import time
+import numpy as np
+
+# Logarithm stored for the zero element (and Zech logarithm of -1)
+NO_LOG = -1
+
+
+def smallest_dtype(max_value: int, signed: bool = False):
+    """
+    Returns the smallest NumPy integer dtype able to store the values up to max_value
+    """
+
+    for bits in (8, 16, 32, 64):
+        if signed and max_value < 2 ** (bits - 1):
+            return np.dtype(f"int{bits}")
+        if not signed and max_value < 2 ** bits:
+            return np.dtype(f"uint{bits}")
+
+    error = f"No integer dtype can store the value {max_value}"
+    raise OverflowError(error)
+
+
+class FieldTables:
+    """
+    This class holds the exp, log and Zech log tables of a finite field
+    """
+
+    def __init__(self, field, exp, log, zech, build_time: float = 0.0):
+        """
+        Parameters
+        ----------
+        field : the FiniteField of the tables, whose powers p^i pack the coefficients
+        exp : exp[k] = gamma^k (packed), stored twice so that exp[k1 + k2] needs no reduction
+        log : log[x] = k such that gamma^k = x, and NO_LOG for x = 0
+        zech : zech[k] = log(1 + gamma^k), and NO_LOG when 1 + gamma^k = 0
+        build_time : the time needed to build the tables, in seconds
+        """
+
+        self.p = field.p
+        self.n = field.n
+        self.order = field.size - 1
+        self.exp = exp
+        self.log = log
+        self.zech = zech
+        self.build_time = build_time
+
+        # The tables exist only for small fields, whose packed integers fit in int64
+        self.powers = field.powers
+
+    @classmethod
+    def build(cls, field):
+        """
+        Builds the tables of the field, from the generator found by multiplicative_group()
+        """
+
+        # We import FieldArray inside the method to prevent circular imports
+        from fieldArray import FieldArray
+
+        start = time.perf_counter()
+        p, n = field.p, field.n
+        order = p ** n - 1
+        gamma = field.multiplicative_group()
+
+        exp = np.zeros(2 * order, dtype=smallest_dtype(order))
+        exp[:order] = FieldArray.geometric(gamma, order).data @ field.powers
+        exp[order:] = exp[:order]
+
+        log = np.full(order + 1, NO_LOG, dtype=smallest_dtype(order, signed=True))
+        log[exp[:order]] = np.arange(order)
+
+        # zech[k] = log(1 + gamma^k): adding 1 only changes the constant coefficient a_0
+        values = exp[:order].astype("int64")
+        plus_one = values - values % p + (values % p + 1) % p
+        zech = log[plus_one]
+
+        return cls(field, exp, log, zech, time.perf_counter() - start)
+
+    @property
+    def nbytes(self):
+        """
+        Memory used by the tables, in bytes
+        """
+
+        return self.exp.nbytes + self.log.nbytes + self.zech.nbytes
+
+    def __repr__(self):
+        return f"Field tables p={self.p}, n={self.n}: {self.nbytes} bytes, built in {self.build_time:.3f}s"
+
+    def pack(self, coeffs):
+        """
+        Converts coefficients of shape (..., n) to the integers indexing the tables
+        """
+
+        return np.asarray(coeffs, dtype="int64") @ self.powers
+
+    def unpack(self, values):
+        """
+        Converts integers to coefficients of shape (..., n)
+        """
+
+        values = np.asarray(values, dtype="int64")
+        return (values[..., np.newaxis] // self.powers) % self.p
+
+    def multiply(self, a, b):
+        """
+        Multiply elements given by their coefficients: gamma^i * gamma^j = gamma^(i+j)
+        """
+
+        log_a = self.log[self.pack(a)].astype("int64")
+        log_b = self.log[self.pack(b)].astype("int64")
+
+        result = self.exp[np.where((log_a == NO_LOG) | (log_b == NO_LOG), 0, log_a + log_b)]
+        result = np.where((log_a == NO_LOG) | (log_b == NO_LOG), 0, result)
+        return self.unpack(result)
+
+    def inverse(self, a):
+        """
+        Inverse of elements given by their coefficients: (gamma^i)^-1 = gamma^(order-i)
+        """
+
+        log_a = self.log[self.pack(a)].astype("int64")
+        if np.any(log_a == NO_LOG):
+            error = f"The zero element does not have an inverse"
+            raise ZeroDivisionError(error)
+
+        return self.unpack(self.exp[(self.order - log_a) % self.order])
+
+    def power(self, a, exponent):
+        """
+        Exponentiation of elements given by their coefficients: (gamma^i)^e = gamma^(i*e mod order)
+        """
+
+        log_a = self.log[self.pack(a)].astype("int64")
+        exponent = np.asarray(exponent)
+
+        zeros = log_a == NO_LOG
+        if np.any(zeros & (exponent < 0)):
+            error = f"The zero element does not have an inverse"
+            raise ZeroDivisionError(error)
+
+        # Python integers avoid the overflow of log_a * exponent for large exponents
+        logs = (log_a.astype(object) * (exponent % self.order)) % self.order
+        result = self.exp[np.asarray(logs, dtype="int64")]
+        result = np.where(zeros & (exponent != 0), 0, result)
+        return self.unpack(result)
+
+    def multiply_values(self, a: int, b: int) -> int:
+        """
+        Product of two elements given by their packed integers, with two lookups in log and one in exp
+        """
+
+        if a == 0 or b == 0:
+            return 0
+        return int(self.exp[int(self.log[a]) + int(self.log[b])])
+
+    def inverse_value(self, a: int) -> int:
+        """
+        Inverse of a non-zero element given by its packed integer
+        """
+
+        return int(self.exp[-int(self.log[a]) % self.order])
+
+    def power_value(self, a: int, exponent: int) -> int:
+        """
+        a^exponent for a non-zero element given by its packed integer
+        """
+
+        return int(self.exp[int(self.log[a]) * exponent % self.order])
+
+    def negate_value(self, a: int) -> int:
+        """
+        Opposite of an element given by its packed integer: -1 = gamma^(order/2) for p odd
+        """
+
+        if a == 0 or self.p == 2:
+            return a
+        return int(self.exp[int(self.log[a]) + self.order // 2])
+
+    def add_values(self, a: int, b: int) -> int:
+        """
+        Addition of two elements given by their packed integers, in the log domain with the Zech logarithm:
+        gamma^i + gamma^j = gamma^i (1 + gamma^(j-i)) = gamma^(i + zech[j-i])
+        """
+
+        if a == 0:
+            return b
+        if b == 0:
+            return a
+
+        log_a = int(self.log[a])
+        z = int(self.zech[(int(self.log[b]) - log_a) % self.order])
+        return 0 if z == NO_LOG else int(self.exp[log_a + z])
@@ -1,66 +1,149 @@
+import weakref
 from typing import List
 import numpy as np
+from factorization import factorize_group_order
+from primePolynomial import poly_mul, poly_powmod, is_irreducible, ARRAY_THRESHOLD
+from fieldTables import FieldTables
+from modularReduction import select_dtype, fits_int64, mul_mod, random_residues
+from binaryField import pack_bits, unpack_bits, modulus_terms, clmul, reduce as binary_reduce
+
+
+def monic_coeffs(p: int, f_coeffs: List[int]) -> List[int]:
+    """
+    Divides f(x) by its leading coefficient modulo p, so that the coefficient a_n equals 1
+    """
+
+    if f_coeffs[-1] % p == 0:
+        error = f"Last coefficient of f cannot be 0"
+        raise ValueError(error)
+
+    inverse = pow(int(f_coeffs[-1]), -1, p)
+    return [int(coeff) * inverse % p for coeff in f_coeffs]
 
 
 class FiniteField:
     """
-    This class represents the field 'l' = k[x]/<f(x)>
+    This class represents the field 'l' = k[x]/<f(x)>.
+    The fields are interned: building the same field twice returns the same object,
+    so that two fields are equal only if they are the same object
     """
 
-    def __init__(self, p: int, f_coeffs: List[int]):
+    # The fields which exist, keyed by (p, coefficients of the monic f). The entries are removed
+    # when the fields are not used anymore
+    _registry = weakref.WeakValueDictionary()
+
+    def __new__(cls, p: int, f_coeffs: List[int], check_irreducible: bool = True):
         """
-        We assume that p is indeed prime, and f is indeed irreducible.
+        Returns the existing field with the same p and f(x) (up to the leading coefficient), if any
+        """
+
+        field = cls._registry.get((p, tuple(monic_coeffs(p, f_coeffs))))
+        if field is not None:
+            return field
+        return super().__new__(cls)
+
+    def __init__(self, p: int, f_coeffs: List[int], check_irreducible: bool = True):
+        """
+        We assume that p is indeed prime. f is checked to be irreducible with Rabin's test,
+        unless check_irreducible is False (for trusted inputs).
 
         Parameters
         ----------
         p : a prime number defining the prime field
         f_coeffs : the coefficients for f(x) represented as [a_0, ..., a_{n-1}]
+        check_irreducible : if True, raises a ValueError when f is not irreducible in k.
+                            An interned field built without the check is checked when it is
+                            built again with the check
 
         """
 
-        if f_coeffs[-1] == 0:
-            error = f"Last coefficient of f cannot be 0"
-            raise ValueError(error)
+        # An interned field returned by __new__ is already initialized, but it may not be checked yet
+        if "key" in self.__dict__:
+            if check_irreducible and not self.verified:
+                self.__verify()
+            return
+
+        # We want that coeffient a_n equals 1
+        f_coeffs = monic_coeffs(p, f_coeffs)
+
+        # Whether f is known to be irreducible: the fields built without the check are trusted by
+        # their caller only, and an interned field is checked on the first request with the check
+        self.verified = False
+        if check_irreducible:
+            self.__verify(f_coeffs, p)
 
-        # Define the type of the matrices (int or float)
-        self.type = "int32" if f_coeffs[-1] == 1 else "float64"
+        # Define the type of the coefficients (int64, or Python integers for p >= 2^62)
+        self.type = select_dtype(p)
 
         self.p = p
         self.f_coeffs = np.array(f_coeffs, dtype=self.type)
 
-        # We want that coeffient a_{n-1} equals 1
-        if self.f_coeffs[-1] != 1:
-            self.f_coeffs /= self.f_coeffs[-1]
-
         self.n = len(f_coeffs) - 1  # degree of f(x)
-        self.root = self.__find_root()
+
+        # If a dot product of length n may overflow int64, the products are reduced one by one
+        self.wide = not fits_int64(p, self.n)
+
         self.residue = self.__find_residue()
         self.identity = np.identity(self.n, dtype=self.type)
+        self.size = p ** self.n  # number of elements of l
+
+        # The powers p^i used to pack the coefficients of many elements at once (see FieldArray),
+        # only when the packed integers fit in int64
+        self.powers = None
+        if self.size <= 2 ** 63 and self.type == "int64":
+            self.powers = p ** np.arange(self.n, dtype="int64")
+        self.reduction_table = self.__find_reduction_table()
+
+        # Cached results of group_order_factorization(), multiplicative_group() and non_residue()
+        self._factorization = None
+        self._generator = None
+        self._non_residue = None
+
+        # The matrix of the Frobenius automorphism and the traces of the basis, computed on demand
+        self._frobenius_matrix = None
+        self._trace_vector = None
+
+        # Log / antilog tables, only built on demand by build_tables()
+        self.tables = None
+
+        # In characteristic 2, the elements are bit-packed (see BinaryFieldElement)
+        self.binary = self.p == 2
+        if self.binary:
+            self.modulus_bits = pack_bits(self.f_coeffs)
+            self.modulus_terms = modulus_terms(self.modulus_bits)
+
+        # The field is only registered once it is fully built
+        self.key = (p, tuple(f_coeffs))
+        FiniteField._registry[self.key] = self
+
+    def __verify(self, f_coeffs: List[int] = None, p: int = None):
+        """
+        Checks that f is irreducible with Rabin's test, and records it. Raises a ValueError if not
+        """
+
+        if f_coeffs is None:
+            p, f_coeffs = self.key[0], list(self.key[1])
+
+        if not is_irreducible(f_coeffs, p):
+            error = f"f(x) is not irreducible in k"
+            raise ValueError(error)
 
-        # If the degree of the polynom is 2 or 3, we want to check its roots and raise an error if the
-        # polynom has roots
-        if self.n == 2 or self.n == 3:
-            if self.__has_root():
-                error = f"f(x) is not irreducible in k"
-                raise ValueError(error)
+        self.verified = True
 
-    def __has_root(self):
+    @classmethod
+    def from_degree(cls, p: int, n: int, primitive: bool = False):
         """
-        Check if the function f(x) is indeed irreducible in k
+        Builds the field with p^n elements, with the cheapest irreducible (or primitive) modulus f
+        from the catalog of polyexamples.txt or from the generator of sparse polynomials
         """
 
-        # Go through all the elements in k
-        for i in range(self.p):
-
-            res = 0
-            res += (self.f_coeffs[0]) + (self.f_coeffs[1] * i) \
-                + (self.f_coeffs[2] * i ** 2)
-            if self.n == 3:
-                res += self.f_coeffs[3] * i ** 3
+        # We import the catalog inside the method to prevent circular imports
+        from polynomialCatalog import cheapest_modulus
 
-            if res == 0:
-                return True
-        return False
+        # The modulus is irreducible by construction (the polynomials of the catalog are checked)
+        field = cls(p, cheapest_modulus(p, n, primitive), check_irreducible=False)
+        field.verified = True
+        return field
 
     def __find_residue(self):
         """
@@ -70,72 +153,275 @@ class FiniteField:
 
         return (- self.f_coeffs[:-1] + self.p) % self.p
 
+    def __find_reduction_table(self):
+        """
+        Find the table used to reduce a product modulo f(x):
+        the row i contains the coefficients of x^(n+i) mod f(x), for i = 0, ..., n-2
+        """
+
+        table = np.zeros((max(self.n - 1, 0), self.n), dtype=self.type)
+        residue = self.residue
+
+        row = residue
+        for i in range(self.n - 1):
+            table[i] = row
+
+            # x^(n+i+1) = x * x^(n+i): shift the coefficients and reduce the leading one with the residue
+            leading = row[-1]
+            row = np.concatenate(([0], row[:-1]))
+            row = (row + mul_mod(leading, residue, self.p)) % self.p
+
+        return table
+
+    def build_tables(self, max_size: int = 2 ** 24):
+        """
+        Builds the log / antilog and Zech log tables of the field, after which the multiplication,
+        the division, the exponentiation and the addition (with the Zech logarithm) of the elements
+        are lookups indexed by their packed integers.
+        Returns the tables, which report their build time and their memory usage
+
+        Parameters
+        ----------
+        max_size : the tables are not built for fields with more than max_size elements
+        """
+
+        if self.p ** self.n > max_size:
+            error = f"The field has {self.p ** self.n} elements, more than max_size={max_size}"
+            raise ValueError(error)
+
+        if self.tables is None:
+            self.tables = FieldTables.build(self)
+
+        return self.tables
+
+    def drop_tables(self):
+        """
+        Frees the tables built by build_tables()
+        """
+
+        self.tables = None
+
+    def pack(self, coeffs) -> int:
+        """
+        Packs the coefficients [a_0, ..., a_{n-1}] of an element in the integer
+        a_0 + a_1 p + ... + a_{n-1} p^{n-1}, in [0, p^n).
+        The loop runs on Python integers: NumPy calls cost more than the work for so few coefficients
+        """
+
+        if self.binary:
+            return pack_bits(coeffs)
+
+        if isinstance(coeffs, np.ndarray):
+            coeffs = coeffs.tolist()
+
+        value = 0
+        for coeff in reversed(coeffs):
+            value = value * self.p + int(coeff) % self.p
+        return value
+
+    def digits(self, value: int) -> List[int]:
+        """
+        Converts an integer packed by pack() back to its coefficients [a_0, ..., a_{n-1}], as Python integers
+        """
+
+        if self.binary:
+            return [(value >> i) & 1 for i in range(self.n)]
+
+        coeffs = []
+        for _ in range(self.n):
+            value, coeff = divmod(value, self.p)
+            coeffs.append(coeff)
+        return coeffs
+
+    def unpack(self, value: int):
+        """
+        Converts an integer packed by pack() back to its coefficients [a_0, ..., a_{n-1}], as an array
+        """
+
+        if self.binary:
+            return unpack_bits(value, self.n)
+
+        return np.array(self.digits(value), dtype=self.type)
+
+    def multiply(self, a, b):
+        """
+        Multiply two elements of l given by their coefficients [a_0, ..., a_{n-1}]:
+        the product of the polynomials is reduced modulo f(x) with the reduction table
+        """
+
+        if self.binary:
+            product = binary_reduce(clmul(pack_bits(a), pack_bits(b)), self.n, self.modulus_terms)
+            return unpack_bits(product, self.n)
+
+        a = np.asarray(a, dtype=self.type)
+        b = np.asarray(b, dtype=self.type)
+
+        # Product of the polynomials, of degree at most 2n-2
+        # (np.convolve would overflow for the wide fields, poly_mul works on Python integers or goes
+        # through polynomial.convolve_mod for the long ones)
+        if self.n <= ARRAY_THRESHOLD and not self.wide:
+            product = np.convolve(a, b) % self.p
+        else:
+            product = poly_mul(a.tolist(), b.tolist(), self.p)
+            product = np.array(product + [0] * (2 * self.n - 1 - len(product)), dtype=self.type)
+
+        return self.reduce_product(product)
+
+    def reduce_product(self, product):
+        """
+        Reduces products of polynomials, given by their coefficients modulo p in an array of
+        shape (..., 2n-1), modulo f(x): x^(n+i) is replaced by the i-th row of the reduction table
+        """
+
+        return (product[..., :self.n] + self.linear_map(product[..., self.n:], self.reduction_table)) % self.p
+
+    def linear_map(self, coeffs, matrix):
+        """
+        Applies a k-linear map to coefficients of shape (..., m): returns coeffs @ matrix modulo p,
+        where the rows of the matrix (m, n) are the images of the basis elements
+        """
+
+        if not self.wide:
+            return coeffs @ matrix % self.p
+
+        # The products are reduced one by one, so that the sums cannot overflow
+        result = np.zeros(np.shape(coeffs)[:-1] + (matrix.shape[1],), dtype=self.type)
+        for i in range(matrix.shape[0]):
+            result = (result + mul_mod(coeffs[..., i, np.newaxis], matrix[i], self.p)) % self.p
+        return result
+
+    @property
+    def frobenius_matrix(self):
+        """
+        The matrix of the Frobenius automorphism alpha -> alpha^p, which is k-linear:
+        the row i contains the coefficients of x^(ip) mod f(x). It is computed once and cached on the field
+        """
+
+        if self._frobenius_matrix is None:
+            matrix = np.zeros((self.n, self.n), dtype=self.type)
+            matrix[0, 0] = 1
+
+            # x^p mod f, then x^(ip) = x^((i-1)p) * x^p
+            x_p = poly_powmod([0, 1], self.p, [int(coeff) for coeff in self.f_coeffs], self.p)
+            x_p = x_p + [0] * (self.n - len(x_p))
+            for i in range(1, self.n):
+                matrix[i] = self.multiply(matrix[i - 1], x_p)
+
+            self._frobenius_matrix = matrix
+
+        return self._frobenius_matrix
+
+    @property
+    def trace_vector(self):
+        """
+        The traces Tr(x^i) of the basis elements, so that Tr(alpha) = sum a_i Tr(x^i).
+        The trace of x^i is the constant coefficient of the sum of its conjugates x^(i p^j)
+        """
+
+        if self._trace_vector is None:
+            power = self.identity.copy()
+            total = np.zeros((self.n, self.n), dtype=self.type)
+            for _ in range(self.n):
+                total = (total + power) % self.p
+                power = self.linear_map(power, self.frobenius_matrix)
+
+            self._trace_vector = total[:, 0].copy()
+
+        return self._trace_vector
+
     def __eq__(self, other):
         """
-        Overloading the == operator
+        Overloading the == operator: the fields are interned, so equal fields are the same object
         """
 
-        return all(self.f_coeffs == other.f_coeffs) and self.p == other.p
+        return self is other
 
     def __ne__(self, other):
         """
         Overloading the != operator
         """
 
-        return not (self == other)
+        return self is not other
+
+    def __hash__(self):
+        """
+        The fields can be used as keys of dictionaries
+        """
+
+        return hash(self.key)
 
-    def __find_root(self):
+    def __reduce__(self):
         """
-        Find the root of f(x) (not in k)
+        Pickles the field as (p, f_coeffs) only: the tables are rebuilt (or loaded) where needed.
+        A field which was checked is checked again when it is unpickled, as the pickle may not be trusted
         """
 
-        return np.roots(self.f_coeffs[::-1])
+        return self.__class__, (self.p, self.f_coeffs.tolist(), self.verified)
 
     def __repr__(self):
         return f"Finite field p={self.p}, f(x)={self.f_coeffs}"
 
-    def multiplicative_group(self):
+    def group_order_factorization(self):
         """
-        Finds a generator gamma of the multiplicative group l*, which we know is cyclic
+        Returns the factorization of p^n - 1, the order of the multiplicative group l*,
+        as a dictionary {prime: exponent}. It is computed once and cached on the field
         """
 
-        # We import FiniteFieldElement inside the method to prevent circular imports
-        from finiteFieldElement import FiniteFieldElement
+        if self._factorization is None:
+            self._factorization = factorize_group_order(self.p, self.n)
+
+        return self._factorization
 
-        # Stopping condition
-        i = 0
+    def multiplicative_group(self):
+        """
+        Finds a generator gamma of the multiplicative group l*, which we know is cyclic.
+        The generator is cached on the field
+        """
 
-        # To find the generative element, we pick random elements until we find it.
-        # In order to pick another random element that we have not encountered so far,
-        # we have to define a set that will remember all the elements we picked.
-        history = set()
+        if self._generator is not None:
+            return self._generator
 
-        # Generates a list of random coefficients
-        coeffs = np.random.randint(0, self.p, size=(self.n))
+        # We import FiniteFieldElement inside the method to prevent circular imports
+        from finiteFieldElement import FiniteFieldElement
 
-        # Add the coefficients to the list
-        history.add(str(coeffs))
+        # The proportion of generators in l* is phi(p^n - 1)/(p^n - 1), which is at least
+        # 1/(2 log(log(p^n))) in practice: picking random elements finds a generator quickly
+        attempts = 64 * (self.p ** self.n).bit_length()
 
-        alpha = FiniteFieldElement(coeffs, self)
+        for i in range(attempts):
 
-        while i < np.ceil(np.sqrt(self.p ** self.n)):
+            # Generates a list of random coefficients
+            coeffs = random_residues(self.p, (self.n,))
+            if not np.any(coeffs):
+                continue
 
-            # If the multiplication order of the elements equals to the size of the field minus one,
-            # then it is a generator.
-            if alpha.mult_order() == self.p ** self.n - 1:
+            alpha = FiniteFieldElement(coeffs, self)
+            if alpha.is_primitive():
+                self._generator = alpha
                 return alpha
 
-            coeffs = np.random.randint(0, self.p, size=(self.n))
+        error = f"The generator of the multiplicative group has not be found"
+        raise ValueError(error)
 
-            # If we already picked these coefficients, computes other coefficients
-            while str(coeffs) in history:
-                coeffs = np.random.randint(0, self.p, size=(self.n))
+    def non_residue(self):
+        """
+        Finds an element which is not a square in l (for p odd), as needed by the square roots.
+        Half of the elements of l* are not squares, so random elements find one quickly.
+        The element is cached on the field
+        """
 
-            history.add(str(coeffs))
+        if self._non_residue is not None:
+            return self._non_residue
 
-            alpha = FiniteFieldElement(coeffs, self)
+        if self.p == 2:
+            error = f"Every element is a square in a field of characteristic 2"
+            raise ValueError(error)
 
-            i += 1
+        # We import FiniteFieldElement inside the method to prevent circular imports
+        from finiteFieldElement import FiniteFieldElement
 
-        error = f"The generator of the multiplicative group has not be found"
-        raise ValueError(error)
+        while True:
+            alpha = FiniteFieldElement(random_residues(self.p, (self.n,)), self)
+            if not alpha.is_square():
+                self._non_residue = alpha
+                return alpha
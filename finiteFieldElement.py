@@ -1,37 +1,84 @@
 from typing import List
 import numpy as np
 from finiteField import FiniteField
+from exponentiation import power, FixedBasePower
+from primePolynomial import poly_inverse_mod
+from modularReduction import mul_mod
+from binaryField import clmul, reduce as binary_reduce, inverse as binary_inverse
 import math
 
 
 class FiniteFieldElement:
     """
-    This class represents an element 'alpha' from the field 'l' = k[x]/<f(x)>
+    This class represents an element 'alpha' from the field 'l' = k[x]/<f(x)>.
+    The element is stored as one integer packing its coefficients in base p
+    (value = a_0 + a_1 p + ... + a_{n-1} p^{n-1}), the coefficients are unpacked when needed
     """
 
+    # No __dict__ per element: millions of elements are kept in hash tables
+    __slots__ = ("value", "field", "_hash")
+
+    def __new__(cls, coeffs=None, field: FiniteField = None):
+        """
+        The elements of a field of characteristic 2 are created as BinaryFieldElement objects
+        """
+
+        if cls is FiniteFieldElement and field is not None and field.binary:
+            cls = BinaryFieldElement
+        return super().__new__(cls)
+
     def __init__(self, coeffs: List[int], field: FiniteField):
         """
         Generate an element from the extended finite field l
 
         Parameters
         ----------
-        coeffs : the coefficients of the polynom alpha from l
+        coeffs : the coefficients of the polynom alpha from l, or the integer packing them
         field : the extended finite field l
         """
 
-        self.coeffs = np.array(coeffs)
         self.field = field
 
-        # The order of the element
-        self.n = len(self.coeffs) - 1
+        # The hash is computed on the first call of __hash__
+        self._hash = None
+
+        if isinstance(coeffs, (int, np.integer)):
+            self.value = int(coeffs)
+            if not 0 <= self.value < field.size:
+                error = f"The integer {self.value} does not pack an element of a field with {field.size} elements"
+                raise ValueError(error)
+            return
 
         # Check if the degree of the polynom corresponds to the degree of the field minus 1
-        if self.field.n != self.n + 1:
+        if len(coeffs) != field.n:
             error = f"The degree of f(x) must be equal to the degree of the element - 1"
             raise ValueError(error)
 
-        # Generate the matrix representing the polynom
-        self.matrix = self.to_matrix()
+        self.value = field.pack(coeffs)
+
+    @property
+    def coeffs(self):
+        """
+        The coefficients of the polynom, unpacked from the integer
+        """
+
+        return self.field.unpack(self.value)
+
+    @property
+    def n(self):
+        """
+        The degree of the polynom can be up to n - 1
+        """
+
+        return self.field.n - 1
+
+    @property
+    def matrix(self):
+        """
+        The matrix representing the polynom, computed on each access
+        """
+
+        return self.to_matrix()
 
     def __add__(self, other):
         """
@@ -39,11 +86,16 @@ class FiniteFieldElement:
         """
 
         # Check if the other object is not a FiniteFieldElement object
-        if not self.__isvalid(other):
+        if not self._check_operand(other):
             return
 
-        # Add the coefficients together and make modulo p
-        new_coeff = (self.coeffs + other.coeffs) % self.field.p
+        # With the log tables, the sum is computed with the Zech logarithm on the packed integers
+        if self.field.tables is not None:
+            return self.__class__(self.field.tables.add_values(self.value, other.value), self.field)
+
+        # Add the coefficients together and make modulo p (on Python integers, faster than NumPy for a few coefficients)
+        p, digits = self.field.p, self.field.digits
+        new_coeff = [(a + b) % p for a, b in zip(digits(self.value), digits(other.value))]
 
         # Returns a new object with the new coefficients and the same field
         return self.__class__(new_coeff, self.field)
@@ -81,8 +133,8 @@ class FiniteFieldElement:
         # Extract the 'index' column from the helper matrix
         b = helper[:, self.n+1 + i]
 
-        # Multiply the residue by the column extracted from the helper
-        helper[:, i:self.n+1 + i] += a * b[:, np.newaxis]
+        # Multiply the residue by the column extracted from the helper (reduced, so that it cannot overflow)
+        helper[:, i:self.n+1 + i] = (helper[:, i:self.n+1 + i] + mul_mod(a, b[:, np.newaxis], self.field.p)) % self.field.p
 
         # Set the column to zero now we used it
         helper[:, self.n+1 + i] = 0
@@ -90,21 +142,18 @@ class FiniteFieldElement:
         # Move on the previouse column in the helper matrix
         return self.__to_matrix_helper(helper, i-1)
 
-    def __isvalid(self, other):
+    def _check_operand(self, other):
         """
-        Check if the other object is FiniteFieldElement, is p is the same and if f(x) is the same
+        Check if the other object is FiniteFieldElement from the same field.
+        The fields are interned, so the same p and f(x) give the same field object
         """
 
         if not isinstance(other, FiniteFieldElement):
             error = f"The second element is not a FiniteFieldElement object"
             raise TypeError(error)
 
-        if self.field.p != other.field.p:
-            error = f"Cannot perform the operation with two elements in different finiteField p={self.field.p} and p={other.field.p}"
-            raise TypeError(error)
-
-        if not np.all(self.field.f_coeffs == other.field.f_coeffs):
-            error = f"Cannot perform the operation with two elements in different finiteField f={self.field.f_coeffs} and f={other.field.f_coeffs}"
+        if other.field is not self.field:
+            error = f"Cannot perform the operation with two elements in different finiteField {self.field} and {other.field}"
             raise TypeError(error)
 
         return True
@@ -115,11 +164,17 @@ class FiniteFieldElement:
         """
 
         # Check if the other object is not a FiniteFieldElement object
-        if not self.__isvalid(other):
+        if not self._check_operand(other):
             return
 
-        # Add the coefficients together and make modulo p
-        new_coeff = (self.coeffs - other.coeffs) % self.field.p
+        # alpha - beta = alpha + (-beta), with the log tables
+        tables = self.field.tables
+        if tables is not None:
+            return self.__class__(tables.add_values(self.value, tables.negate_value(other.value)), self.field)
+
+        # Substract the coefficients and make modulo p
+        p, digits = self.field.p, self.field.digits
+        new_coeff = [(a - b) % p for a, b in zip(digits(self.value), digits(other.value))]
 
         # Returns a new object with the new coefficients and the same field
         return self.__class__(new_coeff, self.field)
@@ -129,76 +184,233 @@ class FiniteFieldElement:
         Overload the * operator
         """
 
-        if not self.__isvalid(other):
+        if not self._check_operand(other):
             return
 
-        result = (self.matrix @ other.matrix) % self.field.p
-        output = self.__class__(result[0, :], self.field)
+        # With the log tables, the packed integers index the tables directly
+        if self.field.tables is not None:
+            return self.__class__(self.field.tables.multiply_values(self.value, other.value), self.field)
 
-        return output
+        # Product of the polynomials modulo f(x)
+        result = self.field.multiply(self.field.digits(self.value), self.field.digits(other.value))
+        return self.__class__(result, self.field)
 
     def __truediv__(self, other):
         """
         Overload the / operator
         """
 
-        if not self.__isvalid(other):
+        if not self._check_operand(other):
             return
 
-        result = self.matrix @ other.inverse().matrix % self.field.p
-        return self.__class__(result[0, :], self.field)
+        return self * other.inverse()
 
     def inverse(self):
         """
-        Computes the inverse of the polynom by looking for the multiplication order of this polynom
+        Computes the inverse of the polynom with the extended Euclidean algorithm in k[x]:
+        if s(x)alpha(x) + t(x)f(x) = 1, then s(x) is the inverse of alpha(x) modulo f(x)
         """
 
-        inv = self ** (self.mult_order() - 1)
-        return inv
+        if self.is_zero():
+            error = f"The zero element does not have an inverse"
+            raise ZeroDivisionError(error)
+
+        if self.field.tables is not None:
+            return self.__class__(self.field.tables.inverse_value(self.value), self.field)
+
+        p = self.field.p
+        f = [int(coeff) % p for coeff in self.field.f_coeffs]
+        inv = poly_inverse_mod([int(coeff) for coeff in self.coeffs], f, p)
+
+        # Pad the coefficients to the degree of the field
+        return self.__class__(inv + [0] * (self.n + 1 - len(inv)), self.field)
 
     def __pow__(self, other):
         """
-        Overload the ** operator
+        Overload the ** operator.
+        The exponent is reduced modulo p^n - 1 and computed by square-and-multiply,
+        or with the sliding window method for the large exponents
         """
 
         if not isinstance(other, int):
-            error = f"The exponent has to be int (instead of {other.type})"
+            error = f"The exponent has to be int (instead of {type(other).__name__})"
             raise TypeError(error)
 
-        # If the exponent is negative, computes the inverse of the polynom and then computes with the positive exponent
-        if other < 0:
-            return self.inverse() ** (-other)
+        # The zero element is not in the multiplicative group
+        if self.is_zero():
+            if other < 0:
+                error = f"The zero element does not have an inverse"
+                raise ZeroDivisionError(error)
+            return self.one() if other == 0 else self
 
-        # If the exponent is zero, returns the identity element
-        if other == 0:
-            return self.__class__(self.field.identity[0, :], self.field)
+        if self.field.tables is not None:
+            return self.__class__(self.field.tables.power_value(self.value, other), self.field)
 
-        # Performs the multiplications
-        multiplicator = self.matrix
-        for i in range(other - 1):
-            multiplicator = (multiplicator @ self.matrix) % self.field.p
+        # Since alpha^(p^n - 1) = 1, negative exponents are reduced the same way as positive ones
+        return power(self, other, self.one(), order=self.field.p ** self.field.n - 1)
 
-        return self.__class__(multiplicator[0, :], self.field)
+    def is_zero(self):
+        """
+        Check if the element is the zero element of the field
+        """
+
+        return self.value == 0
+
+    def one(self):
+        """
+        Returns the identity element of the field of this element
+        """
+
+        return self.__class__(1, self.field)
+
+    def fixed_base(self, window: int = 4):
+        """
+        Precomputes the tables to raise this element to many different exponents.
+        Returns a callable object: alpha.fixed_base()(e) == alpha ** e
+        """
+
+        if self.is_zero():
+            error = f"Cannot precompute the powers of the zero element"
+            raise ZeroDivisionError(error)
+
+        return FixedBasePower(self, self.one(), self.field.p ** self.field.n - 1, window)
+
+    def frobenius(self, power: int = 1):
+        """
+        Applies the Frobenius automorphism power times: returns alpha^(p^power).
+        alpha -> alpha^p is k-linear, so every application is one product by the Frobenius matrix of the field
+        """
+
+        coeffs = self.coeffs
+        for _ in range(power % self.field.n):
+            coeffs = self.field.linear_map(coeffs, self.field.frobenius_matrix)
+        return self.__class__(coeffs, self.field)
+
+    def conjugates(self):
+        """
+        Returns the n conjugates of the element over k: [alpha, alpha^p, ..., alpha^(p^(n-1))]
+        """
+
+        conjugates = [self]
+        for _ in range(self.field.n - 1):
+            conjugates.append(conjugates[-1].frobenius())
+        return conjugates
+
+    def trace(self) -> int:
+        """
+        Computes the trace Tr(alpha) = alpha + alpha^p + ... + alpha^(p^(n-1)), which is in k.
+        The trace is k-linear: it is computed from the traces of the basis elements
+        """
+
+        return int(self.field.linear_map(self.coeffs, self.field.trace_vector[:, np.newaxis])[0])
+
+    def norm(self) -> int:
+        """
+        Computes the norm N(alpha) = alpha * alpha^p * ... * alpha^(p^(n-1)) = alpha^((p^n - 1)/(p - 1)),
+        which is in k, as the product of the conjugates
+        """
+
+        result = self.one()
+        for conjugate in self.conjugates():
+            result = result * conjugate
+        return int(result.coeffs[0])
+
+    def minimal_polynomial(self) -> List[int]:
+        """
+        Computes the minimal polynomial of the element over k, the product of the (x - c) for the
+        distinct conjugates c. Returns its coefficients [m_0, ..., m_d] (m_d = 1), where d divides n
+        """
+
+        # The distinct conjugates are alpha, ..., alpha^(p^(d-1)), where alpha^(p^d) = alpha
+        conjugates = [self]
+        conjugate = self.frobenius()
+        while conjugate != self:
+            conjugates.append(conjugate)
+            conjugate = conjugate.frobenius()
+
+        # Product of the (x - c) in l[x], the coefficients being elements of l
+        zero = self.__class__(0, self.field)
+        polynomial = [self.one()]
+        for c in conjugates:
+            shifted = [zero] + polynomial
+            polynomial = [shifted[i] - (c * polynomial[i] if i < len(polynomial) else zero) for i in range(len(shifted))]
+
+        # The coefficients of the minimal polynomial are in k
+        return [int(coeff.coeffs[0]) for coeff in polynomial]
+
+    def is_square(self) -> bool:
+        """
+        Check if the element is a square in l. For p odd, alpha is a square in l if and only if
+        its norm is a square in k (Euler's criterion in k); every element is a square for p = 2
+        """
+
+        if self.is_zero() or self.field.p == 2:
+            return True
+
+        p = self.field.p
+        return pow(self.norm(), (p - 1) // 2, p) == 1
+
+    def sqrt(self):
+        """
+        Computes a square root of the element: alpha^(2^(n-1)) for p = 2, alpha^((q+1)/4) when
+        q = p^n = 3 mod 4, and the Tonelli-Shanks algorithm otherwise.
+        Raises a ValueError if the element is not a square
+        """
+
+        if self.is_zero():
+            return self
+
+        # In characteristic 2, the square root is the inverse of the Frobenius automorphism
+        if self.field.p == 2:
+            return self.frobenius(self.field.n - 1)
+
+        if not self.is_square():
+            error = f"{self} is not a square in l"
+            raise ValueError(error)
+
+        q = self.field.size
+        if q % 4 == 3:
+            return self ** ((q + 1) // 4)
+
+        # We import tonelli_shanks inside the method to prevent circular imports
+        from rootFinding import tonelli_shanks
+
+        return tonelli_shanks(self, self.field.non_residue(), self.one(), q - 1)
 
     def mult_order(self):
         """
-        Computes the multiplicative order of the element
+        Computes the multiplicative order of the element.
+        Starting from p^n - 1, we remove every prime factor q as long as alpha^(order/q) = 1
         """
 
-        multiplicator = self.matrix
-        i = 1
+        if self.is_zero():
+            error = f"The zero element does not have a multiplicative order"
+            raise ValueError(error)
+
+        one = self.one()
+        order = self.field.p ** self.field.n - 1
 
-        # Multiply the element with itself until it is equal to 1 (identity matrix)
-        while not np.all(multiplicator == self.field.identity):
+        for prime, exponent in self.field.group_order_factorization().items():
+            for _ in range(exponent):
+                if self ** (order // prime) != one:
+                    break
+                order //= prime
 
-            multiplicator = (multiplicator @ self.matrix) % self.field.p
-            i += 1
+        return order
 
-            if i > self.field.p ** self.field.n:
-                error = f"The multiplication order is too big (> {self.field.p ** self.field.n} = self.field.p ** self.field.n)"
-                raise TypeError(error)
+    def is_primitive(self):
+        """
+        Check if the element is a generator of the multiplicative group l*:
+        alpha^((p^n - 1)/q) must be different from 1 for every prime q dividing p^n - 1
+        """
+
+        if self.is_zero():
+            return False
 
-        return i
+        one = self.one()
+        order = self.field.p ** self.field.n - 1
+
+        return all(self ** (order // prime) != one for prime in self.field.group_order_factorization())
 
     def __repr__(self):
         """
@@ -222,41 +434,207 @@ class FiniteFieldElement:
 
         return representation
 
+    def __reduce__(self):
+        """
+        Pickles the element as its packed integer and its field only
+        """
+
+        return self.__class__, (self.value, self.field)
+
+    def to_int(self):
+        """
+        The integer packing the coefficients, written in base p: a_0 + a_1 p + ... + a_{n-1} p^{n-1}
+        """
+
+        return self.value
+
     def __hash__(self):
         """
-        Generate a hash code to represent our element (for the hashing table)
+        Generate a hash code to represent our element (for the hashing table), cached on the element
         """
 
-        return hash(str(self.coeffs.tolist()))
+        if self._hash is None:
+            self._hash = hash(self.value)
+        return self._hash
 
     def __eq__(self, other):
         """
         Defines how to compare two elements
         """
 
-        # The coefficients have to be the same, and the fields have to be the same
-        return all(self.coeffs == other.coeffs) and self.field == other.field
+        if not isinstance(other, FiniteFieldElement):
+            return False
 
+        # The packed coefficients have to be the same, and the fields have to be the same
+        return self.field is other.field and self.value == other.value
 
-def BSGS(g: FiniteFieldElement, h: FiniteFieldElement):
+
+class BinaryFieldElement(FiniteFieldElement):
     """
-    This method is using the BSGS algorithm to solve the discrete logarithm problem
+    This class represents an element 'alpha' from a field 'l' = k[x]/<f(x)> of characteristic 2.
+    The element is stored as an integer whose bit i is the coefficient of x^i: the addition is a XOR
+    and the multiplication is a carry-less product reduced modulo f(x), or a lookup in the log tables
+    when the field has them (see FiniteField.build_tables)
     """
 
-    m = math.ceil(math.sqrt(g.field.p ** g.field.n - 1))
+    # The integer value of FiniteFieldElement, in base 2, is the bit-packed polynom
+    __slots__ = ()
+
+    def __add__(self, other):
+        """
+        In characteristic 2, the addition is a XOR of the coefficients
+        """
+
+        self._check_operand(other)
+        return self.__class__(self.value ^ other.value, self.field)
+
+    # In characteristic 2, -alpha = alpha
+    __sub__ = __add__
+
+    def __mul__(self, other):
+        """
+        Carry-less product of the polynoms, reduced modulo f(x)
+        """
+
+        self._check_operand(other)
+
+        # With the log tables (see FiniteField.build_tables), the product is a lookup
+        if self.field.tables is not None:
+            return self.__class__(self.field.tables.multiply_values(self.value, other.value), self.field)
+
+        product = clmul(self.value, other.value)
+        return self.__class__(binary_reduce(product, self.field.n, self.field.modulus_terms), self.field)
+
+    def inverse(self):
+        """
+        Computes the inverse with the extended Euclidean algorithm in F_2[x], or with the log tables
+        """
+
+        if self.field.tables is not None and not self.is_zero():
+            return self.__class__(self.field.tables.inverse_value(self.value), self.field)
+
+        return self.__class__(binary_inverse(self.value, self.field.modulus_bits), self.field)
+
+
+def batch_inverse(elements: List[FiniteFieldElement]) -> List[FiniteFieldElement]:
+    """
+    Inverts a list of elements with Montgomery's trick: only one inversion is computed,
+    plus 3(k-1) multiplications for k elements
+    """
+
+    if not elements:
+        return []
+
+    # prefix[i] = elements[0] * ... * elements[i]
+    prefix = [elements[0]]
+    for element in elements[1:]:
+        prefix.append(prefix[-1] * element)
 
-    hash_table = {}
-    iterator = FiniteFieldElement(g.field.identity[0, :], g.field)
+    # The only inversion, of the product of all the elements
+    inv = prefix[-1].inverse()
 
-    for i in range(m):  # Giant steps
-        hash_table[h * g**(-m*i)] = i
+    # Walk back: inv = (elements[0] * ... * elements[i])^-1
+    inverses = [None] * len(elements)
+    for i in range(len(elements) - 1, 0, -1):
+        inverses[i] = inv * prefix[i - 1]
+        inv = inv * elements[i]
+    inverses[0] = inv
+
+    return inverses
+
+
+class BSGSTable:
+    """
+    The baby steps g^0, ..., g^(m-1) of the BSGS algorithm for a fixed base g, stored as a sorted
+    array of packed integers (see FiniteFieldElement.to_int()). The same table solves the
+    discrete logarithm of any number of elements h in base g
+    """
+
+    # Number of giant steps computed together with one vectorized multiplication
+    GIANT_BLOCK = 1024
+
+    def __init__(self, g: FiniteFieldElement, order: int = None):
+        """
+        Parameters
+        ----------
+        g : the base of the discrete logarithm
+        order : the order of g (or a multiple of it), p^n - 1 by default
+        """
+
+        # We import FieldArray inside the method to prevent circular imports
+        from fieldArray import FieldArray
+
+        if order is None:
+            order = g.field.p ** g.field.n - 1
+
+        self.g = g
+        self.order = order
+        self.m = self.giant_steps_count(order)
+
+        # Baby steps: sorted packed values of g^j, and the exponents j in the same order
+        baby_steps = FieldArray.geometric(g, self.m).pack()
+        self.indices = np.argsort(baby_steps, kind="stable")
+        self.keys = baby_steps[self.indices]
+
+        # Giant steps: h * (g^-m)^i for a block of i at once, then the block is multiplied by g^(-m*block)
+        self.block = min(self.m, self.GIANT_BLOCK)
+        self.giant_steps = FieldArray.geometric(g ** (-self.m), self.block)
+        self.giant_factor = FieldArray((g ** (-self.m * self.block)).coeffs, g.field)
+
+    @staticmethod
+    def giant_steps_count(order: int) -> int:
+        """
+        Returns m = ceil(sqrt(order)), the number of baby steps and of giant steps
+        """
+
+        return math.isqrt(order - 1) + 1
+
+    def log(self, h: FiniteFieldElement, start: int = 0, stop: int = None):
+        """
+        Returns x such that g^x = h (modulo the order of g), or None if h is not a power of g.
+        Only the giant steps start, ..., stop-1 are tried (all of them by default), which lets
+        several processes share the giant steps of one logarithm
+        """
+
+        # We import FieldArray inside the method to prevent circular imports
+        from fieldArray import FieldArray
+
+        if stop is None:
+            stop = self.m
+
+        current = FieldArray((h * self.g ** (-self.m * start)).coeffs, h.field)
+        for i in range(start, stop, self.block):
+
+            # If h * g^(-m(i+k)) = g^j, then x = m(i+k) + j
+            values = (self.giant_steps * current).pack()
+            positions = np.searchsorted(self.keys, values)
+            positions[positions == len(self.keys)] = 0
+            found = np.nonzero((self.keys[positions] == values)[:stop - i])[0]
+
+            if len(found):
+                k = found[0]
+                return (self.m * (i + int(k)) + int(self.indices[positions[k]])) % self.order
+
+            current = current * self.giant_factor
+
+        return None
+
+    def log_many(self, targets: List[FiniteFieldElement]) -> List[int]:
+        """
+        Solves the discrete logarithm of every target with the same baby steps
+        """
+
+        return [self.log(h) for h in targets]
+
+
+def BSGS(g: FiniteFieldElement, h: FiniteFieldElement, order: int = None):
+    """
+    This method is using the BSGS algorithm to solve the discrete logarithm problem.
+    If the order of g is known, only ceil(sqrt(order)) steps are needed.
+    To solve many logarithms in the same base g, build one BSGSTable and call its log method
+    """
 
-    for j in range(m):  # Baby steps
-        if (iterator in hash_table):
-            i = hash_table[iterator]
-            return (j + i*m) % (g.field.p ** g.field.n - 1)
-        iterator = iterator * g
-    return None
+    return BSGSTable(g, order).log(h)
 
 
 # We are running a test code
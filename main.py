@@ -1,154 +1,313 @@
-import ast
-from typing import List
-from primeFieldElement import PrimeFieldElement
+"""
+Command line interface of the project: processes jobs given as JSON lines, one JSON object per line,
+and writes one JSON line of result per job, in the order of the jobs.
+
+    python main.py COMMAND [--input FILE] [--output FILE] [--batch-size N] [--workers N]
+
+Every job gives its field with "p" and either "f" (the coefficients [a_0, ..., a_n] of f(x), checked
+to be irreducible) or "n" (the degree, the cheapest modulus is chosen), e.g. {"p": 2, "n": 8}.
+The elements are the lists of their n coefficients [a_0, ..., a_{n-1}] or the integers packing them
+(a_0 + a_1 p + ... + a_{n-1} p^{n-1}). The commands are:
+    info       {"p", "f" | "n"}                     -> the field and the factorization of p^n - 1
+    generator  {"p", "f" | "n"}                     -> a generator of the multiplicative group l*
+    order      {"p", "f" | "n", "element"}          -> the multiplicative order of the element
+    dlog       {"p", "f" | "n", "h", "g" (optional, a generator by default)} -> x such that g^x = h
+    pow        {"p", "f" | "n", "element", "exponent"} -> element^exponent
+    bench      {"p", "f" | "n", "size", "repeat"}   -> timings of the array operations on size elements
+
+The jobs are read by batches of --batch-size lines, and the batches are spread over --workers processes.
+The results are written and flushed after every batch, so the output can be read as a stream.
+A job which fails gives {"error": ...} instead of stopping the others. The field "id" of a job is
+copied to its result, and the line number of the job is given in "line".
+"""
+
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import islice
+import numpy as np
+from factorization import is_prime
 from finiteField import FiniteField
 from finiteFieldElement import FiniteFieldElement
+from fieldArray import FieldArray
 
-"""
-This the main frame of the program
-"""
+COMMANDS = ["info", "generator", "order", "dlog", "pow", "bench"]
+
+# The number of fields kept alive by a process, so that the generator and the factorization of p^n - 1
+# of the fields used by consecutive jobs are computed once (the interned fields are only weakly referenced)
+FIELD_CACHE_SIZE = 32
+
+
+def get_prime(p) -> int:
+    """
+    Checks that p is a prime number with the Miller-Rabin test, and returns it
+    """
+
+    get_integer(p, "p")
+    if not is_prime(p):
+        error = f"{p} is not a prime number"
+        raise ValueError(error)
+
+    return p
+
+
+def get_integer(value, name: str) -> int:
+    """
+    Checks that a value read from JSON is an integer: the floats and the booleans are rejected
+    """
+
+    if not isinstance(value, int) or isinstance(value, bool):
+        error = f"{name} must be an integer (instead of {value!r})"
+        raise ValueError(error)
+
+    return value
+
+
+def get_field(job: dict) -> FiniteField:
+    """
+    The field of a job, given by "p" and either "f" or "n"
+    """
+
+    p = get_prime(job.get("p"))
+
+    if "f" in job:
+        if not isinstance(job["f"], list):
+            error = f"f must be a list of integers (instead of {job['f']!r})"
+            raise ValueError(error)
+        return build_field(p, tuple(get_integer(coeff, "A coefficient of f") for coeff in job["f"]), None)
+    if "n" in job:
+        return build_field(p, None, get_integer(job["n"], "n"))
+
+    error = f"The field must be given by the coefficients f or the degree n"
+    raise ValueError(error)
+
+
+@lru_cache(maxsize=FIELD_CACHE_SIZE)
+def build_field(p: int, f_coeffs: tuple, n: int) -> FiniteField:
+    """
+    The field k[x]/<f(x)>, or the field of p^n elements when f_coeffs is None.
+    The FIELD_CACHE_SIZE fields used last are kept with their precomputed data
+    """
+
+    if f_coeffs is not None:
+        return FiniteField(p, list(f_coeffs))
+    return FiniteField.from_degree(p, n)
+
+
+def get_element(value, field: FiniteField) -> FiniteFieldElement:
+    """
+    An element given by the list of its coefficients (padded with zeros up to n) or by the integer packing them
+    """
+
+    if isinstance(value, int) and not isinstance(value, bool):
+        return FiniteFieldElement(value, field)
+
+    if not isinstance(value, list) or len(value) > field.n:
+        error = f"An element must be an integer or a list of at most {field.n} coefficients (instead of {value!r})"
+        raise ValueError(error)
+
+    coeffs = [get_integer(coeff, "A coefficient of an element") % field.p for coeff in value]
+    return FiniteFieldElement(coeffs + [0] * (field.n - len(coeffs)), field)
+
+
+def get_argument(job: dict, name: str):
+    if name not in job:
+        error = f"The job has no field {name!r}"
+        raise ValueError(error)
+    return job[name]
+
+
+def encode_element(element: FiniteFieldElement) -> list:
+    return [int(coeff) for coeff in element.coeffs]
+
+
+def info(job: dict) -> dict:
+    field = get_field(job)
+    factorization = field.group_order_factorization()
+
+    return {
+        "p": field.p,
+        "n": field.n,
+        "f": [int(coeff) for coeff in field.f_coeffs],
+        "size": field.size,
+        "group_order": field.size - 1,
+        "factorization": [[prime, exponent] for prime, exponent in sorted(factorization.items())],
+    }
+
+
+def generator(job: dict) -> dict:
+    return {"generator": encode_element(get_field(job).multiplicative_group())}
+
+
+def order(job: dict) -> dict:
+    field = get_field(job)
+    return {"order": get_element(get_argument(job, "element"), field).mult_order()}
+
+
+def dlog(job: dict) -> dict:
+
+    # We import discrete_log inside the function, it is only needed by this command
+    from discreteLog import discrete_log
+
+    field = get_field(job)
+    g = get_element(job["g"], field) if "g" in job else field.multiplicative_group()
+    h = get_element(get_argument(job, "h"), field)
+
+    return {"g": encode_element(g), "x": discrete_log(g, h)}
+
+
+def power(job: dict) -> dict:
+    field = get_field(job)
+    element = get_element(get_argument(job, "element"), field)
+    exponent = get_integer(get_argument(job, "exponent"), "The exponent")
+
+    return {"result": encode_element(element ** exponent)}
+
+
+def bench(job: dict) -> dict:
+    """
+    The best time (in seconds) over "repeat" runs of the operations on arrays of "size" random elements
+    """
+
+    field = get_field(job)
+    size = get_integer(job.get("size", 100000), "size")
+    repeat = get_integer(job.get("repeat", 3), "repeat")
+
+    a = FieldArray.random(field, (size,))
+    b = FieldArray.random(field, (size,))
+    a = a.where(~np.asarray(a.is_zero()), a.ones_like())
+    exponent = field.size // 3
+
+    operations = {
+        "add": lambda: a + b,
+        "mul": lambda: a * b,
+        "inverse": lambda: a.inverse(),
+        "pow": lambda: a ** exponent,
+    }
+
+    timings = {}
+    for name, operation in operations.items():
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            operation()
+            best = min(best, time.perf_counter() - start)
+        timings[name] = best
+
+    return {"size": size, "seconds": timings}
+
+
+HANDLERS = {
+    "info": info,
+    "generator": generator,
+    "order": order,
+    "dlog": dlog,
+    "pow": power,
+    "bench": bench,
+}
+
+
+def run_job(command: str, number: int, line: str) -> dict:
+    """
+    Runs the job of one line. The errors are returned in the result
+    """
+
+    result = {"line": number}
+    try:
+        job = json.loads(line)
+        if not isinstance(job, dict):
+            error = f"A job must be a JSON object"
+            raise ValueError(error)
+        if "id" in job:
+            result["id"] = job["id"]
+        result.update(HANDLERS[command](job))
+    except Exception as exception:
+        result["error"] = f"{type(exception).__name__}: {exception}"
+
+    return result
+
+
+def run_batch(command: str, batch: list) -> list:
+    return [run_job(command, number, line) for number, line in batch]
+
+
+def read_jobs(file):
+    """
+    The non-empty lines of the file, with their line numbers
+    """
+
+    for number, line in enumerate(file, 1):
+        if line.strip():
+            yield number, line
+
+
+def batches(jobs, size: int):
+    jobs = iter(jobs)
+    while True:
+        batch = list(islice(jobs, size))
+        if not batch:
+            return
+        yield batch
+
+
+def process(command: str, input_file, output_file, batch_size: int = 64, workers: int = 1):
+    """
+    Runs the jobs read from input_file and writes their results to output_file, batch by batch.
+    With several workers, every worker runs whole batches and the results keep the order of the jobs
+    """
+
+    def write(results):
+        for result in results:
+            output_file.write(json.dumps(result) + "\n")
+        output_file.flush()
+
+    if workers <= 1:
+        for batch in batches(read_jobs(input_file), batch_size):
+            write(run_batch(command, batch))
+        return
+
+    # At most 2 batches per worker are queued, so that a long stream is not read at once
+    with ProcessPoolExecutor(workers) as executor:
+        pending = []
+        for batch in batches(read_jobs(input_file), batch_size):
+            pending.append(executor.submit(run_batch, command, batch))
+            if len(pending) >= 2 * workers:
+                write(pending.pop(0).result())
+        for future in pending:
+            write(future.result())
+
+
+def parse_arguments(arguments=None):
+    parser = argparse.ArgumentParser(description="Batch computations over finite fields, with jobs given as JSON lines")
+    parser.add_argument("command", choices=COMMANDS, help="the computation run for every job")
+    parser.add_argument("--input", "-i", default="-", help="the file of the jobs, one JSON object per line (default: stdin)")
+    parser.add_argument("--output", "-o", default="-", help="the file of the results (default: stdout)")
+    parser.add_argument("--batch-size", "-b", type=int, default=64, help="the number of jobs per batch")
+    parser.add_argument("--workers", "-w", type=int, default=1, help="the number of worker processes")
+    return parser.parse_args(arguments)
+
+
+def main(arguments=None):
+    arguments = parse_arguments(arguments)
+
+    if arguments.batch_size < 1:
+        error = f"The batch size must be positive (instead of {arguments.batch_size})"
+        raise ValueError(error)
+
+    input_file = sys.stdin if arguments.input == "-" else open(arguments.input)
+    output_file = sys.stdout if arguments.output == "-" else open(arguments.output, "w")
+
+    try:
+        process(arguments.command, input_file, output_file, arguments.batch_size, arguments.workers)
+    finally:
+        if input_file is not sys.stdin:
+            input_file.close()
+        if output_file is not sys.stdout:
+            output_file.close()
 
 
-# class syntax
-class Choice:
-    PRIMEFIELDELEMENT = 1
-    FINITEFIELD = 2
-    FINITEFIELDELEMENT = 3
-    EXECUTE = 4
-
-
-WELCOME_MESSAGE = "Welcome to the user interface of the Advanced Algebra project !"
-ASK_INPUT = "Please choose the action your want to do"
-ACTION_LIST = "(1) - Create a new PrimeFieldElement\n\
-(2) - Create a new FiniteField\n\
-(3) - Create a new FiniteFieldElement\n\
-(4) - Execute an operation"
-NOT_DEFINED = "Not defined action"
-AVAILABLE_FIELDS = "Availables fields:"
-
-
-def get_user_choice() -> int:
-    valid = False
-    while not valid:
-        try:
-            action = input()
-            action = int(action)
-            if action not in [Choice.FINITEFIELD, Choice.FINITEFIELDELEMENT, Choice.PRIMEFIELDELEMENT, Choice.EXECUTE]:
-                raise ValueError()
-
-            valid = True
-        except:
-            print(NOT_DEFINED)
-    return action
-
-
-def get_integer() -> int:
-    valid = False
-    while not valid:
-        try:
-            val = int(input())
-            valid = True
-        except:
-            print("Wrong value. Try again.")
-            print("Enter number:", end=" ")
-    return val
-
-
-def get_prime(n) -> int:
-    valid = False
-    while not valid:
-        if n > 1:
-            for i in range(2, int(n/2)+1):
-                if (n % i) == 0:
-                    print(n, "is not a prime number")
-                break
-            return n
-        # If the number is less than 1, its also not a prime number.
-        else:
-            print(n, "is not a prime number")
-        n = get_integer()
-
-
-def get_list() -> list:
-    valid = False
-
-    while not valid:
-        # Get user input
-        user_input = input(
-            "Enter the array of integers in the form '[a1, a2, ... an]': ")
-
-        # Validate input format
-        try:
-            # Convert input string to a list
-            input_list = ast.literal_eval(user_input)
-
-            # Check if the input is a list
-            if isinstance(input_list, list):
-                # Check if all elements are integers
-                if all(isinstance(element, int) for element in input_list):
-                    return input_list
-                else:
-                    print("Input should contain only integers.")
-            else:
-                print("Input should be a list.")
-        except (SyntaxError, ValueError):
-            print("Invalid input format.")
-
-
-print(WELCOME_MESSAGE)
-
-
-# Define arrays to store the elements the user will create
-list_PF_element: List[PrimeFieldElement] = []
-list_FF: List[FiniteField] = []
-list_FF_element: List[FiniteFieldElement] = []
-
-running = True
-while running:
-    print(ASK_INPUT)
-    print(ACTION_LIST)
-
-    # Get the action numer from the user
-    choice = get_user_choice()
-
-    # Creation of a PrimeFieldElement object
-    if choice == Choice.PRIMEFIELDELEMENT:
-        print("Enter number:", end=" ")
-        a = get_integer()
-        print("Enter prime number:", end=" ")
-        p = get_prime(get_integer())
-        alpha = PrimeFieldElement(a, p)
-        list_PF_element.append(alpha)
-
-    # Creation of a FiniteField object
-    elif choice == Choice.FINITEFIELD:
-        print("Enter prime number:", end=" ")
-        p = get_prime(get_integer())
-        print("Enter the function coefficients:", end=" ")
-        f_coeffs = get_list()
-        alpha = FiniteField(p, f_coeffs)
-        list_FF.append(alpha)
-
-    # Creation of a FiniteFieldElement object
-    elif choice == Choice.FINITEFIELDELEMENT:
-        if not len(list_FF):
-            print("No Finite Field defined: you cannot define a FiniteFieldElement")
-            continue
-        print(AVAILABLE_FIELDS)
-        for i in range(len(list_FF)):
-            print(f"({i}) {list_FF[i]}")
-        print("Enter the element coefficients:", end=" ")
-        coeffs = get_list()
-        print("Enter field number")
-        n = get_integer()
-        if n < 0 or n > len(list_FF):
-            print("Index not valid")
-            continue
-        alpha = FiniteFieldElement(coeffs, list_FF[n])
-        list_FF_element.append(alpha)
-
-    elif choice == Choice.EXECUTE:
-        command = input("Enter a Python command: ")
-        out = None
-        exec(f"out = {command}")
-        print(out)
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Overflow-safe modular arithmetic on the integer NumPy arrays of coefficients.
+
+The coefficients (residues modulo p) are stored in int64 for p < 2^62, and as Python integers
+(object dtype) above. The product of two residues fits in int64 only when p^2 < 2^63, i.e. for
+p up to about 3 * 10^9 (31-bit primes). Up to 2^62 (61-bit primes), the products are computed
+with a split multiplication: b = b_1 2^31 + b_0, and every partial product a * c with c < 2^31
+is reduced with a floating point estimate of its quotient by p, the remainder being computed
+exactly with the wrapping uint64 arithmetic.
+"""
+
+import random
+import numpy as np
+
+# Largest value of an int64 accumulator
+INT64_MAX = 2 ** 63 - 1
+
+# The residues are stored in int64 below this bound, as Python integers above
+SPLIT_LIMIT = 2 ** 62
+
+# The second factor of the split multiplication is cut in two halves of SPLIT_BITS bits
+SPLIT_BITS = 31
+SPLIT_MASK = (1 << SPLIT_BITS) - 1
+
+
+def select_dtype(p: int) -> str:
+    """
+    Returns the dtype of the residues modulo p: int64 for p < 2^62, else object (Python integers)
+    """
+
+    return "int64" if p < SPLIT_LIMIT else "object"
+
+
+def fits_int64(p: int, terms: int = 1) -> bool:
+    """
+    Check if a sum of terms products of two residues modulo p, plus one residue, fits in int64:
+    a dot product of length terms can then be computed before the reduction modulo p
+    """
+
+    return terms * (p - 1) ** 2 + (p - 1) <= INT64_MAX
+
+
+def random_residues(p: int, shape):
+    """
+    Uniform random residues modulo p, as an array of the dtype given by select_dtype(p)
+    """
+
+    if select_dtype(p) == "int64":
+        return np.random.randint(0, p, size=shape, dtype="int64")
+
+    size = int(np.prod(shape, dtype=object))
+    return np.array([random.randrange(p) for _ in range(size)], dtype=object).reshape(shape)
+
+
+def mul_mod(a, b, p: int):
+    """
+    Elementwise product a * b modulo p of two arrays of residues (with broadcasting)
+    """
+
+    a, b = np.asarray(a), np.asarray(b)
+
+    # The Python integers and the small primes do not overflow
+    if a.dtype == object or b.dtype == object or fits_int64(p):
+        return a * b % p
+
+    # a b = (a b_1) 2^31 + a b_0
+    high = _mul_small(a, b >> SPLIT_BITS, p)
+    result = _mul_small(high, np.int64(1 << SPLIT_BITS), p) + _mul_small(a, b & SPLIT_MASK, p)
+    return np.where(result >= p, result - p, result)
+
+
+def _mul_small(a, c, p: int):
+    """
+    Computes a * c modulo p for residues a < p < 2^62 and 0 <= c < 2^31.
+    The quotient q = floor(a c / p) < 2^31 is estimated in float64 up to +-1, so the remainder
+    a c - q p is in [-p, 2p): it is computed modulo 2^64 in uint64 and then corrected
+    """
+
+    with np.errstate(over="ignore"):
+        quotient = np.floor(a.astype("float64") * c.astype("float64") / p).astype("uint64")
+        remainder = (a.astype("uint64") * c.astype("uint64") - quotient * np.uint64(p)).astype("int64")
+
+    remainder = np.where(remainder < 0, remainder + p, remainder)
+    return np.where(remainder >= p, remainder - p, remainder)
+
+
+def sum_mod(data, p: int, axis=None):
+    """
+    Sum modulo p of an array of residues (along an axis, or of all the values).
+    When the sum could overflow, the high and the low SPLIT_BITS bits of the residues are summed separately
+    """
+
+    data = np.asarray(data)
+    count = data.size if axis is None else data.shape[axis]
+
+    if data.dtype == object or count * (p - 1) <= INT64_MAX:
+        return data.sum(axis=axis) % p
+
+    high = (data >> SPLIT_BITS).sum(axis=axis) % p
+    low = (data & SPLIT_MASK).sum(axis=axis) % p
+    return (mul_mod(high, np.int64(1 << SPLIT_BITS), p) + low) % p
@@ -0,0 +1,225 @@
+"""
+Number theoretic transform (NTT): the discrete Fourier transform over the prime field k, used to
+multiply long polynomials in O(n log n).
+
+A transform of length 2^e needs a primitive 2^e-th root of unity in k, so 2^e must divide p - 1
+(p = c 2^e + 1, e.g. 998244353 = 119 * 2^23 + 1). The butterflies of every stage are computed
+at once on the whole array, with the overflow-safe products of modularReduction, and the twiddle
+factors are cached for every (p, length).
+
+For any other p, the product of two polynomials with residues modulo p is computed exactly in
+the integers from its residues modulo several NTT primes (CRT_PRIMES), which are recombined
+with Garner's algorithm and then reduced modulo p.
+"""
+
+from functools import lru_cache
+import numpy as np
+from factorization import factorize
+from modularReduction import SPLIT_LIMIT, select_dtype, mul_mod
+
+# NTT primes c 2^e + 1 below 2^31 (their products fit in int64), with 2^23 | p - 1 at least
+CRT_PRIMES = [2013265921, 469762049, 1811939329, 167772161, 2113929217,
+              1711276033, 1107296257, 754974721, 1224736769, 998244353]
+
+
+def two_adicity(p: int) -> int:
+    """
+    Returns e such that 2^e is the largest power of 2 dividing p - 1: the longest transform has length 2^e
+    """
+
+    return ((p - 1) & -(p - 1)).bit_length() - 1
+
+
+def supports_length(p: int, length: int) -> bool:
+    """
+    Check if k has an NTT of a length at least length (and if its residues are stored in int64)
+    """
+
+    return p < SPLIT_LIMIT and p > 2 and length <= 1 << two_adicity(p)
+
+
+@lru_cache(maxsize=None)
+def primitive_root(p: int) -> int:
+    """
+    Returns the smallest generator of the multiplicative group k*
+    """
+
+    factors = factorize(p - 1)
+    for g in range(2, p):
+        if all(pow(g, (p - 1) // r, p) != 1 for r in factors):
+            return g
+
+    return 1
+
+
+def root_of_unity(p: int, length: int) -> int:
+    """
+    Returns a primitive length-th root of unity of k, where length is a power of 2 dividing p - 1
+    """
+
+    if (p - 1) % length:
+        error = f"There is no primitive {length}-th root of unity modulo {p}"
+        raise ValueError(error)
+
+    return pow(primitive_root(p), (p - 1) // length, p)
+
+
+@lru_cache(maxsize=64)
+def bit_reverse_permutation(length: int):
+    """
+    The permutation which reverses the bits of the indices 0, ..., length - 1 (length = 2^e)
+    """
+
+    bits = length.bit_length() - 1
+    indices = np.arange(length)
+    result = np.zeros(length, dtype="int64")
+    for bit in range(bits):
+        result |= ((indices >> bit) & 1) << (bits - 1 - bit)
+
+    result.setflags(write=False)
+    return result
+
+
+@lru_cache(maxsize=64)
+def twiddle_factors(p: int, length: int, inverse: bool = False):
+    """
+    The powers w^0, ..., w^(length/2 - 1) of the primitive length-th root of unity w (or of its inverse).
+    The stage of half-length h of the transform uses every (length / 2h)-th of them.
+    The tables are cached for every (p, length) and are read-only
+    """
+
+    root = root_of_unity(p, length)
+    if inverse:
+        root = pow(root, -1, p)
+
+    # The powers are computed by doubling: w^(i + size) = w^i w^size
+    half = max(length // 2, 1)
+    result = np.ones(half, dtype="int64")
+    size = 1
+    while size < half:
+        result[size:2 * size] = mul_mod(result[:size], np.int64(pow(root, size, p)), p)
+        size *= 2
+
+    result.setflags(write=False)
+    return result
+
+
+def ntt(a, p: int, inverse: bool = False):
+    """
+    Iterative radix-2 NTT of the residues a along their last axis, whose length is a power of 2
+    dividing p - 1 (the leading axes are independent transforms).
+    The inverse transform includes the division by the length
+    """
+
+    a = np.asarray(a, dtype="int64")
+    length = a.shape[-1]
+    if length & (length - 1) or not supports_length(p, length):
+        error = f"The NTT modulo {p} does not support the length {length}"
+        raise ValueError(error)
+
+    twiddles = twiddle_factors(p, length, inverse)
+    a = a[..., bit_reverse_permutation(length)]
+
+    half = 1
+    while half < length:
+        blocks = a.reshape(a.shape[:-1] + (-1, 2 * half))
+        even = blocks[..., :half]
+        odd = mul_mod(blocks[..., half:], twiddles[::length // (2 * half)], p)
+        a = np.concatenate(((even + odd) % p, (even - odd) % p), axis=-1).reshape(a.shape)
+        half *= 2
+
+    if inverse:
+        a = mul_mod(a, np.int64(pow(length, -1, p)), p)
+
+    return a
+
+
+def ntt_convolve(a, b, p: int):
+    """
+    Product of the polynomials with coefficients a and b (residues modulo p) with the NTT.
+    The length of the product must be supported by p (see supports_length)
+    """
+
+    size = len(a) + len(b) - 1
+    length = 1 << max(size - 1, 0).bit_length()
+
+    fa = ntt(_pad(a, length), p)
+    fb = ntt(_pad(b, length), p)
+    return ntt(mul_mod(fa, fb, p), p, inverse=True)[:size]
+
+
+def crt_primes(p: int, terms: int):
+    """
+    Returns the fewest primes of CRT_PRIMES whose product exceeds the coefficients of a product of
+    two polynomials with residues modulo p, terms being the length of the shortest one.
+    Returns None if all of CRT_PRIMES are not enough
+    """
+
+    bound = terms * (p - 1) ** 2
+    product = 1
+    for count, prime in enumerate(CRT_PRIMES, 1):
+        product *= prime
+        if product > bound:
+            return CRT_PRIMES[:count]
+
+    return None
+
+
+def supports_crt(p: int, length: int, terms: int) -> bool:
+    """
+    Check if the product of length coefficients, with terms the length of the shortest factor,
+    can be computed modulo p with CRT_PRIMES
+    """
+
+    primes = crt_primes(p, terms)
+    return primes is not None and all(supports_length(prime, length) for prime in primes)
+
+
+def crt_convolve(a, b, p: int):
+    """
+    Product of the polynomials with coefficients a and b (residues modulo any p) with the NTT modulo
+    several primes m_i: the exact product in Z is recovered from its residues by Garner's algorithm,
+    then reduced modulo p. The length of the product must be supported by crt_primes (see supports_crt)
+    """
+
+    size = len(a) + len(b) - 1
+    length = 1 << max(size - 1, 0).bit_length()
+    primes = crt_primes(p, min(len(a), len(b)))
+    if primes is None:
+        error = f"The coefficients of the product are too large for the CRT primes"
+        raise ValueError(error)
+
+    # The residues modulo every m_i
+    residues = []
+    for prime in primes:
+        fa = ntt(_pad(np.asarray(a) % prime, length), prime)
+        fb = ntt(_pad(np.asarray(b) % prime, length), prime)
+        residues.append(ntt(mul_mod(fa, fb, prime), prime, inverse=True)[:size])
+
+    # Garner's algorithm: the product is v_0 + v_1 m_0 + v_2 m_0 m_1 + ... with 0 <= v_i < m_i
+    digits = []
+    for i, prime in enumerate(primes):
+        digit = residues[i]
+        for j in range(i):
+            digit = (digit - digits[j]) * pow(primes[j], -1, prime) % prime
+        digits.append(digit)
+
+    dtype = select_dtype(p)
+    result = np.zeros(size, dtype=dtype)
+    radix = 1
+    for digit, prime in zip(digits, primes):
+        term = mul_mod(digit.astype(dtype) % p, np.array(radix % p, dtype=dtype), p)
+        result = (result + term) % p
+        radix *= prime
+
+    return result
+
+
+def _pad(a, length: int):
+    """
+    The residues a followed by zeros up to the given length, in int64
+    """
+
+    result = np.zeros(length, dtype="int64")
+    result[:len(a)] = a
+    return result
@@ -0,0 +1,207 @@
+"""
+Discrete logarithms computed across a pool of processes.
+
+The fields and the elements are pickled compactly as (p, f_coeffs) and their coefficients
+(see FiniteField.__reduce__ and FiniteFieldElement.__reduce__).
+
+- parallel_bsgs: every worker builds the baby steps of g once, then the giant steps of every
+  target are split in chunks which are solved by different workers.
+- parallel_pollard_rho_log: the workers run independent walks of Pollard's rho and send back
+  their distinguished points, which are collected by the main process.
+- parallel_discrete_log: Pohlig-Hellman where the large prime subgroups use parallel_pollard_rho_log.
+"""
+
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import List
+from finiteFieldElement import FiniteFieldElement, BSGSTable
+from discreteLog import BSGS_LIMIT, crt, default_distinguished_bits, random_multipliers, rho_steps, \
+    rho_walk, rho_collision, prime_power_log
+
+# Number of chunks of giant steps per worker, so that the fast workers take more chunks
+CHUNKS_PER_WORKER = 4
+
+# Number of walks of Pollard's rho run by a worker in one task
+WALKS_PER_TASK = 16
+
+# The BSGS table of the worker process, built once by _init_bsgs_worker
+_worker_table = None
+
+
+def _init_bsgs_worker(g: FiniteFieldElement, order: int):
+    """
+    Builds the baby steps of g in the worker process
+    """
+
+    global _worker_table
+    _worker_table = BSGSTable(g, order)
+
+
+def _bsgs_chunk(h: FiniteFieldElement, start: int, stop: int):
+    """
+    Tries the giant steps start, ..., stop-1 for the target h
+    """
+
+    return _worker_table.log(h, start, stop)
+
+
+def parallel_bsgs(g: FiniteFieldElement, targets: List[FiniteFieldElement], order: int = None,
+                  workers: int = None) -> List[int]:
+    """
+    Solves g^x = h for every target h with BSGS, the giant steps being split across the workers.
+    Returns the list of the logarithms (None for the targets which are not powers of g)
+
+    Parameters
+    ----------
+    g : the base of the logarithms
+    targets : the elements h
+    order : the order of g (or a multiple of it), p^n - 1 by default
+    workers : the number of processes, os.cpu_count() by default
+    """
+
+    if order is None:
+        order = g.field.p ** g.field.n - 1
+    workers = workers or os.cpu_count()
+
+    # Same m as BSGSTable
+    m = BSGSTable.giant_steps_count(order)
+    chunk = -(-m // (workers * CHUNKS_PER_WORKER))
+
+    results = [None] * len(targets)
+    with ProcessPoolExecutor(workers, initializer=_init_bsgs_worker, initargs=(g, order)) as executor:
+
+        futures = {}
+        for index, h in enumerate(targets):
+            for start in range(0, m, chunk):
+                futures[executor.submit(_bsgs_chunk, h, start, min(start + chunk, m))] = index
+
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                x = future.result()
+                index = futures[future]
+                if x is None or results[index] is not None:
+                    continue
+                results[index] = x
+
+                # The other chunks of this target are not needed anymore
+                for other in pending:
+                    if futures[other] == index:
+                        other.cancel()
+
+            pending = {future for future in pending if not future.cancelled()}
+
+    return results
+
+
+def _rho_walks(g: FiniteFieldElement, h: FiniteFieldElement, prime: int, multipliers, distinguished_bits: int,
+               walks: int, seed: int):
+    """
+    Runs several walks of Pollard's rho in a worker and returns their distinguished points
+    """
+
+    steps = rho_steps(g, h, multipliers)
+    generator = random.Random(seed)
+
+    points = []
+    for _ in range(walks):
+        point = rho_walk(g, h, prime, steps, distinguished_bits, generator)
+        if point is not None:
+            points.append(point)
+
+    return points
+
+
+def parallel_pollard_rho_log(g: FiniteFieldElement, h: FiniteFieldElement, prime: int,
+                             executor: ProcessPoolExecutor, workers: int) -> int:
+    """
+    Pollard's rho with distinguished points for g^x = h (g of prime order q), the walks being run
+    by the workers of the executor. All the walks use the same multipliers, so that two walks
+    reaching the same point continue together until the same distinguished point
+    """
+
+    distinguished_bits = default_distinguished_bits(prime)
+    multipliers = random_multipliers(prime)
+    distinguished = {}
+
+    def submit():
+        return executor.submit(_rho_walks, g, h, prime, multipliers, distinguished_bits,
+                               WALKS_PER_TASK, random.getrandbits(64))
+
+    pending = {submit() for _ in range(workers)}
+    try:
+        while True:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                for point in future.result():
+                    x = rho_collision(g, h, prime, distinguished, point)
+                    if x is not None:
+                        return x
+                pending.add(submit())
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def parallel_discrete_log(g: FiniteFieldElement, targets: List[FiniteFieldElement], workers: int = None) -> List[int]:
+    """
+    Solves g^x = h for every target h with Pohlig-Hellman. The prime subgroups of order up to
+    BSGS_LIMIT are solved in the main process, the larger ones with Pollard's rho across the workers.
+    One pool of processes is shared by all the targets. Returns x modulo the order of g
+    """
+
+    workers = workers or os.cpu_count()
+    order = g.mult_order()
+    one = g.one()
+
+    factors = {}
+    for prime in g.field.group_order_factorization():
+        exponent = 0
+        while order % prime ** (exponent + 1) == 0:
+            exponent += 1
+        if exponent:
+            factors[prime] = exponent
+
+    results = []
+    with ProcessPoolExecutor(workers) as executor:
+        for h in targets:
+
+            if h ** order != one:
+                error = f"{h} is not a power of {g}"
+                raise ValueError(error)
+
+            residues, moduli = [], []
+            for prime, exponent in factors.items():
+                cofactor = order // prime ** exponent
+                g_i, h_i = g ** cofactor, h ** cofactor
+
+                if prime <= BSGS_LIMIT:
+                    residues.append(prime_power_log(g_i, h_i, prime, exponent))
+                else:
+                    residues.append(_parallel_prime_power_log(g_i, h_i, prime, exponent, executor, workers))
+                moduli.append(prime ** exponent)
+
+            results.append(crt(residues, moduli))
+
+    return results
+
+
+def _parallel_prime_power_log(g: FiniteFieldElement, h: FiniteFieldElement, prime: int, exponent: int,
+                              executor: ProcessPoolExecutor, workers: int) -> int:
+    """
+    Same as prime_power_log, with the digits computed by parallel_pollard_rho_log
+    """
+
+    gamma = g ** (prime ** (exponent - 1))
+    g_inverse = g.inverse()
+    one = g.one()
+
+    x = 0
+    for k in range(exponent):
+        target = (g_inverse ** x * h) ** (prime ** (exponent - 1 - k))
+        if target != one:
+            x += parallel_pollard_rho_log(gamma, target, prime, executor, workers) * prime ** k
+
+    return x
@@ -0,0 +1,588 @@
+"""
+Polynomials with coefficients in a finite field: the prime field k (PrimeFieldElement coefficients)
+or an extended field l (FiniteFieldElement coefficients).
+
+The coefficients are stored in one PrimeFieldArray or FieldArray, from the lowest degree to the highest.
+The product of two polynomials over k is computed according to their length:
+- np.convolve (schoolbook) for short polynomials,
+- the NTT when 2^e divides p - 1 for a transform long enough (see ntt.py),
+- else the NTT modulo several primes and the CRT, when they bound the coefficients of the product,
+- Karatsuba on the arrays of residues otherwise.
+Over l, the coefficients are themselves polynomials in x of degree < n: the Kronecker substitution
+y = x^(2n-1) packs a polynomial over l in one polynomial over k, so the product is one product
+over k followed by the reduction modulo f(x) of every block of 2n - 1 coefficients.
+
+The division uses Newton's iteration for the inverse of the reversed divisor when the quotient is
+long, the modular composition uses the baby-step giant-step method of Brent and Kung, and the
+multipoint evaluation goes down a subproduct tree.
+"""
+
+import math
+import numpy as np
+from finiteField import FiniteField
+from fieldArray import _BaseArray, FieldArray, PrimeFieldArray
+from primeFieldElement import PrimeFieldElement
+from modularReduction import INT64_MAX, select_dtype, fits_int64, mul_mod
+from ntt import supports_length, supports_crt, ntt_convolve, crt_convolve
+
+# Below this length, the products of residues are computed with np.convolve
+CONVOLUTION_THRESHOLD = 64
+
+# Karatsuba's recursion stops at this length: below it, the calls cost more than the schoolbook products
+KARATSUBA_THRESHOLD = 512
+
+# The division uses Newton's iteration when the quotient has more coefficients than this bound
+NEWTON_THRESHOLD = 64
+
+# The multipoint evaluation uses Horner's method on the blocks of this number of points
+EVALUATION_THRESHOLD = 64
+
+
+def convolve_mod(a, b, p: int):
+    """
+    Product of two polynomials over k given by arrays of residues modulo p
+    """
+
+    if len(a) == 0 or len(b) == 0:
+        return np.zeros(0, dtype=select_dtype(p))
+
+    if min(len(a), len(b)) <= CONVOLUTION_THRESHOLD:
+        return _schoolbook(a, b, p)
+
+    size = len(a) + len(b) - 1
+    if supports_length(p, size):
+        return ntt_convolve(a, b, p)
+
+    if supports_crt(p, size, min(len(a), len(b))):
+        return crt_convolve(a, b, p)
+
+    return _karatsuba(a, b, p)
+
+
+def _schoolbook(a, b, p: int):
+    """
+    Schoolbook product with np.convolve. When its sums could overflow, the residues are cut in
+    limbs of w bits, a = sum a_i 2^(wi), and the products of limbs are convolved exactly in int64
+    """
+
+    terms = min(len(a), len(b))
+    if a.dtype == object or b.dtype == object or fits_int64(p, terms):
+        return np.convolve(a, b) % p
+
+    # The smallest number of limbs such that the sum of the convolutions of a plane fits in int64
+    limbs = 2
+    width = -(-p.bit_length() // limbs)
+    while limbs * terms * ((1 << width) - 1) ** 2 > INT64_MAX:
+        limbs += 1
+        width = -(-p.bit_length() // limbs)
+
+    mask = (1 << width) - 1
+    a_limbs = [(a >> (width * i)) & mask for i in range(limbs)]
+    b_limbs = [(b >> (width * i)) & mask for i in range(limbs)]
+
+    # The plane k holds the sum of the convolutions of a_i and b_j for i + j = k
+    result = np.zeros(len(a) + len(b) - 1, dtype=a.dtype)
+    for k in range(2 * limbs - 1):
+        plane = np.zeros(len(result), dtype=a.dtype)
+        for i in range(max(0, k - limbs + 1), min(k, limbs - 1) + 1):
+            plane += np.convolve(a_limbs[i], b_limbs[k - i])
+        result = (result + mul_mod(plane % p, np.int64(pow(2, width * k, p)), p)) % p
+
+    return result
+
+
+def _karatsuba(a, b, p: int):
+    """
+    Karatsuba's product on arrays of residues: a = a_0 + x^h a_1, b = b_0 + x^h b_1 and
+    a b = a_0 b_0 + x^h ((a_0 + a_1)(b_0 + b_1) - a_0 b_0 - a_1 b_1) + x^(2h) a_1 b_1
+    """
+
+    if min(len(a), len(b)) <= KARATSUBA_THRESHOLD:
+        return _schoolbook(a, b, p)
+
+    if len(a) < len(b):
+        a, b = b, a
+
+    half = len(a) // 2
+    result = np.zeros(len(a) + len(b) - 1, dtype=a.dtype)
+
+    # b is short: only a is split
+    if len(b) <= half:
+        low = _karatsuba(a[:half], b, p)
+        high = _karatsuba(a[half:], b, p)
+        result[:len(low)] = low
+        result[half:half + len(high)] = (result[half:half + len(high)] + high) % p
+        return result
+
+    a0, a1 = a[:half], a[half:]
+    b0, b1 = b[:half], b[half:]
+    z0 = _karatsuba(a0, b0, p)
+    z2 = _karatsuba(a1, b1, p)
+    z1 = _karatsuba(_add_mod(a0, a1, p), _add_mod(b0, b1, p), p)
+
+    # z1 - z0 - z2, the middle coefficients
+    middle = _add_mod(z1, -_add_mod(z0, z2, p), p)
+
+    result[:len(z0)] = z0
+    result[2 * half:2 * half + len(z2)] = z2
+    result[half:half + len(middle)] = (result[half:half + len(middle)] + middle) % p
+    return result
+
+
+def _add_mod(a, b, p: int):
+    """
+    Sum of two arrays of residues of different lengths
+    """
+
+    if len(a) < len(b):
+        a, b = b, a
+    result = a.copy()
+    result[:len(b)] = (result[:len(b)] + b) % p
+    return result
+
+
+class Polynomial:
+    """
+    This class represents a polynomial a_0 + a_1 x + ... + a_d x^d with coefficients in k or in l
+    """
+
+    def __init__(self, coeffs, field=None):
+        """
+        Generate a polynomial from its coefficients
+
+        Parameters
+        ----------
+        coeffs : the coefficients [a_0, ..., a_d], as a PrimeFieldArray or a FieldArray, or as a list
+                 of PrimeFieldElement or FiniteFieldElement objects, or as a list of integers
+        field : the field of the coefficients, a FiniteField or a prime p for the prime field k.
+                It is needed for a list of integers or an empty list
+        """
+
+        if not isinstance(coeffs, _BaseArray):
+            coeffs = list(coeffs)
+
+            if field is None:
+                if not coeffs or isinstance(coeffs[0], (int, np.integer)):
+                    error = f"The field must be given for a list of integers or an empty list"
+                    raise ValueError(error)
+                field = coeffs[0].p if isinstance(coeffs[0], PrimeFieldElement) else coeffs[0].field
+
+            integers = all(isinstance(coeff, (int, np.integer)) for coeff in coeffs)
+
+            if isinstance(field, FiniteField):
+                if integers:
+                    # The integers are the constants of l
+                    data = np.zeros((len(coeffs), field.n), dtype=field.type)
+                    data[:, 0] = [int(coeff) % field.p for coeff in coeffs]
+                    coeffs = FieldArray(data, field)
+                else:
+                    coeffs = FieldArray.from_elements(coeffs, field)
+            else:
+                if integers:
+                    coeffs = PrimeFieldArray([int(coeff) % field for coeff in coeffs], field)
+                else:
+                    coeffs = PrimeFieldArray.from_elements(coeffs, field)
+
+        coeffs = coeffs.reshape(-1)
+
+        # Remove the zero coefficients of highest degree
+        nonzero = np.flatnonzero(~np.asarray(coeffs.is_zero()))
+        self.coeffs = coeffs[:nonzero[-1] + 1 if len(nonzero) else 0]
+
+        # The field of the coefficients: a FiniteField, or the prime p for k
+        self.field = self.coeffs.field if isinstance(self.coeffs, FieldArray) else self.coeffs.p
+
+    @classmethod
+    def from_roots(cls, roots):
+        """
+        Returns the monic polynomial (x - r_1)...(x - r_m) whose roots are given as an array or a list of elements
+        """
+
+        roots = _as_array(roots).reshape(-1)
+
+        # Small blocks of roots are expanded one root at a time, then the blocks are multiplied in a tree
+        blocks = [cls.__expand(roots[start:start + EVALUATION_THRESHOLD])
+                  for start in range(0, len(roots), EVALUATION_THRESHOLD)]
+        if not blocks:
+            return cls(roots.ones_like((1,)))
+
+        while len(blocks) > 1:
+            blocks = [blocks[i] * blocks[i + 1] if i + 1 < len(blocks) else blocks[i] for i in range(0, len(blocks), 2)]
+        return blocks[0]
+
+    @classmethod
+    def __expand(cls, roots):
+        """
+        Expands the product of the (x - r) one root at a time
+        """
+
+        zero = roots.zeros_like((1,))
+        coeffs = roots.ones_like((1,))
+        for i in range(len(roots)):
+            coeffs = zero.concatenate(coeffs) - coeffs.concatenate(zero) * roots[i:i + 1]
+        return cls(coeffs)
+
+    @property
+    def degree(self) -> int:
+        """
+        The degree of the polynomial, -1 for the zero polynomial
+        """
+
+        return len(self.coeffs) - 1
+
+    def is_zero(self) -> bool:
+        return len(self.coeffs) == 0
+
+    def leading(self):
+        """
+        The coefficient of highest degree
+        """
+
+        return self.coeffs[len(self.coeffs) - 1]
+
+    def __new(self, coeffs):
+        return self.__class__(coeffs)
+
+    def zero(self):
+        return self.__new(self.coeffs.zeros_like((0,)))
+
+    def one(self):
+        return self.__new(self.coeffs.ones_like((1,)))
+
+    def __padded(self, length: int):
+        """
+        The array of coefficients padded with zeros to the given length
+        """
+
+        return self.coeffs.concatenate(self.coeffs.zeros_like((length - len(self.coeffs),)))
+
+    def __check(self, other):
+        """
+        Check if the other object is a polynomial over the same field
+        """
+
+        if not isinstance(other, Polynomial):
+            error = f"The second element is not a Polynomial object"
+            raise TypeError(error)
+
+        if other.field != self.field:
+            error = f"Cannot perform the operation with polynomials over different fields"
+            raise TypeError(error)
+
+    def __add__(self, other):
+        self.__check(other)
+        length = max(len(self.coeffs), len(other.coeffs))
+        return self.__new(self.__padded(length) + other.__padded(length))
+
+    def __sub__(self, other):
+        self.__check(other)
+        length = max(len(self.coeffs), len(other.coeffs))
+        return self.__new(self.__padded(length) - other.__padded(length))
+
+    def __neg__(self):
+        return self.__new(-self.coeffs)
+
+    def __mul__(self, other):
+        """
+        Overload the * operator, for a polynomial or a constant of the field
+        """
+
+        if not isinstance(other, Polynomial):
+            return self.__new(self.coeffs * other)
+
+        self.__check(other)
+        if self.is_zero() or other.is_zero():
+            return self.zero()
+
+        a, b = self.coeffs, other.coeffs
+        if isinstance(a, PrimeFieldArray):
+            return self.__new(a.like(convolve_mod(a.data, b.data, self.field)))
+
+        # Kronecker substitution: the coefficient i is placed at the block i of 2n - 1 coefficients in k
+        field = self.field
+        n = field.n
+        block = 2 * n - 1
+
+        packed_a = np.zeros((len(a), block), dtype=field.type)
+        packed_a[:, :n] = a.data
+        packed_b = np.zeros((len(b), block), dtype=field.type)
+        packed_b[:, :n] = b.data
+
+        product = convolve_mod(packed_a.reshape(-1), packed_b.reshape(-1), field.p)
+        size = len(a) + len(b) - 1
+        product = product[:size * block].reshape(size, block)
+
+        # Every block is the product of polynomials in x, reduced modulo f(x)
+        return self.__new(FieldArray(field.reduce_product(product), field))
+
+    __rmul__ = __mul__
+
+    def __pow__(self, exponent: int):
+        if exponent < 0:
+            error = f"The exponent has to be non-negative (instead of {exponent})"
+            raise ValueError(error)
+
+        result = self.one()
+        for bit in bin(exponent)[2:]:
+            result = result * result
+            if bit == "1":
+                result = result * self
+        return result
+
+    def __truncate(self, length: int):
+        """
+        The polynomial modulo x^length
+        """
+
+        return self.__new(self.coeffs[:length])
+
+    def __reverse(self, length: int):
+        """
+        The polynomial x^(length-1) a(1/x), for a polynomial of degree < length
+        """
+
+        return self.__new(self.__padded(length)[::-1])
+
+    def inverse_series(self, length: int):
+        """
+        Computes the inverse of the polynomial modulo x^length with Newton's iteration
+        g -> g (2 - a g), which doubles the number of correct coefficients at every step.
+        The constant coefficient must be non-zero
+        """
+
+        if self.is_zero() or self.coeffs[0:1].is_zero()[0]:
+            error = f"The polynomial is not invertible modulo x^{length}"
+            raise ZeroDivisionError(error)
+
+        g = self.__new(self.coeffs[0:1].inverse())
+        two = self.one() + self.one()
+        precision = 1
+        while precision < length:
+            precision = min(2 * precision, length)
+            error = (self.__truncate(precision) * g).__truncate(precision)
+            g = (g * (two - error)).__truncate(precision)
+
+        return g
+
+    def __divmod__(self, other):
+        """
+        Euclidean division: returns (quotient, remainder)
+        """
+
+        self.__check(other)
+        if other.is_zero():
+            error = f"Division by the zero polynomial"
+            raise ZeroDivisionError(error)
+
+        if self.degree < other.degree:
+            return self.zero(), self
+
+        length = self.degree - other.degree + 1
+        if length <= NEWTON_THRESHOLD or other.degree == 0:
+            return self.__long_division(other)
+
+        return self.__newton_division(other, other.__reverse(other.degree + 1).inverse_series(length))
+
+    def __newton_division(self, other, inverse):
+        """
+        Euclidean division with the inverse of the reversed divisor modulo x^k, for any k at least
+        the number of coefficients of the quotient (so that one inverse serves several divisions)
+        """
+
+        # The reversed quotient is the reversed dividend times the inverse of the reversed divisor modulo x^length
+        length = self.degree - other.degree + 1
+        reversed_quotient = (self.__reverse(self.degree + 1).__truncate(length) * inverse.__truncate(length)).__truncate(length)
+        quotient = reversed_quotient.__reverse(length)
+        return quotient, self - other * quotient
+
+    def __long_division(self, other):
+        """
+        Schoolbook division, one coefficient of the quotient at a time (each step is an array operation)
+        """
+
+        divisor = other.coeffs
+        degree = other.degree
+        lead_inverse = divisor[degree:degree + 1].inverse()
+
+        remainder = self.coeffs.like(self.coeffs.data.copy())
+        quotient = self.coeffs.zeros_like((self.degree - degree + 1,))
+
+        for i in range(self.degree - degree, -1, -1):
+            coeff = remainder[i + degree:i + degree + 1] * lead_inverse
+            quotient[i:i + 1] = coeff
+            remainder[i:i + degree + 1] = remainder[i:i + degree + 1] - divisor * coeff
+
+        return self.__new(quotient), self.__new(remainder[:degree])
+
+    def __floordiv__(self, other):
+        return divmod(self, other)[0]
+
+    def __mod__(self, other):
+        return divmod(self, other)[1]
+
+    def monic(self):
+        """
+        Divides the polynomial by its leading coefficient
+        """
+
+        if self.is_zero():
+            return self
+        return self.__new(self.coeffs * self.coeffs[self.degree:].inverse())
+
+    def gcd(self, other):
+        """
+        Monic greatest common divisor, with the Euclidean algorithm
+        """
+
+        a, b = self, other
+        while not b.is_zero():
+            a, b = b, a % b
+        return a.monic()
+
+    def powmod(self, exponent: int, modulus):
+        """
+        Computes self^exponent modulo the polynomial modulus with the square-and-multiply method
+        """
+
+        # The product of two remainders has a quotient of less than deg(modulus) coefficients,
+        # so the inverse of the reversed modulus is computed once for all the reductions
+        inverse = None
+        if modulus.degree > NEWTON_THRESHOLD:
+            inverse = modulus.__reverse(modulus.degree + 1).inverse_series(modulus.degree)
+
+        def reduce(a):
+            if inverse is None or a.degree - modulus.degree + 1 <= NEWTON_THRESHOLD:
+                return a % modulus
+            return a.__newton_division(modulus, inverse)[1]
+
+        base = self % modulus
+        result = self.one() % modulus
+        for bit in bin(exponent)[2:]:
+            result = reduce(result * result)
+            if bit == "1":
+                result = reduce(result * base)
+        return result
+
+    def compose_mod(self, g, h):
+        """
+        Modular composition: computes self(g(x)) modulo h(x) with the method of Brent and Kung.
+        With m = sqrt(deg self), the baby steps g^0, ..., g^(m-1) mod h are computed once, and
+        self = sum_j F_j(g) (g^m)^j is evaluated by Horner's method on the giant steps g^m,
+        each F_j(g) being a linear combination of the baby steps
+        """
+
+        self.__check(g)
+        self.__check(h)
+        if h.degree < 1:
+            return self.zero()
+        if self.is_zero():
+            return self
+
+        m = math.isqrt(self.degree) + 1
+        size = h.degree
+
+        # The baby steps, as the rows of an array of shape (m, deg h)
+        powers = [self.one() % h]
+        for _ in range(m - 1):
+            powers.append((powers[-1] * g) % h)
+        giant = (powers[-1] * g) % h
+        baby = self.coeffs.like(np.stack([power.__padded(size).data for power in powers]))
+
+        # The coefficients of self in blocks F_j of m coefficients
+        count = -(-len(self.coeffs) // m)
+        blocks = self.__padded(count * m).reshape(count, m)
+
+        result = self.zero()
+        for j in range(count - 1, -1, -1):
+            combination = (blocks[j:j + 1].reshape(m, 1) * baby).sum(axis=0)
+            result = (result * giant) % h + self.__new(combination)
+
+        return result
+
+    def __call__(self, x):
+        """
+        Evaluates the polynomial at one element of the field
+        """
+
+        return self.evaluate(_as_array([x]))[0]
+
+    def evaluate(self, points):
+        """
+        Multipoint evaluation at an array (or a list) of elements. The polynomial is reduced down a
+        subproduct tree: modulo the product of the (x - u) for all the points, then for each half of
+        the points, ... and the small remainders are evaluated with Horner's method
+        """
+
+        points = _as_array(points).reshape(-1)
+        if self.degree <= EVALUATION_THRESHOLD:
+            return self.__horner(points)
+        if len(points) <= EVALUATION_THRESHOLD:
+            return (self % self.from_roots(points)).__horner(points)
+
+        # The leaves are blocks of points, the nodes are the products of their children
+        starts = list(range(0, len(points), EVALUATION_THRESHOLD))
+        tree = [[self.from_roots(points[start:start + EVALUATION_THRESHOLD]) for start in starts]]
+        while len(tree[-1]) > 1:
+            level = tree[-1]
+            tree.append([level[i] * level[i + 1] if i + 1 < len(level) else level[i] for i in range(0, len(level), 2)])
+
+        remainders = [self % tree[-1][0]]
+        for level in reversed(tree[:-1]):
+            remainders = [remainders[i // 2] % node for i, node in enumerate(level)]
+
+        values = [remainder.__horner(points[start:start + EVALUATION_THRESHOLD])
+                  for remainder, start in zip(remainders, starts)]
+        result = values[0]
+        for value in values[1:]:
+            result = result.concatenate(value)
+        return result
+
+    def __horner(self, points):
+        """
+        Horner's method on all the points at once
+        """
+
+        result = points.zeros_like()
+        for i in range(self.degree, -1, -1):
+            result = result * points + self.coeffs[i:i + 1]
+        return result
+
+    def derivative(self):
+        """
+        The formal derivative a_1 + 2 a_2 x + ... + d a_d x^(d-1)
+        """
+
+        if self.degree < 1:
+            return self.zero()
+
+        # i a_i is the sum of i copies of a_i: the factors i are taken modulo p
+        p = self.field.p if isinstance(self.field, FiniteField) else self.field
+        factors = np.arange(1, self.degree + 1).astype(select_dtype(p)) % p
+        if isinstance(self.coeffs, FieldArray):
+            scalars = self.coeffs.zeros_like((self.degree,))
+            scalars.data[:, 0] = factors
+        else:
+            scalars = self.coeffs.like(factors)
+        return self.__new(self.coeffs[1:] * scalars)
+
+    def __eq__(self, other):
+        if not isinstance(other, Polynomial):
+            return False
+        return self.field == other.field and np.array_equal(self.coeffs.data, other.coeffs.data)
+
+    def __repr__(self):
+        return f"Polynomial({self.coeffs.data.tolist()})"
+
+
+def _as_array(elements):
+    """
+    Converts a list of PrimeFieldElement or FiniteFieldElement objects to an array
+    """
+
+    if isinstance(elements, _BaseArray):
+        return elements
+
+    elements = list(elements)
+    if elements and isinstance(elements[0], PrimeFieldElement):
+        return PrimeFieldArray.from_elements(elements)
+    return FieldArray.from_elements(elements)
@@ -0,0 +1,247 @@
+"""
+Irreducible and primitive polynomials of k[x]: a generator of sparse polynomials (binomials,
+trinomials, pentanomials, ...), and a catalog of the polynomials listed in polyexamples.txt.
+
+The cost of a modulus f(x) is its number of non-zero coefficients (its weight), and then the
+degree of its second highest term: the sparser f is, the cheaper the reduction modulo f.
+"""
+
+import itertools
+import os
+import re
+from functools import lru_cache
+from typing import Dict, Iterator, List, Tuple
+from factorization import factorize, factorize_group_order
+from primePolynomial import ben_or_is_irreducible, is_irreducible, poly_powmod, poly_trim
+
+# The candidates are checked for roots in k before Ben-Or's test for p up to this bound
+SMALL_ROOT_LIMIT = 64
+
+CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "polyexamples.txt")
+
+
+def is_primitive_polynomial(f: List[int], p: int) -> bool:
+    """
+    Check if f(x) is primitive: f is irreducible and x generates the multiplicative group
+    of k[x]/<f(x)>, i.e. x^((p^n - 1)/r) != 1 mod f for every prime r dividing p^n - 1
+    """
+
+    f = poly_trim([int(coeff) % p for coeff in f])
+    return is_irreducible(f, p) and x_generates_group(f, p)
+
+
+def x_generates_group(f: List[int], p: int) -> bool:
+    """
+    Check if x generates the multiplicative group of k[x]/<f(x)>, for an irreducible f(x)
+    """
+
+    n = len(f) - 1
+    order = p ** n - 1
+
+    # For n = 1, x is the root -f_0/f_1 of f
+    if n == 1:
+        return is_primitive_root(-f[0] * pow(f[1], -1, p), p)
+
+    x = [0, 1]
+    return all(poly_powmod(x, order // r, f, p) != [1] for r in factorize_group_order(p, n))
+
+
+def modulus_cost(f: List[int]) -> Tuple[int, int]:
+    """
+    The cost of the reduction modulo f: (number of non-zero coefficients, degree of the second highest term)
+    """
+
+    f = poly_trim(f)
+    terms = [i for i, coeff in enumerate(f[:-1]) if coeff != 0]
+    return len(terms) + 1, max(terms, default=0)
+
+
+def has_small_root(f: List[int], p: int) -> bool:
+    """
+    Check if f(x) has a root in k, which is a quick test of reducibility before Ben-Or's test
+    """
+
+    for a in range(p):
+        value = 0
+        for coeff in reversed(f):
+            value = (value * a + coeff) % p
+        if value == 0:
+            return True
+
+    return False
+
+
+def middle_degrees(n: int, count: int) -> Iterator[Tuple[int, ...]]:
+    """
+    Generates the sets of count degrees among 1, ..., n-1, by increasing highest degree
+    """
+
+    if count == 0:
+        yield ()
+        return
+
+    for top in range(count, n):
+        for lower in itertools.combinations(range(1, top), count - 1):
+            yield lower + (top,)
+
+
+def nonzero_tuples(p: int, count: int) -> Iterator[Tuple[int, ...]]:
+    """
+    Generates the tuples of count non-zero elements of k, without building the list of the
+    elements of k (itertools.product would, which is not possible for a large p)
+    """
+
+    if count == 0:
+        yield ()
+        return
+
+    for value in range(1, p):
+        for rest in nonzero_tuples(p, count - 1):
+            yield (value,) + rest
+
+
+def is_primitive_root(a: int, p: int) -> bool:
+    """
+    Check if a generates the multiplicative group k* of the prime field
+    """
+
+    return a % p != 0 and all(pow(a, (p - 1) // r, p) != 1 for r in factorize(p - 1))
+
+
+def binomial_is_irreducible(constant: int, n: int, p: int) -> bool:
+    """
+    Check if the binomial x^n + constant is irreducible in k[x], without Rabin's test: x^n - a is
+    irreducible if and only if a is not an r-th power in k for every prime r dividing n (so r divides
+    p - 1), and p = 1 mod 4 when 4 divides n
+    """
+
+    a = -constant % p
+    if a == 0 or (n % 4 == 0 and p % 4 != 1):
+        return False
+
+    return all((p - 1) % r == 0 and pow(a, (p - 1) // r, p) != 1 for r in factorize(n))
+
+
+def sparse_candidates(p: int, n: int, primitive: bool = False) -> Iterator[List[int]]:
+    """
+    Generates the monic polynomials of degree n with a non-zero constant term,
+    by increasing weight (binomials, trinomials, ...) and then by degree of the middle terms
+    """
+
+    # A binomial x^n - c is never primitive for n > 1: x has order at most n(p - 1) < p^n - 1
+    first_weight = 3 if primitive else 2
+
+    # There is an irreducible binomial only if every prime dividing n divides p - 1 (and 4 | p - 1 when 4 | n)
+    binomials_exist = all((p - 1) % r == 0 for r in factorize(n)) and (n % 4 != 0 or p % 4 == 1)
+
+    for weight in range(first_weight, n + 2):
+
+        # Over F_2, f(1) is the weight of f modulo 2: the polynomials of even weight have the root 1
+        if p == 2 and weight % 2 == 0:
+            continue
+
+        if weight == 2 and not binomials_exist:
+            continue
+
+        for degrees in middle_degrees(n, weight - 2):
+            for constant in range(1, p):
+
+                # The norm of x is (-1)^n f_0: it is a generator of k* when x generates l*
+                if primitive and not is_primitive_root((-1) ** n * constant % p, p):
+                    continue
+
+                # The irreducible binomials are known without Rabin's test
+                if weight == 2 and not binomial_is_irreducible(constant, n, p):
+                    continue
+
+                for values in nonzero_tuples(p, weight - 2):
+                    f = [0] * n + [1]
+                    f[0] = constant
+                    for degree, value in zip(degrees, values):
+                        f[degree] = value
+                    yield f
+
+
+def generate_irreducible(p: int, n: int, primitive: bool = False) -> Iterator[List[int]]:
+    """
+    Generates the irreducible (or primitive) monic polynomials of degree n in k[x], the cheapest first
+
+    Parameters
+    ----------
+    p : a prime number defining the prime field
+    n : the degree of the polynomials
+    primitive : if True, only the primitive polynomials are generated
+    """
+
+    if n == 1:
+        candidates = ([c, 1] for c in range(p))
+    else:
+        candidates = sparse_candidates(p, n, primitive)
+
+    for f in candidates:
+
+        # A polynomial of degree n > 1 with a root in k is reducible (only tested when p is small)
+        if 1 < n and p <= SMALL_ROOT_LIMIT and has_small_root(f, p):
+            continue
+
+        # Ben-Or's test rejects most of the reducible candidates after a few steps
+        if not ben_or_is_irreducible(f, p):
+            continue
+
+        if not primitive or x_generates_group(f, p):
+            yield f
+
+
+def load_catalog(path: str = CATALOG_PATH) -> Dict[Tuple[int, int], List[List[int]]]:
+    """
+    Parses a file in the format of polyexamples.txt: a line "p = ..." followed by the polynomials,
+    each given as a list of coefficients [a_0, a_1, ...].
+    Returns a dictionary {(p, n): [f_coeffs, ...]}
+    """
+
+    catalog = {}
+    p = None
+
+    with open(path) as file:
+        for line in file:
+            line = line.strip()
+
+            match = re.fullmatch(r"p\s*=\s*(\d+)", line)
+            if match:
+                p = int(match.group(1))
+                continue
+
+            if line.startswith("[") and p is not None:
+                f = [int(coeff) for coeff in line.strip("[]").split(",")]
+                catalog.setdefault((p, len(f) - 1), []).append(f)
+
+    return catalog
+
+
+@lru_cache(maxsize=1)
+def default_catalog() -> Dict[Tuple[int, int], List[List[int]]]:
+    """
+    The catalog of polyexamples.txt, parsed once
+    """
+
+    return load_catalog()
+
+
+def cheapest_modulus(p: int, n: int, primitive: bool = False,
+                     catalog: Dict[Tuple[int, int], List[List[int]]] = None) -> List[int]:
+    """
+    Returns the cheapest irreducible (or primitive) polynomial of degree n of the catalog
+    (polyexamples.txt by default), or the first one of the generator when the catalog has none
+    """
+
+    if catalog is None:
+        catalog = default_catalog()
+
+    # The polynomials of the catalog are checked, as it is a file which can be edited
+    check = is_primitive_polynomial if primitive else is_irreducible
+    known = [f for f in catalog.get((p, n), []) if check(f, p)]
+    if known:
+        return list(min(known, key=modulus_cost))
+
+    # The generator yields the cheapest polynomials first, so its first one is the cheapest
+    return next(generate_irreducible(p, n, primitive), None)
@@ -1,9 +1,15 @@
+from exponentiation import power
+
+
 class PrimeFieldElement:
     """
     This class represents an element 'a' in the field k = F_p, where F_p is the prime field
     """
 
-    def __init__(self, a: int, p: int):
+    # No __dict__ per element: the elements are small and created in tight loops
+    __slots__ = ("a", "p")
+
+    def __init__(self, a: int, p: int, check: bool = True):
         """
         Generate an element from the prime field k
 
@@ -11,9 +17,11 @@ class PrimeFieldElement:
         ----------
         a : an element in k
         p : a prime number defining the prime field 
+        check : if False, a is trusted to be in k. The operations pass it as a positional False
+                for their results, which are already reduced modulo p (a keyword argument is slower)
         """
 
-        if a >= p or a < 0:
+        if check and (a >= p or a < 0):
             error = f"Invalid {a} for PrimeField of {p}"
             raise ValueError(error)
         self.a = a
@@ -27,7 +35,7 @@ class PrimeFieldElement:
         # If the other element is a number, we add it to the element
         if isinstance(other, int):
             a = (self.a + other) % self.p
-            return self.__class__(a, self.p)
+            return self.__class__(a, self.p, False)
 
         # If the two elements are belonging to different prime field, throws an error
         if self.p != other.p:
@@ -37,7 +45,7 @@ class PrimeFieldElement:
         # Add the two elements
         a = (self.a + other.a) % self.p
 
-        return self.__class__(a, self.p)
+        return self.__class__(a, self.p, False)
 
     def __sub__(self, other):
         """
@@ -47,7 +55,7 @@ class PrimeFieldElement:
         # If the other element is a number, we substract it to the element
         if isinstance(other, int):
             a = (self.a - other) % self.p
-            return self.__class__(a, self.p)
+            return self.__class__(a, self.p, False)
 
         # If the two elements are belonging to different prime field, throws an error
         if self.p != other.p:
@@ -56,7 +64,7 @@ class PrimeFieldElement:
 
         # Substract the two elements
         a = (self.a - other.a) % self.p
-        return self.__class__(a, self.p)
+        return self.__class__(a, self.p, False)
 
     def __mul__(self, other):
         """
@@ -66,7 +74,7 @@ class PrimeFieldElement:
         # If the other element is a number, we multiply it to the element
         if isinstance(other, int):
             a = (self.a * other) % self.p
-            return self.__class__(a, self.p)
+            return self.__class__(a, self.p, False)
 
         # If the two elements are belonging to different prime field, throws an error
         if self.p != other.p:
@@ -75,7 +83,7 @@ class PrimeFieldElement:
 
         # Multiply the two elements
         a = (self.a * other.a) % self.p
-        return self.__class__(a, self.p)
+        return self.__class__(a, self.p, False)
 
     def __truediv__(self, other):
         """
@@ -111,48 +119,78 @@ class PrimeFieldElement:
             exp = other
 
         if exp == 0:
-            return self.__class__(1, self.p)
+            return self.__class__(1, self.p, False)
         if exp < 0:
             # Find the inverse of the element
             inv = self.inverse()
             exp *= -1
             return inv ** exp
 
-        result = (self.a ** exp) % self.p
-        return self.__class__(result, self.p)
+        # The zero element is not in the multiplicative group, 0^exp = 0
+        if self.a == 0:
+            return self.__class__(0, self.p, False)
 
-    def __gcdExtended(self, a, b):
+        # Since a^(p-1) = 1, the exponent is reduced modulo p-1 before the exponentiation
+        return power(self, exp, self.__class__(1, self.p, False), order=self.p - 1)
+
+    def inverse(self):
         """
-        Function for extended Euclidean Algorithm
+        Compute the inverse of the object according to the field logic
         """
 
-        # Base Case
-        if a == 0:
-            return b, 0, 1
+        if self.a == 0:
+            error = f"{self.a} does not have an inverse in k"
+            raise ValueError(error)
 
-        gcd, x1, y1 = self.__gcdExtended(b % a, a)
+        # pow(a, -1, p) runs the extended Euclidean algorithm iteratively (in C), so it does not
+        # hit the recursion limit for a large p
+        return self.__class__(pow(self.a, -1, self.p), self.p, False)
 
-        # Update x and y using results of recursive call
-        x = y1 - (b//a) * x1
-        y = x1
+    def is_square(self):
+        """
+        Euler's criterion: a is a square in k if and only if a^((p-1)/2) = 1 (or a = 0)
+        """
 
-        return gcd, x, y
+        return self.a == 0 or self.p == 2 or pow(self.a, (self.p - 1) // 2, self.p) == 1
 
-    def inverse(self):
+    def sqrt(self):
         """
-        Compute the inverse of the object according to the field logic
+        Computes a square root of the element, with the Tonelli-Shanks algorithm
+        (or a^((p+1)/4) when p = 3 mod 4). Raises a ValueError if the element is not a square
         """
-        gcd, x, y = self.__gcdExtended(self.a, self.p)
 
-        if gcd == self.p:
-            error = f"{self.a} does not have an inverse in k"
+        if self.a == 0 or self.p == 2:
+            return self
+
+        if not self.is_square():
+            error = f"{self.a} is not a square in k"
             raise ValueError(error)
 
-        if gcd == 1:
-            return self.__class__(x % self.p, self.p)
+        if self.p % 4 == 3:
+            return self.__class__(pow(self.a, (self.p + 1) // 4, self.p), self.p, False)
+
+        # We import tonelli_shanks inside the method to prevent circular imports
+        from rootFinding import tonelli_shanks
+
+        # Half of the elements of k* are not squares
+        z = 2
+        while pow(z, (self.p - 1) // 2, self.p) == 1:
+            z += 1
+
+        one = self.__class__(1, self.p, False)
+        return tonelli_shanks(self, self.__class__(z, self.p, False), one, self.p - 1)
+
+    def __eq__(self, other):
+        """
+        Defines how to compare two elements
+        """
+
+        if not isinstance(other, PrimeFieldElement):
+            return False
+        return self.a == other.a and self.p == other.p
 
-        error = f"The Euclidean algorithm didn't work with this element"
-        raise ValueError(error)
+    def __hash__(self):
+        return hash((self.a, self.p))
 
     def __repr__(self):
         """
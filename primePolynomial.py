@@ -0,0 +1,285 @@
+"""
+Arithmetic on polynomials of k[x], where k = F_p is the prime field.
+
+A polynomial is represented by the list of its coefficients [a_0, a_1, ..., a_d]
+(same order as FiniteField.f_coeffs). The zero polynomial is the empty list.
+
+The lists are meant for the moduli of the fields, of small degree, for which the Python integers
+cost less than the array operations of polynomial.Polynomial. The long products and the powers
+modulo the moduli of high degree are delegated to polynomial.py, which has the only fast
+multiplication (NTT, CRT and Karatsuba)
+"""
+
+from typing import List, Tuple
+import numpy as np
+from factorization import factorize
+from modularReduction import select_dtype
+from binaryField import pack_bits, is_irreducible as binary_is_irreducible
+from binaryField import ben_or_is_irreducible as binary_ben_or_is_irreducible
+
+
+def poly_trim(a: List[int]) -> List[int]:
+    """
+    Removes the zero leading coefficients (at the end of the list)
+    """
+
+    a = list(a)
+    while a and a[-1] == 0:
+        a.pop()
+    return a
+
+
+def poly_add(a: List[int], b: List[int], p: int) -> List[int]:
+    """
+    Computes a(x) + b(x) in k[x]
+    """
+
+    if len(a) < len(b):
+        a, b = b, a
+    result = list(a)
+    for i, coeff in enumerate(b):
+        result[i] = (result[i] + coeff) % p
+    return poly_trim(result)
+
+
+def poly_sub(a: List[int], b: List[int], p: int) -> List[int]:
+    """
+    Computes a(x) - b(x) in k[x]
+    """
+
+    return poly_add(a, [(-coeff) % p for coeff in b], p)
+
+
+def poly_scale(a: List[int], c: int, p: int) -> List[int]:
+    """
+    Computes c * a(x) in k[x], where c is in k
+    """
+
+    return poly_trim([(coeff * c) % p for coeff in a])
+
+
+# Above this number of coefficients, the products are computed on arrays by polynomial.convolve_mod
+# (np.convolve, NTT, CRT or Karatsuba): below it, the lists of Python integers cost less than the arrays
+ARRAY_THRESHOLD = 64
+
+# Above this degree of the modulus, the powers modulo f are computed by the Polynomial class (fast
+# products and Newton's division): below it, its array operations cost more than the lists
+POLYNOMIAL_THRESHOLD = 192
+
+
+def poly_mul(a: List[int], b: List[int], p: int) -> List[int]:
+    """
+    Computes a(x) * b(x) in k[x], with the schoolbook method for small polynomials
+    and with polynomial.convolve_mod for large ones
+    """
+
+    if not a or not b:
+        return []
+
+    if min(len(a), len(b)) <= ARRAY_THRESHOLD:
+        return poly_trim([coeff % p for coeff in _schoolbook(a, b)])
+
+    # We import convolve_mod inside the function to prevent circular imports
+    from polynomial import convolve_mod
+
+    dtype = select_dtype(p)
+    result = convolve_mod(np.array([int(coeff) % p for coeff in a], dtype=dtype),
+                          np.array([int(coeff) % p for coeff in b], dtype=dtype), p)
+    return poly_trim([int(coeff) for coeff in result])
+
+
+def _schoolbook(a: List[int], b: List[int]) -> List[int]:
+    """
+    Schoolbook product of two polynomials over the integers (without reduction modulo p)
+    """
+
+    result = [0] * (len(a) + len(b) - 1)
+    for i, coeff_a in enumerate(a):
+        if coeff_a == 0:
+            continue
+        for j, coeff_b in enumerate(b):
+            result[i + j] += coeff_a * coeff_b
+
+    return result
+
+
+def poly_divmod(a: List[int], b: List[int], p: int) -> Tuple[List[int], List[int]]:
+    """
+    Computes the quotient and the remainder of the euclidean division of a(x) by b(x) in k[x]
+    """
+
+    b = poly_trim(b)
+    if not b:
+        error = f"Cannot divide by the zero polynomial"
+        raise ZeroDivisionError(error)
+
+    remainder = poly_trim([coeff % p for coeff in a])
+    if len(remainder) < len(b):
+        return [], remainder
+
+    # Inverse of the leading coefficient of b (p is prime)
+    lead_inv = pow(b[-1], p - 2, p)
+    quotient = [0] * (len(remainder) - len(b) + 1)
+
+    # Cancel the leading coefficient of the remainder, from the highest degree to the lowest
+    for i in range(len(quotient) - 1, -1, -1):
+        coeff = (remainder[i + len(b) - 1] * lead_inv) % p
+        quotient[i] = coeff
+        if coeff == 0:
+            continue
+        for j, coeff_b in enumerate(b):
+            remainder[i + j] = (remainder[i + j] - coeff * coeff_b) % p
+
+    return poly_trim(quotient), poly_trim(remainder[:len(b) - 1])
+
+
+def poly_ext_gcd(a: List[int], b: List[int], p: int) -> Tuple[List[int], List[int], List[int]]:
+    """
+    Extended Euclidean algorithm in k[x].
+    Returns (g, s, t) such that g = s*a + t*b, where g is the monic gcd of a and b
+    """
+
+    old_r, r = poly_trim(a), poly_trim(b)
+    old_s, s = [1], []
+    old_t, t = [], [1]
+
+    while r:
+        quotient, remainder = poly_divmod(old_r, r, p)
+        old_r, r = r, remainder
+        old_s, s = s, poly_sub(old_s, poly_mul(quotient, s, p), p)
+        old_t, t = t, poly_sub(old_t, poly_mul(quotient, t, p), p)
+
+    # Normalize the gcd to be monic
+    if old_r:
+        lead_inv = pow(old_r[-1], p - 2, p)
+        old_r = poly_scale(old_r, lead_inv, p)
+        old_s = poly_scale(old_s, lead_inv, p)
+        old_t = poly_scale(old_t, lead_inv, p)
+
+    return old_r, old_s, old_t
+
+
+def poly_gcd(a: List[int], b: List[int], p: int) -> List[int]:
+    """
+    Monic greatest common divisor of a(x) and b(x) in k[x], without the Bezout coefficients
+    """
+
+    a, b = poly_trim(a), poly_trim(b)
+    while b:
+        a, b = b, poly_divmod(a, b, p)[1]
+
+    if not a:
+        return a
+    return poly_scale(a, pow(a[-1], p - 2, p), p)
+
+
+def poly_inverse_mod(a: List[int], f: List[int], p: int) -> List[int]:
+    """
+    Computes the inverse of a(x) modulo f(x), i.e. the polynomial s(x) with s*a = 1 mod f
+    """
+
+    gcd, s, _ = poly_ext_gcd(a, f, p)
+
+    if gcd != [1]:
+        error = f"{a} is not invertible modulo {f}"
+        raise ZeroDivisionError(error)
+
+    return poly_divmod(s, f, p)[1]
+
+
+def poly_mulmod(a: List[int], b: List[int], f: List[int], p: int) -> List[int]:
+    """
+    Computes a(x) * b(x) mod f(x) in k[x]
+    """
+
+    return poly_divmod(poly_mul(a, b, p), f, p)[1]
+
+
+def poly_powmod(a: List[int], exponent: int, f: List[int], p: int) -> List[int]:
+    """
+    Computes a(x)^exponent mod f(x) in k[x] with the square-and-multiply method
+    (with the Polynomial class when the degree of f is at least POLYNOMIAL_THRESHOLD)
+    """
+
+    f = poly_trim([int(coeff) % p for coeff in f])
+    if len(f) - 1 >= POLYNOMIAL_THRESHOLD:
+
+        # We import Polynomial inside the function to prevent circular imports
+        from polynomial import Polynomial
+
+        result = Polynomial(a, p).powmod(exponent, Polynomial(f, p))
+        return [int(coeff) for coeff in result.coeffs.data]
+
+    result = poly_divmod([1], f, p)[1]
+    base = poly_divmod(a, f, p)[1]
+    for bit in bin(exponent)[2:]:
+        result = poly_mulmod(result, result, f, p)
+        if bit == "1":
+            result = poly_mulmod(result, base, f, p)
+
+    return result
+
+
+def is_irreducible(f: List[int], p: int) -> bool:
+    """
+    Rabin's irreducibility test: f(x) of degree n is irreducible in k[x] if and only if
+    x^(p^n) = x mod f(x), and gcd(x^(p^(n/r)) - x, f(x)) = 1 for every prime r dividing n.
+    The powers x^(p^i) are computed by raising to the power p repeatedly, so the test runs in
+    polynomial time in n and log(p)
+    """
+
+    f = poly_trim([int(coeff) % p for coeff in f])
+
+    # Over F_2 the polynomials are packed in integers, which is much faster
+    if p == 2:
+        return binary_is_irreducible(pack_bits(f))
+
+    n = len(f) - 1
+    if n < 1:
+        return False
+    if n == 1:
+        return True
+
+    # The degrees n/r for which x^(p^(n/r)) - x must be coprime with f
+    degrees = {n // r for r in factorize(n)}
+
+    # frobenius = x^(p^i) mod f
+    frobenius = [0, 1]
+    for i in range(1, n + 1):
+        frobenius = poly_powmod(frobenius, p, f, p)
+
+        if i in degrees:
+            gcd = poly_ext_gcd(poly_sub(frobenius, [0, 1], p), f, p)[0]
+            if gcd != [1]:
+                return False
+
+    return poly_sub(frobenius, [0, 1], p) == []
+
+
+def ben_or_is_irreducible(f: List[int], p: int) -> bool:
+    """
+    Ben-Or's irreducibility test: f(x) of degree n is irreducible in k[x] if and only if
+    gcd(x^(p^i) - x, f(x)) = 1 for i = 1, ..., n/2. The test stops at the first common factor,
+    so a reducible f with a factor of degree d is rejected after d steps, whereas Rabin's test always
+    computes the n powers x^(p^i). It is used to search for irreducible polynomials, where most of
+    the candidates are reducible, and is_irreducible() remains the test of a given polynomial
+    """
+
+    f = poly_trim([int(coeff) % p for coeff in f])
+
+    # Over F_2 the polynomials are packed in integers, which is much faster
+    if p == 2:
+        return binary_ben_or_is_irreducible(pack_bits(f))
+
+    n = len(f) - 1
+    if n < 1:
+        return False
+
+    # frobenius = x^(p^i) mod f
+    frobenius = [0, 1]
+    for i in range(1, n // 2 + 1):
+        frobenius = poly_powmod(frobenius, p, f, p)
+        if poly_gcd(poly_sub(frobenius, [0, 1], p), f, p) != [1]:
+            return False
+
+    return True
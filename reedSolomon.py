@@ -0,0 +1,408 @@
+"""
+Reed-Solomon codes over the binary fields GF(2^m), m <= 16, for byte buffers: one symbol is one
+byte for m <= 8 (GF(2^8)) and one native-endian uint16 for m <= 16 (GF(2^16)).
+
+A codeword of the code RS(N, K) is [m_0, ..., m_{K-1}, r_0, ..., r_{N-K-1}], the coefficients of
+c(x) = m(x) x^(N-K) + r(x) from the highest degree, where r(x) = m(x) x^(N-K) mod g(x) and
+g(x) = (x - alpha^b)(x - alpha^(b+1))...(x - alpha^(b+N-K-1)), alpha = x being primitive in the field.
+
+The parity symbols and the syndromes are linear maps of the symbols of a block: for every position i,
+a table gives the contribution v * M[:, i] of the symbol v to all the outputs at once, read as uint64
+words, so a whole buffer of blocks is encoded with one table lookup (one per byte of a symbol of
+GF(2^16)) and a few XOR per symbol. When these tables are too large, the products are computed
+with the log / antilog tables.
+
+The blocks whose syndromes are not all zero are decoded one by one: Berlekamp-Massey finds the
+error locator Lambda(x), the Chien search finds its roots (on all the positions at once), and
+Forney's formula gives the error values.
+"""
+
+import numpy as np
+from finiteField import FiniteField
+from finiteFieldElement import FiniteFieldElement
+from fieldTables import FieldTables
+
+# Largest memory of the tables of a linear map of symbols, in bytes
+TABLE_LIMIT = 2 ** 25
+
+# The blocks are encoded in chunks of this number of blocks, so that the partial results stay in the cache
+CHUNK_BLOCKS = 8192
+
+
+class ReedSolomon:
+    """
+    This class represents a systematic Reed-Solomon code RS(N, K) over a binary field GF(2^m)
+    """
+
+    def __init__(self, field: FiniteField, n: int = None, k: int = None, first_root: int = 0):
+        """
+        Generate the codec
+
+        Parameters
+        ----------
+        field : the field GF(2^m), m <= 16, whose modulus f(x) must be primitive
+                (see FiniteField.from_degree(2, m, primitive=True))
+        n : the length N of a codeword, at most 2^m - 1 (2^m - 1 by default)
+        k : the length K of a message, 0 < K < N (N - 32 by default, or N // 2 for N <= 32)
+        first_root : the exponent b of the first root alpha^b of the generator polynomial
+        """
+
+        if field.p != 2 or field.n > 16:
+            error = f"Reed-Solomon codes are defined over GF(2^m) with m <= 16 (instead of p={field.p}, n={field.n})"
+            raise ValueError(error)
+
+        order = 2 ** field.n - 1
+        n = order if n is None else n
+        k = (n - 32 if n > 32 else n // 2) if k is None else k
+        if not 0 < k < n <= order:
+            error = f"The lengths must satisfy 0 < k < n <= {order} (instead of n={n}, k={k})"
+            raise ValueError(error)
+
+        self.field = field
+        self.n = n
+        self.k = k
+        self.first_root = first_root
+        self.dtype = np.dtype("uint8") if field.n <= 8 else np.dtype("uint16")
+        self.order = order
+
+        # alpha = x must generate the multiplicative group, which is checked before building any table
+        if not FiniteFieldElement(2, field).is_primitive():
+            error = f"x is not primitive modulo f(x): the field must be built with a primitive modulus"
+            raise ValueError(error)
+
+        # The log / antilog tables in base alpha = x: exp[i] = alpha^i, stored twice. They are private to
+        # the codec: field.build_tables() would switch every user of the (interned) field to the table mode
+        tables = field.tables if field.tables is not None else FieldTables.build(field)
+        log_x = int(tables.log[2])
+
+        self.exp = tables.exp[(np.arange(2 * order) * log_x) % order].astype("int64")
+        self.log = np.full(order + 1, -1, dtype="int64")
+        self.log[self.exp[:order]] = np.arange(order)
+
+        # Python lists for the scalar arithmetic of the decoder
+        self._exp = self.exp.tolist()
+        self._log = self.log.tolist()
+
+        self.generator = self.__generator_polynomial()
+
+        # The parity matrix: the column i holds x^(N-1-i) mod g(x), from the highest degree
+        nsym = n - k
+        remainder = [1] + [0] * (nsym - 1)
+        columns = []
+        for _ in range(n - 1, nsym - 1, -1):
+            remainder = self.__shift_mod(remainder)
+            columns.append(remainder)
+        parity_matrix = np.array(columns[::-1], dtype="int64").T
+        self.__parity = _SymbolMap(parity_matrix, self)
+
+        # The syndrome matrix: the row j holds alpha^((b+j)(N-1-i)) for the positions i
+        powers = np.outer(first_root + np.arange(nsym), np.arange(n - 1, -1, -1)) % order
+        self.__syndromes = _SymbolMap(self.exp[powers], self)
+
+    @property
+    def nsym(self) -> int:
+        """
+        The number of parity symbols N - K
+        """
+
+        return self.n - self.k
+
+    @property
+    def t(self) -> int:
+        """
+        The number of symbol errors that can be corrected in a codeword
+        """
+
+        return self.nsym // 2
+
+    def __repr__(self):
+        return f"RS({self.n}, {self.k}) over GF(2^{self.field.n})"
+
+    def mul(self, a: int, b: int) -> int:
+        if a == 0 or b == 0:
+            return 0
+        return self._exp[self._log[a] + self._log[b]]
+
+    def inverse(self, a: int) -> int:
+        if a == 0:
+            error = f"The zero element does not have an inverse"
+            raise ZeroDivisionError(error)
+        return self._exp[self.order - self._log[a]]
+
+    def __generator_polynomial(self):
+        """
+        g(x) = prod (x - alpha^(b+j)), as the list of its coefficients from the highest degree
+        """
+
+        g = [1]
+        for j in range(self.nsym):
+            root = self._exp[(self.first_root + j) % self.order]
+            g = [coeff ^ self.mul(root, previous) for coeff, previous in zip(g + [0], [0] + g)]
+        return g
+
+    def __shift_mod(self, remainder):
+        """
+        Multiplies a remainder modulo g(x) (N - K coefficients from the highest degree) by x, modulo g(x)
+        """
+
+        leading = remainder[0]
+        shifted = remainder[1:] + [0]
+        return [coeff ^ self.mul(leading, g) for coeff, g in zip(shifted, self.generator[1:])]
+
+    def symbols(self, data, width: int):
+        """
+        Views a buffer (bytes, bytearray, memoryview or ndarray) as an array of blocks of width symbols,
+        without copying it when its memory layout allows it
+        """
+
+        if isinstance(data, np.ndarray):
+            symbols = data if data.dtype == self.dtype else data.astype(self.dtype)
+        else:
+            symbols = np.frombuffer(data, dtype=self.dtype)
+
+        if symbols.size % width:
+            error = f"The buffer holds {symbols.size} symbols, which is not a multiple of {width}"
+            raise ValueError(error)
+
+        symbols = symbols.reshape(-1, width)
+        if self.order + 1 < 2 ** (8 * self.dtype.itemsize) and np.any(symbols > self.order):
+            error = f"The symbols must be lower than {self.order + 1}"
+            raise ValueError(error)
+
+        return symbols
+
+    def __output(self, out, shape):
+        """
+        The array of the results: a new array, or a view on the writable buffer out
+        """
+
+        if out is None:
+            return np.empty(shape, dtype=self.dtype)
+
+        result = out if isinstance(out, np.ndarray) else np.frombuffer(out, dtype=self.dtype)
+        if result.size != shape[0] * shape[1]:
+            error = f"The output buffer must hold {shape[0] * shape[1]} symbols (instead of {result.size})"
+            raise ValueError(error)
+        return result.reshape(shape)
+
+    def parity(self, data):
+        """
+        The parity symbols of every block of K symbols of the buffer, as an array of shape (blocks, N - K)
+        """
+
+        return self.__parity.apply(self.symbols(data, self.k))
+
+    def encode(self, data, out=None):
+        """
+        Encodes a buffer of messages of K symbols. Returns the codewords as an array of shape (blocks, N),
+        written in the writable buffer out if it is given
+        """
+
+        messages = self.symbols(data, self.k)
+        codewords = self.__output(out, (len(messages), self.n))
+        codewords[:, self.k:] = self.__parity.apply(messages)
+        codewords[:, :self.k] = messages
+        return codewords
+
+    def syndromes(self, data):
+        """
+        The syndromes S_j = c(alpha^(b+j)) of every codeword of the buffer, as an array of shape (blocks, N - K).
+        They are all zero for the valid codewords
+        """
+
+        return self.__syndromes.apply(self.symbols(data, self.n))
+
+    def decode(self, data, out=None):
+        """
+        Decodes a buffer of codewords of N symbols, correcting up to t errors in every codeword.
+        Returns (messages, corrected): the messages as an array of shape (blocks, K), written in the
+        writable buffer out if it is given, and the number of corrected symbols in every block, which
+        is -1 for the blocks with too many errors (their messages are returned without correction)
+        """
+
+        codewords = self.symbols(data, self.n)
+        messages = self.__output(out, (len(codewords), self.k))
+        messages[:] = codewords[:, :self.k]
+
+        syndromes = self.__syndromes.apply(codewords)
+        corrected = np.zeros(len(codewords), dtype="int64")
+
+        for block in np.flatnonzero(np.any(syndromes, axis=1)):
+            errors = self.__correct(syndromes[block].tolist())
+            if errors is None:
+                corrected[block] = -1
+                continue
+
+            # The corrected codeword must be valid
+            codeword = codewords[block].copy()
+            for position, value in errors:
+                codeword[position] ^= value
+            if np.any(self.__syndromes.apply(codeword[np.newaxis])):
+                corrected[block] = -1
+                continue
+
+            messages[block] = codeword[:self.k]
+            corrected[block] = len(errors)
+
+        return messages, corrected
+
+    def __correct(self, syndromes):
+        """
+        Finds the errors of a codeword from its syndromes: returns the list of (position, value),
+        or None if the codeword has more than t errors
+        """
+
+        locator = self.__berlekamp_massey(syndromes)
+        degree = len(locator) - 1
+        if degree > self.t:
+            return None
+
+        positions = self.__chien_search(locator)
+        if len(positions) != degree:
+            return None
+
+        # Forney: e_k = X_k^(1-b) Omega(X_k^-1) / Lambda'(X_k^-1), with Omega(x) = S(x) Lambda(x) mod x^(N-K)
+        omega = [0] * self.nsym
+        for i, coeff in enumerate(locator):
+            for j in range(self.nsym - i):
+                omega[i + j] ^= self.mul(coeff, syndromes[j])
+
+        # In characteristic 2, the derivative only keeps the terms of odd degree
+        derivative = [coeff if i % 2 == 1 else 0 for i, coeff in enumerate(locator)][1:]
+
+        errors = []
+        for position in positions:
+            power = self.n - 1 - position
+            x_inverse = self._exp[(self.order - power) % self.order]
+            numerator = self.__evaluate(omega, x_inverse)
+            denominator = self.__evaluate(derivative, x_inverse)
+            if denominator == 0:
+                return None
+
+            scale = self._exp[(power * (1 - self.first_root)) % self.order]
+            errors.append((position, self.mul(scale, self.mul(numerator, self.inverse(denominator)))))
+
+        return errors
+
+    def __berlekamp_massey(self, syndromes):
+        """
+        Berlekamp-Massey algorithm: the shortest LFSR Lambda(x) = 1 + Lambda_1 x + ... generating the syndromes,
+        as the list of its coefficients from the lowest degree
+        """
+
+        locator, previous = [1], [1]
+        length, shift, last = 0, 1, 1
+
+        for i in range(len(syndromes)):
+            # The discrepancy between the syndrome i and its prediction by the LFSR
+            discrepancy = syndromes[i]
+            for j in range(1, length + 1):
+                if j < len(locator):
+                    discrepancy ^= self.mul(locator[j], syndromes[i - j])
+
+            if discrepancy == 0:
+                shift += 1
+                continue
+
+            # locator - (discrepancy / last) x^shift previous
+            scale = self.mul(discrepancy, self.inverse(last))
+            update = locator + [0] * max(0, shift + len(previous) - len(locator))
+            for j, coeff in enumerate(previous):
+                update[j + shift] ^= self.mul(scale, coeff)
+
+            if 2 * length <= i:
+                previous, locator = locator, update
+                length, last, shift = i + 1 - length, discrepancy, 1
+            else:
+                locator = update
+                shift += 1
+
+        while len(locator) > 1 and locator[-1] == 0:
+            locator.pop()
+        return locator
+
+    def __chien_search(self, locator):
+        """
+        The positions i whose locator X = alpha^(N-1-i) satisfies Lambda(X^-1) = 0, for all the positions at once
+        """
+
+        powers = np.arange(self.n - 1, -1, -1)
+        values = np.zeros(self.n, dtype="int64")
+        for j, coeff in enumerate(locator):
+            if coeff:
+                values ^= self.exp[(self._log[coeff] - j * powers) % self.order]
+        return np.flatnonzero(values == 0).tolist()
+
+    def __evaluate(self, coeffs, x: int) -> int:
+        """
+        Horner's method on a polynomial given from its lowest degree
+        """
+
+        result = 0
+        for coeff in reversed(coeffs):
+            result = self.mul(result, x) ^ coeff
+        return result
+
+
+class _SymbolMap:
+    """
+    The linear map y = M x of the blocks of symbols x, computed with tables for every column of M.
+    The product by a constant is linear over GF(2), so v * M[:, i] is the XOR of the products of the bytes
+    of v: tables[i][byte][u] = (u << 8 byte) * M[:, i], padded to whole uint64 words. When the tables
+    would use more than TABLE_LIMIT bytes, the products are computed with the log / antilog tables
+    """
+
+    def __init__(self, matrix, code: ReedSolomon):
+        self.rows, self.cols = matrix.shape
+        self.code = code
+        self.log_matrix = code.log[matrix]
+
+        itemsize = code.dtype.itemsize
+        width = -(-self.rows * itemsize // 8) * 8 // itemsize
+        self.tables = None
+
+        if self.cols * itemsize * 256 * width * itemsize <= TABLE_LIMIT:
+            tables = np.zeros((self.cols, itemsize, 256, width), dtype=code.dtype)
+            for byte in range(itemsize):
+                # The values of the byte which are not symbols of the field are never looked up
+                values = np.arange(256) << (8 * byte)
+                logs = code.log[np.where(values <= code.order, values, 0)]
+
+                products = code.exp[logs[np.newaxis, :, np.newaxis] + self.log_matrix.T[:, np.newaxis, :]]
+                zero = (logs[np.newaxis, :, np.newaxis] < 0) | (self.log_matrix.T[:, np.newaxis, :] < 0)
+                tables[:, byte, :, :self.rows] = np.where(zero, 0, products)
+
+            self.tables = tables.view("uint64")
+
+    def apply(self, symbols):
+        """
+        Computes M x for every block x of the array of shape (blocks, cols): returns an array of shape (blocks, rows).
+        The blocks are processed in chunks of CHUNK_BLOCKS, whose results stay in the cache
+        """
+
+        result = np.empty((len(symbols), self.rows), dtype=self.code.dtype)
+        for start in range(0, len(symbols), CHUNK_BLOCKS):
+            # One contiguous row of symbols per position
+            chunk = np.ascontiguousarray(symbols[start:start + CHUNK_BLOCKS].T)
+            result[start:start + CHUNK_BLOCKS] = self.__apply_chunk(chunk)
+        return result
+
+    def __apply_chunk(self, columns):
+        code = self.code
+        if self.tables is not None:
+            words = np.zeros((columns.shape[1], self.tables.shape[-1]), dtype="uint64")
+            if code.dtype.itemsize == 1:
+                for i in range(self.cols):
+                    words ^= np.take(self.tables[i, 0], columns[i], axis=0)
+            else:
+                for i in range(self.cols):
+                    words ^= np.take(self.tables[i, 0], columns[i] & 0xFF, axis=0)
+                    words ^= np.take(self.tables[i, 1], columns[i] >> 8, axis=0)
+            return words.view(code.dtype)[:, :self.rows]
+
+        result = np.zeros((columns.shape[1], self.rows), dtype="int64")
+        for i in range(self.cols):
+            logs = code.log[columns[i]]
+            products = code.exp[logs[:, np.newaxis] + self.log_matrix[:, i]]
+            result ^= np.where((logs[:, np.newaxis] < 0) | (self.log_matrix[:, i] < 0), 0, products)
+        return result
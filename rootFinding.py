@@ -0,0 +1,134 @@
+"""
+Square roots and roots of polynomials over finite fields.
+
+- tonelli_shanks: the square root of an element of a field of odd order q, from a non-square
+  of the field. It only uses the * and == operators of the elements.
+- find_roots: the roots in l of a polynomial with coefficients in l, with the Cantor-Zassenhaus
+  algorithm. g = gcd(f, x^q - x) is the product of the (x - r) for the distinct roots r of f,
+  and g is split by gcds with (x + delta)^((q-1)/2) - 1 for random delta (or with the trace
+  of delta x in characteristic 2), until only linear factors remain.
+
+The polynomials are Polynomial objects (see polynomial.py).
+"""
+
+from typing import List
+from finiteField import FiniteField
+from primeFieldElement import PrimeFieldElement
+from polynomial import Polynomial
+
+
+def tonelli_shanks(a, non_residue, one, order: int):
+    """
+    Tonelli-Shanks algorithm: computes a square root of a in a field of odd order q.
+    Returns None if a is not a square
+
+    Parameters
+    ----------
+    a : a non-zero element of the field
+    non_residue : an element which is not a square in the field
+    one : the identity element of the field
+    order : the order q - 1 of the multiplicative group
+    """
+
+    # q - 1 = 2^s t with t odd
+    s, t = 0, order
+    while t % 2 == 0:
+        t //= 2
+        s += 1
+
+    # x^2 = a b, where b is in the subgroup of order 2^s generated by c
+    x = a ** ((t + 1) // 2)
+    b = a ** t
+    c = non_residue ** t
+    m = s
+
+    while b != one:
+
+        # The order of b is 2^i
+        i, power = 0, b
+        while power != one:
+            power = power * power
+            i += 1
+
+        if i == m:
+            return None
+
+        # g = c^(2^(m-i-1)) has order 2^(i+1), and g^2 removes the order 2^i part of b
+        g = c
+        for _ in range(m - i - 1):
+            g = g * g
+
+        x = x * g
+        c = g * g
+        b = b * c
+        m = i
+
+    return x
+
+
+def find_roots(coeffs: List) -> List:
+    """
+    Finds the distinct roots of the polynomial a_0 + a_1 x + ... + a_d x^d with coefficients
+    in a finite field (FiniteFieldElement or PrimeFieldElement objects, or a Polynomial), with the
+    Cantor-Zassenhaus algorithm in expected polynomial time.
+    Returns the roots sorted by their packed integers, as elements of the same class as the coefficients
+    """
+
+    f = coeffs if isinstance(coeffs, Polynomial) else Polynomial(coeffs)
+    if f.is_zero():
+        error = f"Every element is a root of the zero polynomial"
+        raise ValueError(error)
+
+    # The prime field k is a field of p elements
+    size = f.field.size if isinstance(f.field, FiniteField) else f.field
+    x = Polynomial(f.coeffs.zeros_like((1,)).concatenate(f.coeffs.ones_like((1,))))
+
+    # g = gcd(f, x^q - x) is the product of the (x - r) for the roots r of f
+    roots = []
+    if f.degree > 0:
+        g = f.gcd(x.powmod(size, f) - x)
+        roots = _split(g, size).to_elements()
+
+    roots.sort(key=lambda root: root.a if isinstance(root, PrimeFieldElement) else root.to_int())
+    return roots
+
+
+def _split(g: Polynomial, size: int):
+    """
+    Splits a monic product of distinct linear factors (x - r) over a field of size elements
+    and returns the array of the roots r
+    """
+
+    one = g.one()
+    roots = g.coeffs.zeros_like((0,))
+    stack = [g]
+    while stack:
+        h = stack.pop()
+
+        if h.degree == 0:
+            continue
+        if h.degree == 1:
+            roots = roots.concatenate(-h.coeffs[0:1])
+            continue
+
+        # A random split of the roots: for half of the roots r, r + delta is a square
+        # (or in characteristic 2, Tr(delta r) = 0)
+        while True:
+            delta = h.coeffs.random_like((1,))
+
+            if size % 2 == 1:
+                w = Polynomial(delta.concatenate(one.coeffs)).powmod((size - 1) // 2, h) - one
+            else:
+                term = Polynomial(delta.zeros_like((1,)).concatenate(delta)) % h
+                w = term
+                for _ in range(size.bit_length() - 2):
+                    term = (term * term) % h
+                    w = w + term
+
+            factor = h.gcd(w)
+            if 0 < factor.degree < h.degree:
+                stack.append(factor)
+                stack.append(h // factor)
+                break
+
+    return roots
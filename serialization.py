@@ -0,0 +1,400 @@
+"""
+Compact binary serialization of arrays of field elements, for the files and the pipes between processes.
+
+A stream is a header followed by batches of elements:
+    magic (4 bytes) | version (uint32) | header length (uint32) | JSON header | padding to 64 bytes
+    count (uint64) | count elements | padding to 8 bytes
+    count (uint64) | count elements | padding to 8 bytes
+    ...
+The JSON header gives the field (p and f_coeffs, or f_coeffs = null for the prime field k) and the
+storage of the elements:
+- compact, every element is packed in one integer a_0 + a_1 p + ... + a_{n-1} p^(n-1) (as
+  FieldArray.pack), stored as a little-endian unsigned integer of the smallest dtype holding p^n - 1,
+  e.g. one byte for GF(2^8). Above 2^63, the n coefficients are stored in the smallest dtype holding p - 1,
+- else, the n coefficients are stored in the int64 of the arrays,
+- and as integers of itemsize bytes when p >= 2^64.
+
+The batches are read with np.frombuffer, so a whole file mapped with np.memmap is loaded without
+copying it when the coefficients are stored in the dtype of the arrays (compact=False).
+"""
+
+import json
+import os
+import struct
+import numpy as np
+from finiteField import FiniteField
+from fieldArray import _BaseArray, FieldArray, PrimeFieldArray
+from fieldTables import smallest_dtype
+from modularReduction import select_dtype
+from primeFieldElement import PrimeFieldElement
+
+MAGIC = b"PFFS"
+VERSION = 1
+ALIGNMENT = 64
+
+# Every batch starts with its number of elements and is padded to a multiple of 8 bytes
+COUNT = struct.Struct("<Q")
+BATCH_ALIGNMENT = 8
+
+
+class _Format:
+    """
+    The storage of the elements of a field in a stream, described by the JSON header
+    """
+
+    def __init__(self, header: dict, field=None):
+        """
+        Parameters
+        ----------
+        header : the JSON header of the stream
+        field : the field of the elements, when it is known (for writing). Else it is built from the
+                header, which may not be trusted: the modulus is checked (once, the fields are interned)
+        """
+
+        self.header = header
+        self.p = header["p"]
+
+        if header["f_coeffs"] is None:
+            self.field = self.p
+            self.n = 1
+        else:
+            self.field = field if field is not None else FiniteField(self.p, header["f_coeffs"])
+            self.n = self.field.n
+
+        self.dtype = None if header["dtype"] is None else np.dtype(header["dtype"])
+        self.itemsize = header["itemsize"]
+        self.packed = header["packed"]
+
+        # The number of integers stored for every element
+        self.width = 1 if self.packed else self.n
+
+    @classmethod
+    def create(cls, field, compact: bool = True):
+        """
+        The format of the elements of a FiniteField, or of the prime field k for an int p
+        """
+
+        p = field.p if isinstance(field, FiniteField) else field
+        f_coeffs = [int(coeff) % p for coeff in field.f_coeffs] if isinstance(field, FiniteField) else None
+
+        # One packed integer per element when the packed integers fit in int64
+        packed = compact and isinstance(field, FiniteField) and field.powers is not None
+        if packed:
+            dtype = smallest_dtype(field.size - 1).newbyteorder("<")
+
+        # Else little-endian unsigned integers holding p - 1, or the int64 of the arrays
+        elif p - 1 < 2 ** 64 and (compact or select_dtype(p) != "int64"):
+            dtype = smallest_dtype(p - 1).newbyteorder("<")
+        elif select_dtype(p) == "int64":
+            dtype = np.dtype("<i8")
+        else:
+            dtype = None
+
+        itemsize = dtype.itemsize if dtype is not None else -(-(p - 1).bit_length() // 8)
+        return cls({"p": p, "f_coeffs": f_coeffs, "dtype": None if dtype is None else dtype.str,
+                    "itemsize": itemsize, "packed": packed}, field)
+
+    def encode_header(self) -> bytes:
+        encoded = json.dumps(self.header).encode()
+        header = MAGIC + struct.pack("<II", VERSION, len(encoded)) + encoded
+        return header + b"\0" * (-len(header) % ALIGNMENT)
+
+    def nbytes(self, count: int) -> int:
+        """
+        Size of a batch of count elements, padding included (without its count)
+        """
+
+        size = count * self.width * self.itemsize
+        return size + (-size % BATCH_ALIGNMENT)
+
+    def coerce(self, elements):
+        """
+        Converts a list of elements to an array, and checks the field of an array
+        """
+
+        if not isinstance(elements, _BaseArray):
+            elements = list(elements)
+            if isinstance(self.field, FiniteField):
+                elements = FieldArray.from_elements(elements, self.field)
+            else:
+                elements = PrimeFieldArray.from_elements(elements, self.field)
+
+        field = elements.field if isinstance(elements, FieldArray) else elements.p
+        if field != self.field:
+            error = f"Cannot write elements of {field} in a stream of {self.field}"
+            raise TypeError(error)
+
+        return elements
+
+    def encode(self, array):
+        """
+        The bytes of a batch (a buffer: an ndarray or bytes), padding included
+        """
+
+        data = (array.pack() if self.packed else array.data).reshape(-1)
+        padding = b"\0" * (-(data.size * self.itemsize) % BATCH_ALIGNMENT)
+
+        if self.dtype is not None:
+            return np.ascontiguousarray(data, dtype=self.dtype).tobytes() + padding
+        return b"".join(int(coeff).to_bytes(self.itemsize, "little") for coeff in data) + padding
+
+    def decode(self, buffer, count: int, offset: int = 0):
+        """
+        The array of the count elements stored in the buffer at the given offset.
+        When they are stored in the dtype of the arrays, the array is a view on the buffer
+        """
+
+        size = count * self.width
+        if self.dtype is not None:
+            data = np.frombuffer(buffer, dtype=self.dtype, count=size, offset=offset)
+        else:
+            raw = memoryview(buffer)[offset:offset + size * self.itemsize]
+            data = np.array([int.from_bytes(raw[i * self.itemsize:(i + 1) * self.itemsize], "little")
+                             for i in range(size)], dtype=object)
+
+        # The stream may not be trusted: the values are checked once for the batch, so that the arrays
+        # built without the reduction modulo p (check=False) only hold elements of the field
+        bound = self.field.size if self.packed else self.p
+        if size and (int(data.max()) >= bound or int(data.min()) < 0):
+            error = f"The stream holds values out of the range of the elements of {self.field}"
+            raise ValueError(error)
+
+        if self.packed:
+            data = data.astype("int64")[:, np.newaxis] // self.field.powers % self.p
+        if isinstance(self.field, FiniteField):
+            return FieldArray(data.reshape(count, self.n), self.field, check=False)
+        return PrimeFieldArray(data, self.p, check=False)
+
+
+def _parse_header(read):
+    """
+    Reads the header of a stream with the function read(size) -> bytes. Returns the format
+    """
+
+    start = read(len(MAGIC) + 8)
+    if len(start) < len(MAGIC) + 8 or start[:len(MAGIC)] != MAGIC:
+        error = f"The stream does not start with a header of field elements"
+        raise ValueError(error)
+
+    version, length = struct.unpack("<II", start[len(MAGIC):])
+    if version != VERSION:
+        error = f"The version {version} of the stream is not supported (expected {VERSION})"
+        raise ValueError(error)
+
+    header = json.loads(read(length))
+    read(-(len(MAGIC) + 8 + length) % ALIGNMENT)
+    return _Format(header)
+
+
+class FieldWriter:
+    """
+    This class writes batches of elements to a binary file or a pipe
+    """
+
+    def __init__(self, file, field, compact: bool = True):
+        """
+        Parameters
+        ----------
+        file : a path, or a binary file object open for writing (e.g. sys.stdout.buffer)
+        field : the field of the elements, a FiniteField or a prime p for the prime field k
+        compact : if True, the elements are stored in the smallest dtype (packed in one integer when
+                  p^n < 2^63), else in the int64 of the arrays, which are then loaded without a copy
+        """
+
+        self.__owner = isinstance(file, (str, os.PathLike))
+        self.file = open(file, "wb") if self.__owner else file
+        self.format = _Format.create(field, compact)
+        self.count = 0
+
+        self.file.write(self.format.encode_header())
+
+    def write(self, elements):
+        """
+        Writes one batch: a PrimeFieldArray or a FieldArray of any shape (flattened), or a list of elements
+        """
+
+        array = self.format.coerce(elements)
+        count = array.data.size // self.format.n
+        self.file.write(COUNT.pack(count))
+        self.file.write(self.format.encode(array))
+        self.count += count
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        if self.__owner:
+            self.file.close()
+        else:
+            self.file.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class FieldReader:
+    """
+    This class reads the batches of elements of a binary file or a pipe, one batch at a time
+    """
+
+    def __init__(self, file):
+        """
+        Parameters
+        ----------
+        file : a path, or a binary file object open for reading (e.g. sys.stdin.buffer)
+        """
+
+        self.__owner = isinstance(file, (str, os.PathLike))
+        self.file = open(file, "rb") if self.__owner else file
+        self.format = _parse_header(self.__read)
+
+    @property
+    def field(self):
+        """
+        The field of the elements: a FiniteField, or the prime p for the prime field k
+        """
+
+        return self.format.field
+
+    def __read(self, size: int) -> bytes:
+        """
+        Reads exactly size bytes (a pipe can return fewer bytes per read), or fewer at the end of the stream
+        """
+
+        chunks = []
+        while size > 0:
+            chunk = self.file.read(size)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            size -= len(chunk)
+        return b"".join(chunks)
+
+    def read_batch(self):
+        """
+        Reads the next batch as a PrimeFieldArray or a FieldArray, or returns None at the end of the stream
+        """
+
+        start = self.__read(COUNT.size)
+        if not start:
+            return None
+        if len(start) < COUNT.size:
+            error = f"The stream ends inside the count of a batch"
+            raise ValueError(error)
+
+        count, = COUNT.unpack(start)
+        size = self.format.nbytes(count)
+
+        # The batch is read in a bytearray, on which the array is a view
+        buffer = bytearray(size)
+        view = memoryview(buffer)
+        position = 0
+        while position < size:
+            read = self.file.readinto(view[position:])
+            if not read:
+                error = f"The stream ends inside a batch of {count} elements"
+                raise ValueError(error)
+            position += read
+
+        return self.format.decode(buffer, count)
+
+    def __iter__(self):
+        while True:
+            batch = self.read_batch()
+            if batch is None:
+                return
+            yield batch
+
+    def close(self):
+        if self.__owner:
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def dumps(elements, field=None, compact: bool = True) -> bytes:
+    """
+    Serializes an array (or a list) of elements as a stream of one batch
+    """
+
+    if field is None:
+        if isinstance(elements, FieldArray):
+            field = elements.field
+        elif isinstance(elements, PrimeFieldArray):
+            field = elements.p
+        else:
+            elements = list(elements)
+            if not elements:
+                error = f"The field must be given for an empty list of elements"
+                raise ValueError(error)
+            field = elements[0].p if isinstance(elements[0], PrimeFieldElement) else elements[0].field
+
+    stream_format = _Format.create(field, compact)
+    array = stream_format.coerce(elements)
+    count = array.data.size // stream_format.n
+    return stream_format.encode_header() + COUNT.pack(count) + stream_format.encode(array)
+
+
+def loads(buffer):
+    """
+    Loads all the elements of a stream held in a buffer (bytes, memoryview, np.memmap, ...) as one array.
+    A stream of one batch stored in the dtype of the arrays is loaded without a copy, as a view on the buffer
+    """
+
+    view = memoryview(buffer).cast("B")
+    position = 0
+
+    def read(size):
+        nonlocal position
+        position += size
+        return bytes(view[position - size:position])
+
+    stream_format = _parse_header(read)
+
+    batches = []
+    while position + COUNT.size <= len(view):
+        count, = COUNT.unpack(view[position:position + COUNT.size])
+        position += COUNT.size
+        if position + stream_format.nbytes(count) > len(view):
+            error = f"The buffer ends inside a batch of {count} elements"
+            raise ValueError(error)
+
+        batches.append(stream_format.decode(buffer, count, position))
+        position += stream_format.nbytes(count)
+
+    if not batches:
+        return stream_format.decode(b"", 0)
+
+    result = batches[0]
+    for batch in batches[1:]:
+        result = result.concatenate(batch)
+    return result
+
+
+def save(path, elements, field=None, compact: bool = True):
+    """
+    Writes an array (or a list) of elements to a file
+    """
+
+    with open(path, "wb") as file:
+        file.write(dumps(elements, field, compact))
+
+
+def load(path, mmap: bool = True):
+    """
+    Loads all the elements of a file as one array. With mmap, the file is mapped in memory, and
+    a file of one batch stored in the dtype of the arrays (compact=False) is used without a copy
+    """
+
+    if mmap and os.path.getsize(path) > 0:
+        return loads(np.memmap(path, dtype="uint8", mode="r"))
+
+    with open(path, "rb") as file:
+        return loads(file.read())